@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Adaptive difficulty on simulated learners: items get a hidden true
+difficulty around their level's prior, users a hidden true ability. Each
+round picks an item near the user's estimated ability, simulates the
+answer and records it. Reports time per pick + answer for growing item
+banks (it should not grow), how well estimated abilities track the true
+ones, and the share of answers that were right (the target is 70%).
+
+Usage: python benchmarks/bench_adaptive.py [users] [answers_per_user]
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.adaptive import AdaptiveEngine, CANDIDATES, LEVEL_DIFFICULTY, expected
+from utils.user_records import UserProgress
+
+
+def simulate(items_per_level, users, answers, rng):
+    levels = {
+        level: [{'id': f'{level}{i}', 'difficulty': prior, 'true': prior + rng.gauss(0, 0.5)} for i in range(items_per_level)]
+        for level, prior in LEVEL_DIFFICULTY.items()
+    }
+    engine = AdaptiveEngine({})
+    learners = [(UserProgress(), rng.uniform(-2.5, 3.0)) for _ in range(users)]
+    correct = 0
+    start = time.perf_counter()
+    for _ in range(answers):
+        for progress, true_ability in learners:
+            candidates = rng.sample(levels[progress.level], CANDIDATES + 1)
+            item = engine.choose('vocab', progress, candidates, rng=rng)[0]
+            is_correct = rng.random() < expected(true_ability, item['true'])
+            correct += is_correct
+            engine.record(progress, 'vocab', item, is_correct)
+            progress.level = engine.level_for(progress)
+    elapsed = time.perf_counter() - start
+    pairs = [(progress.ability, true_ability) for progress, true_ability in learners]
+    return elapsed / (answers * users), statistics.correlation(*zip(*pairs)), correct / (answers * users)
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    answers = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    print(f"🎚️  Adaptive difficulty: {users} simulated users x {answers} answers")
+    print("=" * 50)
+    for items_per_level in (100, 10_000, 100_000):
+        per_answer, correlation, success = simulate(items_per_level, users, answers, random.Random(1))
+        print(f"{items_per_level * 3:>8,} items: {per_answer * 1e6:5.1f} µs per pick + answer, "
+              f"ability estimate r = {correlation:.2f}, {success:.0%} answered right")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Daily broadcast through the outbound dispatcher with a fake Bot API.
+The first run is killed part-way, the second run resumes from the
+checkpoint in SQLite. Checks that every user gets the message and counts
+duplicates (at most one batch, the one in flight when the process died).
+The simulated global rate is raised so the run takes seconds; the
+projection at Telegram's real limit is printed at the end.
+
+Usage: python benchmarks/bench_broadcast.py [users] [simulated_rate]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'benchmark')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+from config import OUTBOUND_GLOBAL_RATE
+from services.broadcast_service import BroadcastService
+from utils.send_queue import OutboundDispatcher
+from utils.storage import SQLiteBackend, StateStore
+
+
+class FakeBot:
+    """Sends go through the dispatcher the same way ExtBot does"""
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self.delivered = Counter()
+
+    async def send_message(self, chat_id, text, reply_markup=None, parse_mode=None, rate_limit_args=None):
+        async def callback():
+            await asyncio.sleep(0.002)  # API round trip
+            self.delivered[chat_id] += 1
+        return await self.dispatcher.process_request(
+            callback, (), {}, 'sendMessage', {'chat_id': chat_id}, rate_limit_args
+        )
+
+
+def render(day):
+    return f'Challenge for {day}', None
+
+
+async def run_once(path, users, rate, bot_delivered, stop_after=None):
+    store = StateStore(SQLiteBackend(path))
+    service = BroadcastService(store, lambda: range(users), render, batch_size=100)
+    dispatcher = OutboundDispatcher(global_rate=rate)
+    await dispatcher.initialize()
+    bot = FakeBot(dispatcher)
+    bot.delivered = bot_delivered
+
+    task = asyncio.create_task(service.broadcast(bot, date.today()))
+    if stop_after is not None:
+        while sum(bot.delivered.values()) < stop_after:
+            await asyncio.sleep(0.01)
+        task.cancel()  # simulated crash
+    await asyncio.gather(task, return_exceptions=True)
+    await dispatcher.shutdown()
+    store.backend.close()
+    return service.last_report
+
+
+async def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    print(f"📣 Broadcast to {users} users at a simulated {rate:.0f} msg/s")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.db')
+        delivered = Counter()
+        start = time.perf_counter()
+        await run_once(path, users, rate, delivered, stop_after=users // 3)
+        print(f"Crashed after {sum(delivered.values())} sends")
+        report = await run_once(path, users, rate, delivered)
+        elapsed = time.perf_counter() - start
+
+    missing = users - len(delivered)
+    duplicates = sum(count - 1 for count in delivered.values())
+    print(f"Resumed run:       {report}")
+    print(f"Total wall time:   {elapsed:.1f}s ({users / elapsed:.0f} msg/s)")
+    print(f"Missing: {missing}, duplicates: {duplicates}")
+    assert missing == 0
+    assert duplicates <= 100
+    minutes = 100000 / OUTBOUND_GLOBAL_RATE / 60
+    print(f"At OUTBOUND_GLOBAL_RATE={OUTBOUND_GLOBAL_RATE:.0f}/s, 100k users take {minutes:.0f} minutes")
+    print("✅ Broadcast resumed from its checkpoint and reached every user")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Dispatch cost of CallbackRouter against the old if/elif chain in
+button_callback. Both only pick the target (no handler work), over a mix
+of real callback data. Also checks that both pick the same target for
+every key.
+
+Usage: python benchmarks/bench_callback_router.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.callback_data import ANSWER, pack, unpack
+from utils.callback_router import CallbackRouter
+
+EXACT = [
+    'writing', 'speaking', 'reading', 'listening', 'help', 'status', 'back_to_main',
+    'library', 'back_to_reading', 'back_to_library', 'listening_podcasts',
+    'listening_movies', 'listening_news', 'listening_audiomate', 'back_to_listening',
+    'mini_app', 'back_to_miniapp', 'daily_challenge', 'progress_stats',
+]
+PREFIXES = ['level_', 'book_', 'vocab_', 'grammar_', 'word_match_', 'fill_blank_']
+
+# In-game answers dominate real traffic
+SAMPLE = (
+    ['vocab_answer_2', 'grammar_answer_1', 'word_match_select_5', 'fill_blank_answer_3'] * 5
+    + ['book_pre_intermediate_3', 'level_advanced', 'mini_app', 'progress_stats', 'daily_challenge', 'writing']
+)
+
+
+def old_chain(data):
+    """Same comparisons, in the same order, as the removed button_callback"""
+    if data == "writing":
+        return 'writing'
+    elif data == "speaking":
+        return 'speaking'
+    elif data == "reading":
+        return 'reading'
+    elif data == "listening":
+        return 'listening'
+    elif data == "help":
+        return 'help'
+    elif data == "status":
+        return 'status'
+    elif data == "back_to_main":
+        return 'back_to_main'
+    elif data == "library":
+        return 'library'
+    elif data.startswith("level_"):
+        return 'level_*', (data.replace("level_", ""),)
+    elif data.startswith("book_"):
+        level, book_index = data.replace("book_", "").rsplit("_", 1)
+        return 'book_*', (level, int(book_index))
+    elif data == "back_to_reading":
+        return 'back_to_reading'
+    elif data == "back_to_library":
+        return 'back_to_library'
+    elif data == "listening_podcasts":
+        return 'listening_podcasts'
+    elif data == "listening_movies":
+        return 'listening_movies'
+    elif data == "listening_news":
+        return 'listening_news'
+    elif data == "listening_audiomate":
+        return 'listening_audiomate'
+    elif data == "back_to_listening":
+        return 'back_to_listening'
+    elif data == "mini_app":
+        return 'mini_app'
+    elif data == "back_to_miniapp":
+        return 'back_to_miniapp'
+    elif data.startswith("vocab_"):
+        return 'vocab_*', (data.replace("vocab_", ""),)
+    elif data.startswith("grammar_"):
+        return 'grammar_*', (data.replace("grammar_", ""),)
+    elif data.startswith("word_match_"):
+        return 'word_match_*', (data.replace("word_match_", ""),)
+    elif data.startswith("fill_blank_"):
+        return 'fill_blank_*', (data.replace("fill_blank_", ""),)
+    elif data == "daily_challenge":
+        return 'daily_challenge'
+    elif data == "progress_stats":
+        return 'progress_stats'
+
+
+def build_router():
+    router = CallbackRouter()
+    for key in EXACT:
+        router.add(key, None)
+    for prefix in PREFIXES:
+        parse = None
+        if prefix == 'book_':
+            def parse(rest):
+                level, book_index = rest.rsplit('_', 1)
+                return level, int(book_index)
+        router.add_prefix(prefix, None, parse)
+    return router
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    router = build_router()
+
+    for data in EXACT + SAMPLE:
+        route, args = router.resolve(data)
+        expected = old_chain(data)
+        assert (route.name if not args else (route.name, tuple(args))) == expected, data
+
+    calls = iterations * len(SAMPLE)
+    chain_s = timeit.timeit(lambda: [old_chain(data) for data in SAMPLE], number=iterations)
+    router_s = timeit.timeit(lambda: [router.resolve(data) for data in SAMPLE], number=iterations)
+
+    print(f"🔀 Callback dispatch, {calls} lookups")
+    print("=" * 50)
+    print(f"if/elif chain:   {chain_s / calls * 1e9:7.0f} ns/lookup")
+    print(f"CallbackRouter:  {router_s / calls * 1e9:7.0f} ns/lookup ({chain_s / router_s:.1f}x)")
+    uncached = build_router()
+    uncached.cache_size = 0
+    uncached_s = timeit.timeit(lambda: [uncached.resolve(data) for data in SAMPLE], number=iterations)
+    print(f"  without cache: {uncached_s / calls * 1e9:7.0f} ns/lookup")
+    number = iterations * 10
+    for data in ('writing', 'fill_blank_answer_3', 'progress_stats'):
+        chain_one = timeit.timeit(lambda: old_chain(data), number=number)
+        router_one = timeit.timeit(lambda: router.resolve(data), number=number)
+        print(f"  {data:<22} chain {chain_one / number * 1e9:5.0f} ns, router {router_one / number * 1e9:5.0f} ns")
+    packed = pack(ANSWER, 'fill_blank', 3, 2)
+    decode_s = timeit.timeit(lambda: unpack(packed), number=number)
+    print(f"  packed {packed!r} ({len(packed)} bytes) decodes in {decode_s / number * 1e9:.0f} ns")
+    print("✅ Router and chain agree on every key")
+
+
+if __name__ == '__main__':
+    main()
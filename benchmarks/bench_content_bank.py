@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Quiz content at scale: a synthetic bank (vocabulary per level plus grammar
+questions) loaded the old way, as Python objects in every worker, against
+the compiled, memory-mapped content bank. Each variant runs in a fresh
+process; reported are load time, heap memory per worker (what N workers
+pay N times) and the time to pick one vocabulary question with its
+distractors plus one grammar question.
+
+Usage: python benchmarks/bench_content_bank.py [words_per_level] [grammar_questions]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.content_bank import compile_bank, prepare, read_sources
+
+CHILD = '''
+import json, os, random, sys, time
+sys.path.insert(0, sys.argv[1])
+from utils.content_bank import ContentBank, MemoryBank, prepare, read_sources
+
+def private_kb():
+    # Anonymous memory is the worker's own heap; the mapped bank file is
+    # page cache shared by every process that maps it
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            if line.startswith('Anonymous:'):
+                return int(line.split()[1])
+    return 0
+
+base = private_kb()
+start = time.perf_counter()
+if sys.argv[2] == 'memory':
+    bank = MemoryBank(prepare(read_sources([sys.argv[3]])))
+else:
+    bank = ContentBank(sys.argv[3])
+load_s = time.perf_counter() - start
+
+rng = random.Random(0)
+lookups = 20000
+start = time.perf_counter()
+for _ in range(lookups):
+    word = bank.choice('vocabulary', rng.choice(('beginner', 'intermediate', 'advanced')), rng)
+    bank.related('vocabulary', word, 3, rng)
+    bank.choice('grammar', None, rng)
+lookup_us = (time.perf_counter() - start) / lookups * 1e6
+print(json.dumps({'load_s': load_s, 'private_mb': (private_kb() - base) / 1024, 'lookup_us': lookup_us}))
+'''
+
+
+def synthetic_sources(words_per_level, questions, rng):
+    vocabulary = {}
+    for level in ('beginner', 'intermediate', 'advanced'):
+        vocabulary[level] = [
+            {
+                'word': f'{level[:3]}word{i}',
+                'pos': rng.choice(('noun', 'verb', 'adjective')),
+                'definition': f'Definition number {i} for the {level} list, long enough to be realistic',
+                'example': f'This sentence uses {level[:3]}word{i} in context.',
+            }
+            for i in range(words_per_level)
+        ]
+    grammar = [
+        {
+            'question': f'Choose the correct form number {i}: "She ___ to the store yesterday."',
+            'options': ['go', 'goes', 'went', 'going'],
+            'correct': 2,
+            'explanation': '"Went" is the past tense of "go" and matches with "yesterday".',
+        }
+        for i in range(questions)
+    ]
+    return {'vocabulary': vocabulary, 'grammar': grammar}
+
+
+def run(mode, path):
+    result = subprocess.run([sys.executable, '-c', CHILD, ROOT, mode, path], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    words_per_level = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'content.json')
+        bank_path = os.path.join(directory, 'content.bank')
+        with open(source_path, 'w') as source:
+            json.dump(synthetic_sources(words_per_level, questions, rng), source)
+
+        start = time.perf_counter()
+        records = compile_bank(prepare(read_sources([source_path])), bank_path)
+        build_s = time.perf_counter() - start
+
+        print(f"📦 Content bank: {records:,} records, {os.path.getsize(bank_path) / 1e6:.1f} MB, built in {build_s:.1f} s")
+        print("=" * 50)
+        for name, mode, path in (('objects', 'memory', source_path), ('mmap bank', 'mmap', bank_path)):
+            result = run(mode, path)
+            print(f"{name:<14} load {result['load_s'] * 1000:7.0f} ms, "
+                  f"{result['private_mb']:6.1f} MB heap per worker, "
+                  f"{result['lookup_us']:5.1f} µs per question")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Daily challenge taps: the old handler picked a random challenge and built
+its text and keyboard on every tap; the service derives the day's
+challenge once and serves cached screens. Reports time per tap for both
+(through a stub message edit) and checks that every process derives the
+same challenge for a date.
+
+Usage: python benchmarks/bench_daily_challenge.py [taps]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from services.daily_challenge_service import KINDS, DailyChallengeService
+from utils.content_bank import load_content_bank
+from utils.render_cache import RenderCache
+from utils.storage import MemoryBackend, StateStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Query:
+    def __init__(self, user_id):
+        self.from_user = type('User', (), {'id': user_id})()
+        self.message = None
+
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None):
+        pass
+
+
+async def old_tap(query, streak):
+    kind = random.choice(KINDS)
+    message = f"""🏆 **Daily Challenge - {kind.title}**
+
+Today's challenge: {kind.goal}
+
+**Reward:** +{kind.bonus} bonus points
+**Current streak:** {streak} days"""
+    keyboard = [
+        [InlineKeyboardButton("🎯 Accept Challenge", callback_data=f"{kind.game}_quiz")],
+        [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
+    ]
+    await query.edit_message_text(message, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+
+
+def main():
+    taps = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    bank = load_content_bank(os.path.join(ROOT, 'content', 'quiz_content.bank'), [os.path.join(ROOT, 'content', 'quiz_content.json')])
+    service = DailyChallengeService(StateStore(MemoryBackend()), bank, lambda *args: None, RenderCache())
+    queries = [Query(user_id) for user_id in range(1000)]
+
+    print(f"🏆 Daily challenge: {taps:,} taps")
+    print("=" * 50)
+
+    async def run_old():
+        for i in range(taps):
+            await old_tap(queries[i % len(queries)], i % 7)
+
+    async def run_service():
+        for i in range(taps):
+            await service.show(queries[i % len(queries)])
+
+    for name, run in (('build per tap', run_old), ('cached screens', run_service)):
+        start = time.perf_counter()
+        asyncio.run(run())
+        print(f"{name:<16} {(time.perf_counter() - start) / taps * 1e6:6.1f} µs per tap")
+
+    other = DailyChallengeService(StateStore(MemoryBackend()), bank, lambda *args: None, RenderCache())
+    days = [date(2026, 1, 1) + timedelta(days=i) for i in range(365)]
+    assert all(service.generate(day) == other.generate(day) for day in days)
+    print(f"Same challenge from two services for all {len(days)} days of a year")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Picks vocabulary quiz options from a synthetic word bank: the old handler
+code (flatten every definition, filter out the answer, sample) against
+the distractors DistractorIndex precomputes into the content bank.
+Reports the index build time, time per question, and how often the picked
+distractors share the word's part of speech.
+
+Usage: python benchmarks/bench_distractors.py [words_per_level] [questions]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content_bank import MemoryBank, prepare
+
+POS = ('noun', 'verb', 'adjective', 'adverb')
+SUFFIXES = {'noun': ('tion', 'ness', 'ment'), 'verb': ('ate', 'ify', 'ise'), 'adjective': ('ous', 'ive', 'able'), 'adverb': ('ly',)}
+
+
+def synthetic_vocabulary(words_per_level, rng):
+    vocabulary = {}
+    for level in ('beginner', 'intermediate', 'advanced'):
+        items = []
+        for i in range(words_per_level):
+            pos = rng.choice(POS)
+            stem = ''.join(rng.choice('abcdefghijklmnoprstuvw') for _ in range(rng.randint(3, 8)))
+            word = stem + rng.choice(SUFFIXES[pos])
+            items.append({'word': word, 'pos': pos, 'definition': f'{pos} {level} {i} {word}', 'example': ''})
+        vocabulary[level] = items
+    return vocabulary
+
+
+def old_options(vocabulary, word_data, rng):
+    all_definitions = []
+    for vocab_level in vocabulary.values():
+        all_definitions.extend([v['definition'] for v in vocab_level])
+    wrong_definitions = [d for d in all_definitions if d != word_data['definition']]
+    return rng.sample(wrong_definitions, 3)
+
+
+def measure(name, pick, words, questions, pos_of, rng):
+    same_pos = 0
+    start = time.perf_counter()
+    for _ in range(questions):
+        word_data = rng.choice(words)
+        picks = pick(word_data)
+        same_pos += sum(pos_of[d] == word_data['pos'] for d in picks)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<18} {elapsed / questions * 1e6:10.1f} µs/question, "
+          f"{same_pos / (questions * 3):6.1%} same part of speech")
+    return elapsed / questions
+
+
+def main():
+    words_per_level = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(1)
+    vocabulary = synthetic_vocabulary(words_per_level, rng)
+    vocabulary_banks = {'vocabulary': vocabulary}
+    words = [item for items in vocabulary.values() for item in items]
+    pos_of = {item['definition']: item['pos'] for item in words}
+
+    print(f"🧩 Distractors for {len(words):,} words ({questions} questions)")
+    print("=" * 50)
+    start = time.perf_counter()
+    bank = MemoryBank(prepare(vocabulary_banks))
+    print(f"Index build: {time.perf_counter() - start:.2f} s")
+
+    old = measure('flatten + sample', lambda item: old_options(vocabulary, item, rng), words, questions, pos_of, rng)
+    new = measure('precomputed', lambda item: [d['definition'] for d in bank.related('vocabulary', item, 3, rng)], words, questions * 100, pos_of, rng)
+    print(f"Speedup: {old / new:,.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Essay assessment: times the local pre-scorer on essays of different
+lengths, a resubmitted essay (a cache hit), and counts how many of a
+mixed batch of essays would still be sent to the AI tutor.
+
+Usage: python benchmarks/bench_essay_scorer.py [essays]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.essay_scorer import EssayScorer
+from utils.writing_checker import WritingChecker, load_word_frequencies
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SENTENCES = [
+    "Last summer I travelled to the coast with my family.",
+    "We stayed in a small hotel near the beach and swam every morning.",
+    "The weather was hot, but the evenings were pleasant and quiet.",
+    "I practised my English with the people who worked in the shops.",
+    "Reading helps me relax after a long day at school.",
+    "My favourite books are adventure stories and detective novels.",
+    "Technology has changed the way young people learn and communicate.",
+    "Many students use their phones to look up new words.",
+]
+MISTAKES = [
+    "Yesterday i goed to the market becuase we needed bread.",
+    "He don't like a apple, and there is many reasons for that.",
+    "We could of visited the museum if we had more time.",
+    "Their is a big problem with the the traffic in my city.",
+]
+
+
+def essay(rng, sentences, mistakes):
+    parts = [rng.choice(SENTENCES) for _ in range(sentences)] + [rng.choice(MISTAKES) for _ in range(mistakes)]
+    rng.shuffle(parts)
+    return " ".join(parts)
+
+
+def main():
+    essays = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1)
+    start = time.perf_counter()
+    frequencies = load_word_frequencies(os.path.join(ROOT, 'content', 'word_frequencies.txt'))
+    load_s = time.perf_counter() - start
+    scorer = EssayScorer(WritingChecker(frequencies), max_texts=essays)
+    scorer.checker.warm_up()
+
+    print(f"📝 Essay scoring ({len(frequencies):,} known words, loaded in {load_s * 1000:.1f} ms)")
+    print("=" * 50)
+    for sentences in (3, 10, 30):
+        texts = [essay(rng, sentences, rng.randrange(3)) + f" Essay {i}." for i in range(200)]
+        words = len(texts[0].split())
+        start = time.perf_counter()
+        for text in texts:
+            scorer.score(text)
+        elapsed = (time.perf_counter() - start) / len(texts)
+        print(f"~{words:3d} words:            {elapsed * 1000:6.2f} ms per essay")
+
+    text = texts[0]
+    start = time.perf_counter()
+    for _ in range(1000):
+        scorer.score(text)
+    print(f"Resubmitted essay:     {(time.perf_counter() - start) / 1000 * 1e6:6.1f} µs (cache hit)")
+
+    batch = [essay(rng, rng.choice((2, 4, 8, 12)), rng.choice((0, 0, 0, 1, 2))) + f" Essay {i}." for i in range(essays)]
+    needs_ai = sum(1 for text in batch if scorer.score(text)[1].needs_ai)
+    print(f"Sent to the AI tutor:  {needs_ai}/{essays} essays ({needs_ai / essays:.0%}); the rest answered locally")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Game engine answer path: a multiple-choice quiz over synthetic items,
+answered through GameEngine.answer() with a stub message edit. Reports
+time and bytes allocated per answer (tracemalloc) and the size of a
+session held as a slotted GameSession against the same fields in a dict.
+
+Usage: python benchmarks/bench_game_engine.py [answers]
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.game_engine import GameEngine, GameSession, QuizGame
+
+
+class Query:
+    def __init__(self, user_id):
+        self.from_user = type('User', (), {'id': user_id})()
+        self.message = None
+
+    async def answer(self, text=None):
+        pass
+
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None):
+        pass
+
+
+class Render:
+    async def edit(self, query, text, reply_markup=None, parse_mode=None):
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+
+
+ITEMS = [{'id': f'q{i}', 'question': f'Question {i}?', 'options': ['one', 'two', 'three', 'four'], 'correct': i % 4}
+         for i in range(1000)]
+
+
+class BenchQuiz(QuizGame):
+    # Callback data packs the game name from a fixed table
+    name = 'grammar'
+    title = "Bench"
+    complete_title = "Done"
+    total = 5
+    restart = ("Again", "grammar_quiz")
+
+    def next_item(self, user_id, previous):
+        return ITEMS[(int(previous['id'][1:]) + 1) % len(ITEMS) if previous else 0]
+
+    def ask(self, item):
+        return item['question'], item['options'], item['correct']
+
+
+async def play(engine, query, answers):
+    done = 0
+    while done < answers:
+        await engine.start(query, 'grammar')
+        session = engine.sessions[query.from_user.id]
+        while query.from_user.id in engine.sessions and done < answers:
+            await engine.answer(query, None, 'grammar', session.question, session.correct)
+            done += 1
+
+
+def main():
+    answers = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    engine = GameEngine({}, Render())
+    engine.add(BenchQuiz())
+    query = Query(1)
+
+    print(f"🎮 Game engine: {answers:,} answers")
+    print("=" * 50)
+    start = time.perf_counter()
+    asyncio.run(play(engine, query, answers))
+    elapsed = time.perf_counter() - start
+    print(f"Time per answer:      {elapsed / answers * 1e6:7.1f} µs (engine: {engine.stats()['grammar']['avg_ms'] * 1000:.1f} µs)")
+
+    tracemalloc.start()
+    asyncio.run(play(engine, query, answers))
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics('filename'))
+    print(f"Retained after run:   {allocated / 1024:7.1f} KB (peak {peak / 1024:.1f} KB)")
+
+    session = GameSession(game='grammar', total=5, item=ITEMS[0], options=ITEMS[0]['options'])
+    as_dict = session.to_dict()
+    print(f"Session object:       {sys.getsizeof(session):7} bytes slotted vs {sys.getsizeof(as_dict)} as a dict")
+
+
+if __name__ == '__main__':
+    main()
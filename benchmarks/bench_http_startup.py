@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup time and memory of the health endpoint: Flask's development server
+in a daemon thread (the old setup) against utils.http_server on the asyncio
+loop. Each variant runs in a fresh process that also imports
+python-telegram-bot, like the bot does. The time is measured from spawn to
+the first 200 from /health; RSS is read from /proc once it answers.
+
+Usage: python benchmarks/bench_http_startup.py [runs]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLASK_CHILD = '''
+import sys, threading, time
+import telegram
+from flask import Flask
+app = Flask(__name__)
+@app.route('/health')
+def health():
+    return {'status': 'healthy'}, 200
+threading.Thread(target=app.run, kwargs={'host': '127.0.0.1', 'port': int(sys.argv[1])}, daemon=True).start()
+time.sleep(60)
+'''
+
+ASYNC_CHILD = '''
+import asyncio, sys
+sys.path.insert(0, sys.argv[2])
+import telegram
+from utils.http_server import HTTPServer
+async def health(request):
+    return 200, {'status': 'healthy'}
+async def main():
+    server = HTTPServer('127.0.0.1', int(sys.argv[1]))
+    server.route('GET', '/health', health)
+    await server.start()
+    await asyncio.sleep(60)
+asyncio.run(main())
+'''
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run(code):
+    port = free_port()
+    start = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, '-c', code, str(port), ROOT],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as response:
+                    if response.status == 200:
+                        break
+            except OSError:
+                if child.poll() is not None:
+                    raise RuntimeError('server process exited')
+                time.sleep(0.005)
+        return time.perf_counter() - start, rss_mb(child.pid)
+    finally:
+        child.kill()
+        child.wait()
+
+
+def measure(name, code, runs):
+    results = [run(code) for _ in range(runs)]
+    seconds = statistics.median(result[0] for result in results)
+    rss = statistics.median(result[1] for result in results)
+    print(f"{name:<26} {seconds * 1000:7.0f} ms to first /health, {rss:6.1f} MB RSS")
+    return seconds, rss
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"🩺 Health endpoint startup (median of {runs} runs)")
+    print("=" * 50)
+    new_s, new_rss = measure('asyncio HTTPServer', ASYNC_CHILD, runs)
+    try:
+        import flask  # noqa: F401
+    except ImportError:
+        print("Flask is not installed; skipping the old setup")
+        return
+    old_s, old_rss = measure('Flask thread (old)', FLASK_CHILD, runs)
+    print(f"Saved: {(old_s - new_s) * 1000:.0f} ms startup, {old_rss - new_rss:.1f} MB RSS")
+
+
+if __name__ == '__main__':
+    main()
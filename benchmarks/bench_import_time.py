@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Cold-start import profile of main.py using `python -X importtime`.
+Prints the slowest top-level and project modules and fails when the total
+import time exceeds the budget, or when a module that should load lazily
+(Gemini client, requests, Flask) is imported at startup.
+
+Usage: python benchmarks/bench_import_time.py [budget_ms] [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only loaded on first use (see GeminiService.model and VoiceService)
+LAZY_MODULES = ('google.generativeai', 'requests', 'flask')
+PROJECT_PREFIXES = ('config', 'services.', 'utils.')
+
+
+def profile():
+    """Return {module: (self_us, cumulative_us, depth)} for one cold import of main"""
+    env = dict(os.environ, TELEGRAM_BOT_TOKEN='benchmark', GEMINI_API_KEY='benchmark', STATE_BACKEND='memory')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # One leading space for top-level imports, two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 700
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    profiles = [profile() for _ in range(runs)]
+    totals = [p['main'][1] / 1000 for p in profiles]
+    total_ms = statistics.median(totals)
+    modules = profiles[-1]
+
+    print(f"⏱️  import main: {total_ms:.0f} ms (median of {runs}, budget {budget_ms:.0f} ms)")
+    print("=" * 50)
+    direct = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in modules.items() if depth == 1),
+        key=lambda item: -item[1]
+    )
+    for name, cumulative in direct[:10]:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+    project = sorted(
+        ((name, cumulative) for name, (_, cumulative, _) in modules.items() if name.startswith(PROJECT_PREFIXES)),
+        key=lambda item: -item[1]
+    )
+    print("Project modules:")
+    for name, cumulative in project[:8]:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    eager = [name for name in modules if any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES)]
+    assert not eager, f"imported at startup but should be lazy: {sorted(eager)[:5]}"
+    assert total_ms <= budget_ms, f"import main took {total_ms:.0f} ms, budget is {budget_ms:.0f} ms"
+    print("✅ Within budget and heavy clients stay lazy")
+
+
+if __name__ == '__main__':
+    main()
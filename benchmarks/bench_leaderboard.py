@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Leaderboards for many users: compares answering "your rank" and "top 10"
+by sorting every user's total on each request with the incrementally
+maintained skip-list boards, and times the rebuild at startup: one sort and
+a linear bulk build per board against inserting every user in turn.
+
+Usage: python benchmarks/bench_leaderboard.py [users]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.adaptive import LEVEL_DIFFICULTY
+from utils.leaderboard import Leaderboards
+from utils.user_records import UserProgress
+
+
+def sorted_rank(progress_by_user, user_id):
+    """The per-request approach: sort everyone, then look the user up"""
+    ranking = sorted(progress_by_user, key=lambda uid: (-(progress_by_user[uid].vocab_score + progress_by_user[uid].grammar_score), uid))
+    return ranking.index(user_id) + 1, ranking[:10]
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(1)
+    levels = list(LEVEL_DIFFICULTY)
+    progress_by_user = {
+        user_id: UserProgress(vocab_score=rng.randrange(500), grammar_score=rng.randrange(300), level=rng.choice(levels))
+        for user_id in range(users)
+    }
+    boards = Leaderboards({}, levels, rng=random.Random(2))
+
+    print(f"🏆 Leaderboards for {users:,} users")
+    print("=" * 50)
+    start = time.perf_counter()
+    boards.load(progress_by_user)
+    print(f"Build from progress:   {time.perf_counter() - start:6.2f} s")
+
+    lookups = 200
+    sample = [rng.randrange(users) for _ in range(lookups)]
+    start = time.perf_counter()
+    for user_id in sample[:20]:
+        sorted_rank(progress_by_user, user_id)
+    sort_s = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for user_id in sample:
+        boards.overall.rank(user_id)
+        boards.overall.top(10)
+    board_s = (time.perf_counter() - start) / lookups
+    print(f"Rank + top 10:         {sort_s * 1000:8.2f} ms sorting vs {board_s * 1e6:.1f} µs from the board")
+
+    updates = 100_000
+    start = time.perf_counter()
+    for _ in range(updates):
+        user_id = rng.randrange(users)
+        progress = progress_by_user[user_id]
+        progress.vocab_score += 3
+        boards.update(user_id, progress, gained=3)
+    print(f"Score update:          {(time.perf_counter() - start) / updates * 1e6:8.1f} µs (global, level and weekly)")
+
+    # A restarted process holds one set of boards
+    weekly_points = boards.weekly_points
+    del boards
+    restarted = Leaderboards(weekly_points, levels, rng=random.Random(3))
+    start = time.perf_counter()
+    restarted.load(progress_by_user)
+    bulk_s = time.perf_counter() - start
+    assert restarted.overall.top(10) == sorted_top(progress_by_user)
+    del restarted
+    restarted = Leaderboards(weekly_points, levels, rng=random.Random(3))
+    start = time.perf_counter()
+    for user_id, progress in progress_by_user.items():
+        restarted.update(user_id, progress)
+    insert_s = time.perf_counter() - start
+    print(f"Restart:               {bulk_s:6.2f} s sorted bulk build vs {insert_s:.2f} s inserting users one by one")
+
+
+def sorted_top(progress_by_user):
+    return [(uid, progress_by_user[uid].vocab_score + progress_by_user[uid].grammar_score)
+            for uid in sorted_rank(progress_by_user, 0)[1]]
+
+
+if __name__ == '__main__':
+    main()
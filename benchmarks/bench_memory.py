@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for per-user records.
+Reports bytes per user for the old dict/list layout and the compact one.
+
+Usage: python benchmarks/bench_memory.py [users]
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'benchmark')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+from config import RATE_LIMIT_PER_USER
+from utils.rate_limiter import SlidingWindowRateLimiter
+from utils.user_records import UserProgress
+
+
+def measure(build, users):
+    """Return bytes allocated per user by build(users)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(users)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / users
+
+
+def progress_dicts(users):
+    return {
+        user_id: {'vocab_score': 0, 'grammar_score': 0, 'games_played': 0, 'streak_days': 0, 'level': 'beginner'}
+        for user_id in range(users)
+    }
+
+
+def progress_records(users):
+    return {user_id: UserProgress() for user_id in range(users)}
+
+
+def limiter_lists(users):
+    # Layout of the previous RateLimiter: a list of float timestamps per user
+    now = time.time() * 1000
+    user_requests = defaultdict(list)
+    for user_id in range(users):
+        user_requests[user_id] = [now + i for i in range(RATE_LIMIT_PER_USER)]
+    return user_requests
+
+
+def limiter_windows(users):
+    limiter = SlidingWindowRateLimiter()
+    for user_id in range(users):
+        for _ in range(RATE_LIMIT_PER_USER):
+            limiter.is_rate_limited(user_id)
+    return limiter
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"📏 Bytes per user ({users} users, {RATE_LIMIT_PER_USER} requests each)")
+    print("=" * 50)
+    rows = [
+        ('user_progress', progress_dicts, progress_records),
+        ('rate limiter', limiter_lists, limiter_windows),
+    ]
+    for name, before, after in rows:
+        old = measure(before, users)
+        new = measure(after, users)
+        print(f"{name:15} before: {old:7.1f}  after: {new:7.1f}  saved: {100 * (1 - new / old):.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the rate limiters under many users.
+Compares the original list-based limiter, the ring-buffer RateLimiter and
+the SlidingWindowRateLimiter on check cost and memory.
+
+Usage: python benchmarks/bench_rate_limiter.py [users] [checks]
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'benchmark')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+from config import RATE_LIMIT_PER_USER, RATE_LIMIT_WINDOW_MS
+from utils.rate_limiter import SlidingWindowRateLimiter
+
+
+class ListRateLimiter:
+    """The original implementation, kept here as the baseline"""
+
+    def __init__(self):
+        self.user_requests = defaultdict(list)
+
+    def is_rate_limited(self, user_id):
+        now = time.time() * 1000
+        valid_requests = [
+            timestamp for timestamp in self.user_requests[user_id]
+            if now - timestamp < RATE_LIMIT_WINDOW_MS
+        ]
+        if len(valid_requests) >= RATE_LIMIT_PER_USER:
+            return True
+        valid_requests.append(now)
+        self.user_requests[user_id] = valid_requests
+        return False
+
+    def get_remaining_requests(self, user_id):
+        now = time.time() * 1000
+        valid_requests = [
+            timestamp for timestamp in self.user_requests[user_id]
+            if now - timestamp < RATE_LIMIT_WINDOW_MS
+        ]
+        return max(0, RATE_LIMIT_PER_USER - len(valid_requests))
+
+
+class RateLimiter:
+    """Sliding-log rate limiter with struct-of-arrays storage (the one
+    SlidingWindowRateLimiter replaced).
+
+    Each user gets a dense index into flat arrays instead of a list of float
+    objects: ``timestamps`` holds a ring of the last RATE_LIMIT_PER_USER
+    accepted requests (ms) per user and ``heads`` the oldest ring position.
+    """
+
+    def __init__(self, limit=RATE_LIMIT_PER_USER, window_ms=RATE_LIMIT_WINDOW_MS):
+        self.limit = limit
+        self.window_ms = window_ms
+        self.user_index = {}
+        self.timestamps = array('d')
+        self.heads = array('H')
+
+    def _index(self, user_id):
+        index = self.user_index.get(user_id)
+        if index is None:
+            index = len(self.user_index)
+            self.user_index[user_id] = index
+            self.timestamps.extend([0.0] * self.limit)
+            self.heads.append(0)
+        return index
+
+    def is_rate_limited(self, user_id):
+        """Check if user is rate limited"""
+        now = time.time() * 1000  # Convert to milliseconds
+        index = self._index(user_id)
+        head = self.heads[index]
+        base = index * self.limit
+
+        # The ring is full of requests inside the window
+        if now - self.timestamps[base + head] < self.window_ms:
+            return True
+
+        # Add current request over the oldest one
+        self.timestamps[base + head] = now
+        self.heads[index] = (head + 1) % self.limit
+
+        return False
+
+    def get_remaining_requests(self, user_id):
+        """Get remaining requests for user"""
+        index = self.user_index.get(user_id)
+        if index is None:
+            return self.limit
+
+        now = time.time() * 1000
+        base = index * self.limit
+        used = sum(
+            1 for timestamp in self.timestamps[base:base + self.limit]
+            if now - timestamp < self.window_ms
+        )
+
+        return max(0, self.limit - used)
+
+    def get_time_until_reset(self, user_id):
+        """Get time until rate limit resets"""
+        index = self.user_index.get(user_id)
+        if index is None:
+            return 0
+
+        now = time.time() * 1000
+        base = index * self.limit
+        valid_requests = [
+            timestamp for timestamp in self.timestamps[base:base + self.limit]
+            if now - timestamp < self.window_ms
+        ]
+        if not valid_requests:
+            return 0
+
+        reset_time = min(valid_requests) + self.window_ms
+        return max(0, reset_time - now)
+
+
+def run(limiter_class, users, checks):
+    gc.collect()
+    tracemalloc.start()
+    limiter = limiter_class()
+
+    # Warm up: every user sends a few requests
+    for user_id in range(users):
+        for _ in range(RATE_LIMIT_PER_USER // 2):
+            limiter.is_rate_limited(user_id)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    user_ids = [random.randrange(users) for _ in range(checks)]
+    start = time.perf_counter()
+    for user_id in user_ids:
+        limiter.is_rate_limited(user_id)
+    check_ns = (time.perf_counter() - start) / checks * 1e9
+
+    start = time.perf_counter()
+    for user_id in user_ids:
+        limiter.get_remaining_requests(user_id)
+    remaining_ns = (time.perf_counter() - start) / checks * 1e9
+
+    return check_ns, remaining_ns, memory / users
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    checks = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+    print(f"⏱️  Rate limiter benchmark ({users} users, {checks} checks)")
+    print("=" * 70)
+    print(f"{'limiter':28}{'check ns':>12}{'remaining ns':>15}{'bytes/user':>13}")
+    for limiter_class in (ListRateLimiter, RateLimiter, SlidingWindowRateLimiter):
+        check_ns, remaining_ns, per_user = run(limiter_class, users, checks)
+        print(f"{limiter_class.__name__:28}{check_ns:12.0f}{remaining_ns:15.0f}{per_user:13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Outbound dispatcher: floods a few hot chats (far over their per-chat
+rate) next to one-off bulk sends and interactive replies. Checks that
+every request goes out, that no chat exceeds its bucket and that
+interactive replies overtake bulk sends, and times one dispatch while
+thousands of throttled requests are queued.
+
+Usage: python benchmarks/bench_send_queue.py [hot_chats] [per_hot_chat]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.send_queue import PRIORITY_BULK, PRIORITY_INTERACTIVE, OutboundDispatcher
+
+GLOBAL_RATE = 2000
+CHAT_RATE = 20
+# Tasks resume a few ms after their request is released
+JITTER_S = 0.005
+CHAT_BURST = 3
+
+
+async def flood(dispatcher, hot_chats, per_hot_chat):
+    loop = asyncio.get_running_loop()
+    sent = []
+
+    async def send(chat_id, priority):
+        async def callback():
+            sent.append((loop.time(), chat_id, priority))
+        await dispatcher.process_request(callback, (), {}, 'sendMessage', {'chat_id': chat_id}, priority)
+
+    requests = [send(chat_id, PRIORITY_BULK) for chat_id in range(hot_chats) for _ in range(per_hot_chat)]
+    requests += [send(1000 + i, PRIORITY_BULK) for i in range(hot_chats * 10)]
+    requests += [send(100000 + i, PRIORITY_INTERACTIVE) for i in range(hot_chats * 10)]
+    start = time.perf_counter()
+    await asyncio.gather(*requests)
+    return time.perf_counter() - start, sent
+
+
+def violations(sent):
+    """Chats whose sends did not fit their token bucket"""
+    interval, tolerance = 1 / CHAT_RATE, (CHAT_BURST - 1) / CHAT_RATE
+    tat = {}
+    bad = set()
+    for at, chat_id, _ in sent:
+        expected = tat.get(chat_id, 0.0)
+        if at < expected - tolerance - JITTER_S:
+            bad.add(chat_id)
+        tat[chat_id] = max(expected, at) + interval
+    return bad
+
+
+async def time_dispatch(throttled):
+    """Seconds per dispatch of a ready bulk send while `throttled`
+    interactive replies wait for their chats' tokens"""
+    dispatcher = OutboundDispatcher(global_rate=1e9, chat_rate=1e-3, chat_burst=1)
+    dispatcher.wakeup = asyncio.Event()
+    for chat_id in range(10):
+        dispatcher._chat_bucket(chat_id).consume(0.0)  # throttled for ~1000 s
+    # No dispatch task runs: the requests stay queued and are popped below
+    tasks = [asyncio.create_task(dispatcher._acquire(PRIORITY_INTERACTIVE, i % 10)) for i in range(throttled)]
+    tasks += [asyncio.create_task(dispatcher._acquire(PRIORITY_BULK, 100 + i)) for i in range(1000)]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    for _ in range(1000):
+        chat_id, future, _ = dispatcher._pop_ready(0.0)
+        dispatcher._schedule(chat_id, dispatcher.chat_queues[chat_id], 0.0)
+    elapsed = (time.perf_counter() - start) / 1000
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed
+
+
+async def main():
+    hot_chats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    per_hot_chat = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    dispatcher = OutboundDispatcher(GLOBAL_RATE, CHAT_RATE, CHAT_BURST)
+    await dispatcher.initialize()
+    elapsed, sent = await flood(dispatcher, hot_chats, per_hot_chat)
+    await dispatcher.shutdown()
+
+    total = hot_chats * per_hot_chat + hot_chats * 20
+    print(f"📤 {total} sends: {hot_chats} hot chats x {per_hot_chat}, plus one-off bulk and interactive")
+    print("=" * 50)
+    print(f"Wall time:              {elapsed:.2f}s ({len(sent) / elapsed:.0f} msg/s, global limit {GLOBAL_RATE}/s)")
+    interactive = [i for i, (_, _, priority) in enumerate(sent) if priority == PRIORITY_INTERACTIVE]
+    print(f"Last interactive reply: send {interactive[-1] + 1} of {len(sent)}")
+    for throttled in (100, 10000):
+        print(f"Dispatch, {throttled:5d} throttled: {await time_dispatch(throttled) * 1e6:6.1f} µs")
+
+    assert len(sent) == total
+    assert not violations(sent), sorted(violations(sent))[:5]
+    assert interactive[-1] < len(sent) // 2, "interactive replies waited behind bulk sends"
+    print("✅ Every chat stayed within its bucket and interactive replies went first")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
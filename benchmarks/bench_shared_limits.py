@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Multi-process check for the shared rate limiter and session store.
+Several worker processes hammer the same users at once; the number of
+accepted requests per user must equal the limit across all processes.
+Quiz sessions started in one process must be continued by the next,
+also when two stores take turns with no pause between the taps.
+
+Usage: python benchmarks/bench_shared_limits.py [workers] [users] [attempts]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', 'benchmark')
+os.environ.setdefault('GEMINI_API_KEY', 'benchmark')
+
+from config import RATE_LIMIT_PER_USER
+from utils.shared_state import SharedDatabase, SharedRateLimiter, SharedSessionStore
+
+# One long window so the check cannot straddle a window boundary
+WINDOW_MS = 3600 * 1000
+
+
+def limiter_worker(path, users, attempts):
+    limiter = SharedRateLimiter(SharedDatabase(path), window_ms=WINDOW_MS)
+    accepted = [0] * users
+    for _ in range(attempts):
+        for user_id in range(users):
+            if not limiter.is_rate_limited(user_id):
+                accepted[user_id] += 1
+    return accepted
+
+
+async def play_turns(sessions, worker_id, users):
+    for user_id in range(users):
+        await sessions.checkout(user_id)
+        game = sessions.get(user_id)
+        if game is None:
+            sessions[user_id] = {'score': 0, 'players': []}
+            game = sessions[user_id]
+        game['score'] += 1
+        game['players'].append(worker_id)
+        await sessions.commit()
+
+
+def session_worker(path, worker_id, users):
+    asyncio.run(play_turns(SharedSessionStore(SharedDatabase(path)), worker_id, users))
+
+
+async def alternate_turns(path, users, turns):
+    """Two stores with their own connections and writer threads, as two
+    processes have, handle a user's taps in turn without any pause"""
+    stores = [SharedSessionStore(SharedDatabase(path)) for _ in range(2)]
+    for turn in range(turns):
+        await play_turns(stores[turn % 2], turn, users)
+    return [stores[0][user_id] for user_id in range(users)]
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    attempts = int(sys.argv[3]) if len(sys.argv) > 3 else 2 * RATE_LIMIT_PER_USER
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'shared.db')
+        print(f"🔒 Shared rate limit: {workers} processes, {users} users, {attempts} attempts each")
+        start = time.perf_counter()
+        with multiprocessing.get_context('spawn').Pool(workers) as pool:
+            results = pool.starmap(limiter_worker, [(path, users, attempts)] * workers)
+        elapsed = time.perf_counter() - start
+
+        totals = [sum(worker[user_id] for worker in results) for user_id in range(users)]
+        checks = workers * users * attempts
+        print(f"Checks: {checks} in {elapsed:.2f}s ({checks / elapsed:.0f}/s)")
+        print(f"Accepted per user: min {min(totals)}, max {max(totals)} (limit {RATE_LIMIT_PER_USER})")
+        assert all(total == RATE_LIMIT_PER_USER for total in totals), 'limit was not enforced globally'
+
+        print(f"🎮 Shared sessions: {workers} processes taking turns on {users} sessions")
+        # A user's updates are handled one at a time, but each turn here
+        # runs in a fresh process
+        with multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+            for worker_id in range(workers):
+                pool.apply(session_worker, (path, worker_id, users))
+        sessions = SharedSessionStore(SharedDatabase(path))
+        games = [sessions[user_id] for user_id in range(users)]
+        assert all(game['score'] == workers for game in games), 'a session update was lost'
+        assert all(game['players'] == list(range(workers)) for game in games), 'sessions were not shared'
+        print(f"Every session was continued by all {workers} processes")
+
+        games = asyncio.run(alternate_turns(os.path.join(directory, 'alternate.db'), users, 20))
+        assert all(game['players'] == list(range(20)) for game in games), 'a session update was lost'
+        print("Taps alternating between two stores back to back all landed")
+
+    print("✅ Limits and sessions are shared across processes")
+
+
+if __name__ == '__main__':
+    main()
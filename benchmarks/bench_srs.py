@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Spaced-repetition scheduling at scale: 1M review cards, either in one deck
+or spread over many users, all due. Each pick takes the user's next due
+card and records an answer (80% correct), which reschedules it. Reports
+microseconds per pick and the stored size of a deck.
+
+Usage: python benchmarks/bench_srs.py [cards] [users]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.srs import Deck, ReviewScheduler
+
+NOW = 1_700_000_000
+
+
+class Clock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+
+def filled_decks(cards, users, rng):
+    """users decks sharing cards cards, all due within the last week"""
+    per_user = cards // users
+    decks = {}
+    for user_id in range(users):
+        decks[user_id] = Deck({
+            f'word{i}': (NOW - rng.randrange(7 * 86400), 1440 * rng.randint(1, 30), 2500, 2)
+            for i in range(per_user)
+        })
+    return decks
+
+
+def measure(name, cards, users, picks, rng):
+    start = time.perf_counter()
+    decks = filled_decks(cards, users, rng)
+    build_s = time.perf_counter() - start
+
+    clock = Clock()
+    scheduler = ReviewScheduler(decks, clock=clock)
+    new_word = lambda: f'new{rng.randrange(1 << 30)}'
+    user_ids = [rng.randrange(users) for _ in range(picks)]
+    answers = [rng.random() < 0.8 for _ in range(picks)]
+
+    start = time.perf_counter()
+    for user_id, correct in zip(user_ids, answers):
+        item = scheduler.next_item(user_id, new_word)
+        scheduler.review(user_id, item, correct)
+        clock.now += 1
+    elapsed = time.perf_counter() - start
+
+    stats = scheduler.stats()
+    print(f"{name:<24} {elapsed / picks * 1e6:6.2f} µs per pick + answer "
+          f"({stats['due_picks']:,} due, {stats['new_picks']:,} new; decks built in {build_s:.1f} s)")
+
+
+def main():
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    picks = 200_000
+    rng = random.Random(1)
+
+    print(f"🧠 Spaced repetition with {cards:,} review cards ({picks:,} picks)")
+    print("=" * 50)
+    measure('one deck', cards, 1, picks, rng)
+    measure(f'{users:,} users', cards, users, picks, rng)
+
+    deck = filled_decks(1000, 1, rng)[0]
+    stored = json.dumps(deck.to_list(), separators=(',', ':'))
+    print(f"Stored deck: {len(stored) / 1000:.1f} bytes per card")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Synthetic update flood through PerChatUpdateProcessor.
+Checks that updates of each chat are handled strictly in arrival order,
+that the concurrency limit holds, and compares wall time with sequential
+processing. A few updates simulate a slow Gemini call: awaited, made
+synchronously in the handler (which stalls every chat), and moved to a
+thread. The event loop's longest stall is reported for each.
+
+Usage: python benchmarks/bench_update_scheduler.py [chats] [updates_per_chat] [limit]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.update_scheduler import PerChatUpdateProcessor
+
+SLOW_CALL_S = 0.3
+SLOW_SHARE = 0.01
+
+
+def make_flood(chats, per_chat):
+    updates = [
+        SimpleNamespace(update_id=None, effective_chat=SimpleNamespace(id=chat_id), sequence=sequence)
+        for chat_id in range(chats)
+        for sequence in range(per_chat)
+    ]
+    # Interleave chats randomly but keep each chat's own order
+    random.shuffle(updates)
+    counters = {}
+    for update_id, update in enumerate(updates):
+        update.update_id = update_id
+        update.sequence = counters.get(update.effective_chat.id, 0)
+        counters[update.effective_chat.id] = update.sequence + 1
+        update.delay = SLOW_CALL_S if random.random() < SLOW_SHARE else random.uniform(0.001, 0.005)
+    return updates
+
+
+async def blocking_call(delay):
+    # A synchronous client call, e.g. GenerativeModel.generate_content
+    time.sleep(delay)
+
+
+async def threaded_call(delay):
+    await asyncio.to_thread(time.sleep, delay)
+
+
+async def watch_loop(lags, interval=0.01):
+    """Record how late the loop wakes this task (its longest stall)"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(updates, limit, slow_call=asyncio.sleep):
+    processor = PerChatUpdateProcessor(limit)
+    handled = {}
+    running = [0]
+    violations = []
+
+    async def handle(update):
+        running[0] += 1
+        if running[0] > limit:
+            violations.append(f'{running[0]} updates running')
+        await (slow_call if update.delay >= SLOW_CALL_S else asyncio.sleep)(update.delay)
+        handled.setdefault(update.effective_chat.id, []).append(update.sequence)
+        running[0] -= 1
+
+    lags = []
+    watcher = asyncio.create_task(watch_loop(lags))
+    start = time.perf_counter()
+    # Same hand-off as Application: one task per update, created in order
+    tasks = [asyncio.create_task(processor.process_update(update, handle(update))) for update in updates]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+    stats = dict(processor.stats(), max_loop_stall=max(lags, default=0))
+
+    for chat_id, sequences in handled.items():
+        if sequences != sorted(sequences):
+            violations.append(f'chat {chat_id} out of order')
+    return elapsed, stats, violations
+
+
+async def main():
+    chats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_chat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    updates = make_flood(chats, per_chat)
+    sequential = sum(update.delay for update in updates)
+    print(f"🌊 Flood: {len(updates)} updates from {chats} chats, limit {limit}")
+    print("=" * 50)
+    elapsed, stats, violations = await run(updates, limit)
+    print(f"Sequential handling would take: {sequential:.2f}s")
+    print(f"Per-chat scheduler:             {elapsed:.2f}s ({len(updates) / elapsed:.0f} updates/s)")
+    print(f"Peak concurrent handlers:       {stats['peak_active']}")
+    print(f"Longest event loop stall:       {stats['max_loop_stall'] * 1000:.0f} ms")
+    assert not violations, violations[:5]
+    print("✅ Every chat was handled in FIFO order within the concurrency limit")
+
+    for name, slow_call in (("Blocking slow call:", blocking_call), ("Slow call in a thread:", threaded_call)):
+        elapsed, stats, violations = await run(updates, limit, slow_call)
+        assert not violations, violations[:5]
+        print(f"{name:31s} {elapsed:.2f}s, longest event loop stall {stats['max_loop_stall'] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
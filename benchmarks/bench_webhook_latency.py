@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Local harness for update delivery latency: webhook vs long polling.
+
+Recorded updates (benchmarks/data/updates.json) are delivered through
+  * webhook: POSTed to the bot's HTTPServer + WebhookReceiver, and
+  * polling: served by a fake getUpdates long-poll endpoint and fetched by
+    a polling loop shaped like python-telegram-bot's Updater.
+Latency is measured from the moment Telegram would send the update until
+it is taken off the application's update queue. ``rtt_ms`` simulates the
+network round trip between Telegram and the bot.
+
+Usage: python benchmarks/bench_webhook_latency.py [rounds] [rtt_ms]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from telegram import Update
+
+from utils.http_server import HTTPServer
+from utils.webhook import WebhookReceiver
+
+UPDATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'updates.json')
+SECRET = 'benchmark-secret'
+
+
+def load_updates(rounds):
+    with open(UPDATES_PATH) as f:
+        recorded = json.load(f)
+    updates = []
+    for round_number in range(rounds):
+        for update in recorded:
+            update = dict(update, update_id=round_number * len(recorded) + update['update_id'])
+            updates.append(update)
+    return updates
+
+
+async def consume(queue, sent_at, latencies, expected):
+    while len(latencies) < expected:
+        update = await queue.get()
+        latencies.append(time.perf_counter() - sent_at[update.update_id])
+
+
+async def run_webhook(updates, one_way):
+    queue = asyncio.Queue()
+    server = HTTPServer('127.0.0.1', 0)
+    server.route('POST', '/telegram', WebhookReceiver(queue, None, SECRET))
+    await server.start()
+
+    sent_at, latencies = {}, []
+    consumer = asyncio.create_task(consume(queue, sent_at, latencies, len(updates)))
+    url = f'http://127.0.0.1:{server.port}/telegram'
+    async with httpx.AsyncClient() as client:
+        for update in updates:
+            sent_at[update['update_id']] = time.perf_counter()
+            await asyncio.sleep(one_way)
+            await client.post(url, json=update, headers={'X-Telegram-Bot-Api-Secret-Token': SECRET})
+            # Users do not tap in lockstep with delivery
+            await asyncio.sleep(0.005)
+    await consumer
+    await server.stop()
+    return latencies
+
+
+async def run_polling(updates, one_way):
+    pending = asyncio.Queue()
+    queue = asyncio.Queue()
+
+    async def get_updates(request):
+        # Long poll: hold the request until at least one update is pending
+        batch = [await pending.get()]
+        while not pending.empty():
+            batch.append(pending.get_nowait())
+        await asyncio.sleep(one_way)
+        return 200, {'ok': True, 'result': batch}
+
+    server = HTTPServer('127.0.0.1', 0)
+    server.route('POST', '/botTOKEN/getUpdates', get_updates)
+    await server.start()
+
+    async def poller():
+        offset = 0
+        async with httpx.AsyncClient(timeout=30) as client:
+            while True:
+                await asyncio.sleep(one_way)
+                response = await client.post(
+                    f'http://127.0.0.1:{server.port}/botTOKEN/getUpdates',
+                    json={'offset': offset, 'timeout': 10}
+                )
+                for data in response.json()['result']:
+                    await queue.put(Update.de_json(data, None))
+                    offset = data['update_id'] + 1
+
+    sent_at, latencies = {}, []
+    consumer = asyncio.create_task(consume(queue, sent_at, latencies, len(updates)))
+    polling = asyncio.create_task(poller())
+    for update in updates:
+        sent_at[update['update_id']] = time.perf_counter()
+        await pending.put(update)
+        await asyncio.sleep(0.005)
+    await consumer
+    polling.cancel()
+    await server.stop()
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:10}{statistics.mean(latencies):10.2f}{statistics.median(latencies):10.2f}{p95:10.2f}{latencies[-1]:10.2f}")
+
+
+async def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rtt_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 40
+    updates = load_updates(rounds)
+    one_way = rtt_ms / 2000
+
+    print(f"📨 Update latency, {len(updates)} updates, simulated RTT {rtt_ms:.0f} ms (ms)")
+    print("=" * 50)
+    print(f"{'mode':10}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}")
+    report('webhook', await run_webhook(updates, one_way))
+    report('polling', await run_polling(updates, one_way))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Writing-mode hints: builds the SymSpell index from the word list, compares
+correcting misspellings by symmetric deletes with generating every word
+one edit away (which also misses anything two edits off), and times full
+spelling and grammar checks on chat-sized messages against the 5 ms
+target.
+
+Usage: python benchmarks/bench_writing_checker.py [messages]
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.writing_checker import WritingChecker, load_word_frequencies
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MESSAGES = [
+    "She go to the store yesterday.",
+    "I have saw this movie before, it was realy good.",
+    "If it will rain tomorrow, we will stay home.",
+    "My sister is very good in mathematics and science.",
+    "There was many people at the party last night.",
+    "Yesterday i goed to the park with my freind and we eated ice cream.",
+    "I am writting a letter to my grandmother becuase it is her birthday.",
+    "We have been learning English for two years and we enjoy it a lot.",
+]
+
+
+def edits1(word):
+    """Every string one insert, delete, replace or swap away from word"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    deletes = [left + right[1:] for left, right in splits if right]
+    swaps = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+    replaces = [left + c + right[1:] for left, right in splits if right for c in string.ascii_lowercase]
+    inserts = [left + c + right for left, right in splits for c in string.ascii_lowercase]
+    return set(deletes + swaps + replaces + inserts)
+
+
+def brute_force(frequencies, word):
+    candidates = [candidate for candidate in edits1(word) if candidate in frequencies]
+    return max(candidates, key=frequencies.get) if candidates else None
+
+
+def misspell(rng, word, edits):
+    for _ in range(edits):
+        i = rng.randrange(len(word))
+        word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:] if rng.random() < 0.5 else word[:i] + word[i + 1:]
+    return word
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(1)
+    frequencies = load_word_frequencies(os.path.join(ROOT, 'content', 'word_frequencies.txt'))
+    checker = WritingChecker(frequencies)
+    start = time.perf_counter()
+    checker.warm_up()
+    print(f"✍️  Writing checker ({len(frequencies):,} words)")
+    print("=" * 50)
+    print(f"SymSpell index:        {time.perf_counter() - start:6.2f} s ({len(checker.speller.deletes):,} keys, built in a thread at startup)")
+
+    words = [word for word in frequencies if len(word) >= 6]
+    typos = [(word, misspell(rng, word, 1 + (i % 2))) for i, word in enumerate(rng.sample(words, 1000))]
+    typos = [(word, typo) for word, typo in typos if typo not in frequencies]
+    start = time.perf_counter()
+    symspell = [checker.speller.lookup(typo) for _, typo in typos]
+    symspell_s = (time.perf_counter() - start) / len(typos)
+    start = time.perf_counter()
+    brute = [brute_force(frequencies, typo) for _, typo in typos]
+    brute_s = (time.perf_counter() - start) / len(typos)
+    found = sum(1 for found in symspell if found is not None)
+    found_brute = sum(1 for found in brute if found is not None)
+    print(f"Correct a typo:        {symspell_s * 1e6:6.1f} µs symmetric deletes vs {brute_s * 1e6:.1f} µs all edits")
+    print(f"Suggestion found:      {found}/{len(typos)} (distance ≤ 2) vs {found_brute}/{len(typos)} (distance 1)")
+
+    timings = []
+    for i in range(messages):
+        text = MESSAGES[i % len(MESSAGES)] + f" ({i})"
+        start = time.perf_counter()
+        checker.check(text)
+        timings.append(time.perf_counter() - start)
+    print(f"Check a message:       p50 {percentile(timings, 0.5) * 1000:.2f} ms, p99 {percentile(timings, 0.99) * 1000:.2f} ms "
+          f"(target 5 ms)")
+    assert percentile(timings, 0.99) < 0.005, "writing hints are slower than 5 ms"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Compile quiz content (JSON/CSV sources) into the memory-mapped content bank
+the bot reads at startup.
+
+Usage: python build_content_bank.py [source ...] [-o output]
+  source   JSON file, CSV file, or bank=file.csv (default: CONTENT_SOURCES)
+  output   bank file to write (default: CONTENT_BANK_PATH)
+"""
+
+import argparse
+import os
+import time
+
+from utils.content_bank import compile_bank, prepare, read_sources
+
+# Same defaults as config.py, without requiring the bot's secrets
+DEFAULT_SOURCES = os.getenv('CONTENT_SOURCES', './content/quiz_content.json').split(',')
+DEFAULT_BANK_PATH = os.getenv('CONTENT_BANK_PATH', './content/quiz_content.bank')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile quiz content into a content bank file')
+    parser.add_argument('sources', nargs='*', default=DEFAULT_SOURCES)
+    parser.add_argument('-o', '--output', default=DEFAULT_BANK_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    banks = prepare(read_sources(args.sources))
+    records = compile_bank(banks, args.output)
+
+    print(f"📦 Wrote {records} records to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB) "
+          f"in {time.perf_counter() - start:.2f} s")
+    for name, groups in banks.items():
+        sizes = ', '.join(f"{group or 'all'}: {len(items)}" for group, items in groups.items())
+        print(f"  {name}: {sizes}")
+
+
+if __name__ == '__main__':
+    main()
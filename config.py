@@ -19,6 +19,54 @@ MAX_MESSAGE_LENGTH = 4096
 RATE_LIMIT_PER_USER = 10
 RATE_LIMIT_WINDOW_MS = 60000  # 1 minute
 
+# Updates from different chats run in parallel up to this limit;
+# updates within one chat are always handled in order
+CONCURRENT_UPDATES = int(os.getenv('CONCURRENT_UPDATES', '16'))
+
+# Outbound flood limits (Telegram allows ~30 msgs/s overall, ~1 msg/s per chat)
+OUTBOUND_GLOBAL_RATE = float(os.getenv('OUTBOUND_GLOBAL_RATE', '30'))
+OUTBOUND_CHAT_RATE = float(os.getenv('OUTBOUND_CHAT_RATE', '1'))
+OUTBOUND_CHAT_BURST = int(os.getenv('OUTBOUND_CHAT_BURST', '3'))
+
 # Voice processing configuration
 VOICE_DOWNLOAD_PATH = './temp/'
-VOICE_FORMAT = 'ogg' 
\ No newline at end of file
+VOICE_FORMAT = 'ogg'
+
+# Persistent user state configuration
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'sqlite')  # 'sqlite' or 'memory'
+STATE_DB_PATH = os.getenv('STATE_DB_PATH', './temp/bot_state.db')
+STATE_FLUSH_INTERVAL_S = float(os.getenv('STATE_FLUSH_INTERVAL_S', '2'))
+
+# Quiz session configuration
+SESSION_IDLE_TTL_S = int(os.getenv('SESSION_IDLE_TTL_S', '1800'))  # 30 minutes
+MAX_GAME_SESSIONS = int(os.getenv('MAX_GAME_SESSIONS', '50000'))
+SESSION_SWEEP_INTERVAL_S = 60
+
+# Shared state for running several bot processes on one host.
+# When set, rate limits and quiz sessions live in this SQLite file.
+SHARED_STATE_PATH = os.getenv('SHARED_STATE_PATH', '')
+
+# Webhook mode: set WEBHOOK_URL (public https base URL) to receive updates
+# over HTTP instead of long polling. The secret token (1-256 of A-Z, a-z,
+# 0-9, _ and -) is what tells Telegram's calls apart from anyone else's.
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN', '')
+if WEBHOOK_URL and not WEBHOOK_SECRET_TOKEN:
+    raise ValueError("WEBHOOK_SECRET_TOKEN environment variable is required in webhook mode")
+
+# /health reports unhealthy when no getUpdates call succeeded for this long
+POLL_STALE_AFTER_S = int(os.getenv('POLL_STALE_AFTER_S', '90'))
+
+# Daily challenge broadcast: local send time as HH:MM, empty disables it
+DAILY_BROADCAST_TIME = os.getenv('DAILY_BROADCAST_TIME', '')
+DAILY_BROADCAST_TZ = os.getenv('DAILY_BROADCAST_TZ', 'UTC')
+DAILY_BROADCAST_BATCH = int(os.getenv('DAILY_BROADCAST_BATCH', '100'))
+
+# Quiz content: JSON/CSV sources, compiled by build_content_bank.py into a
+# memory-mapped bank file. The sources are used directly when it is missing.
+CONTENT_SOURCES = os.getenv('CONTENT_SOURCES', './content/quiz_content.json').split(',')
+CONTENT_BANK_PATH = os.getenv('CONTENT_BANK_PATH', './content/quiz_content.bank')
+
+# Word frequency list ("word count" per line) used by the local essay checks
+WORD_FREQUENCIES_PATH = os.getenv('WORD_FREQUENCIES_PATH', './content/word_frequencies.txt')
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Grow the quiz content with generated vocabulary, grammar questions and
+fill-in-the-blank sentences, offline. New items are validated, checked
+against the existing content for repeats, appended to a JSON content
+source and compiled into the content bank.
+
+Usage: python generate_content.py [-n per_bank] [-o source] [--fake] [options]
+  -n         items to generate per bank and vocabulary level (default: 20)
+  -o         JSON source to append to (default: the first CONTENT_SOURCES
+             entry; with --fake nothing is written unless -o is given)
+  --fake     use the offline fake model instead of Gemini
+  --dry-run  generate and report only
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+from build_content_bank import DEFAULT_BANK_PATH, DEFAULT_SOURCES
+from utils.content_bank import compile_bank, prepare, read_sources
+from utils.content_pipeline import ContentPipeline, FakeLLM, default_targets, merge_into_source
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate quiz content with an LLM')
+    parser.add_argument('-n', '--per-bank', type=int, default=20)
+    parser.add_argument('-o', '--output')
+    parser.add_argument('--sources', nargs='*', default=DEFAULT_SOURCES)
+    parser.add_argument('--bank', default=DEFAULT_BANK_PATH)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--attempts', type=int, default=4)
+    parser.add_argument('--fake', action='store_true')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+
+    if args.fake:
+        llm = FakeLLM(failure_rate=0.1, broken_rate=0.05, invalid_rate=0.05, repeat_rate=0.05)
+        backoff = 0.01
+    else:
+        # Needs the bot's environment (GEMINI_API_KEY)
+        from services.gemini_service import gemini_service
+        llm = gemini_service
+        backoff = 2.0
+    output = args.output or (None if args.fake else args.sources[0])
+
+    pipeline = ContentPipeline(llm, read_sources(args.sources), args.concurrency, args.batch_size, args.attempts, backoff)
+    generated = asyncio.run(pipeline.run(default_targets(args.per_bank)))
+
+    print(f"🤖 Generated content in {pipeline.stats['seconds']} s")
+    print(json.dumps({key: value for key, value in pipeline.stats.items() if key != 'seconds'}))
+    for kind, groups in generated.items():
+        sizes = ', '.join(f"{group or 'all'}: {len(items)}" for group, items in groups.items())
+        print(f"  {kind}: {sizes}")
+
+    if args.dry_run or output is None:
+        print("Dry run: nothing written")
+        return
+    merge_into_source(output, generated)
+    sources = args.sources if os.path.abspath(output) in map(os.path.abspath, args.sources) else args.sources + [output]
+    records = compile_bank(prepare(read_sources(sources)), args.bank)
+    print(f"📦 Appended to {output}, rebuilt {args.bank} ({records} records)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,44 @@
 import asyncio
 import logging
 import os
-import threading
-from flask import Flask
+import signal
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
-from config import TELEGRAM_BOT_TOKEN, RATE_LIMIT_PER_USER
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, TypeHandler, filters, ContextTypes
+from config import (
+    TELEGRAM_BOT_TOKEN, RATE_LIMIT_PER_USER, STATE_BACKEND, STATE_DB_PATH, STATE_FLUSH_INTERVAL_S,
+    SESSION_IDLE_TTL_S, MAX_GAME_SESSIONS, SESSION_SWEEP_INTERVAL_S, SHARED_STATE_PATH,
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN, CONCURRENT_UPDATES, POLL_STALE_AFTER_S,
+    OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST,
+    DAILY_BROADCAST_TIME, DAILY_BROADCAST_TZ, DAILY_BROADCAST_BATCH, CONTENT_SOURCES, CONTENT_BANK_PATH,
+    WORD_FREQUENCIES_PATH
+)
 from utils.rate_limiter import rate_limiter
+from utils.storage import StateStore, create_backend
+from utils.session_store import SessionStore
+from utils.shared_state import SharedDatabase, SharedSessionStore
+from utils.http_server import HTTPServer
+from utils.poll_monitor import MonitoredRequest
+from utils.webhook import WebhookReceiver
+from utils.update_scheduler import PerChatUpdateProcessor
+from utils.send_queue import OutboundDispatcher
+from utils.user_records import UserProgress
+from utils.callback_router import CallbackRouter
+from utils.callback_data import pack, BOOK, ANSWER
+from utils.screens import ScreenRegistry, build_keyboard
+from utils.render_cache import RenderCache
+from utils.content_bank import load_content_bank
+from utils.srs import Deck, ReviewScheduler
+from utils.adaptive import AdaptiveEngine, CANDIDATES, LEVEL_DIFFICULTY
+from utils.game_engine import GameEngine, GameSession, MatchGame, QuizGame
+from utils.leaderboard import Leaderboards
+from utils.writing_checker import WritingChecker, is_request, load_word_frequencies
+from utils.essay_scorer import EssayScorer
 from services.gemini_service import gemini_service
 from services.voice_service import voice_service
+from services.broadcast_service import BroadcastService
+from services.daily_challenge_service import DailyChallengeService
+from services.essay_service import EssayService
+from services.writing_service import WritingService
 
 # Set up logging
 logging.basicConfig(
@@ -17,26 +47,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Flask app for health checks (required for Render.com)
-app = Flask(__name__)
-
-@app.route('/health')
-def health_check():
-    """Health check endpoint for deployment platforms"""
-    return {'status': 'healthy', 'service': 'Education Bot', 'version': '1.0'}, 200
-
-@app.route('/')
-def home():
-    """Root endpoint"""
-    return {'message': 'Education Bot is running!', 'status': 'active'}, 200
-
-def run_flask():
-    """Run Flask app in a separate thread"""
-    port = int(os.environ.get('PORT', 10000))
-    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+# User state lives in memory and is flushed to disk in the background
+state_store = StateStore(create_backend(STATE_BACKEND, STATE_DB_PATH), STATE_FLUSH_INTERVAL_S)
 
 # Store user modes
-user_modes = {}
+user_modes = state_store.register('user_modes')
 
 # Library books data with local file paths
 LIBRARY_BOOKS = {
@@ -194,158 +209,144 @@ LIBRARY_BOOKS = {
     ]
 }
 
+# Skips edits that would not change what a message shows. With shared state
+# another process may have changed the message since, so every edit is sent
+# and Telegram's "not modified" answer stands in for the cache.
+render_cache = RenderCache(0 if SHARED_STATE_PATH else 20000)
+
+# Static screens are built once here; handlers only send them
+screens = ScreenRegistry(render_cache)
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command with inline keyboard"""
     user_id = update.effective_user.id
     user_modes[user_id] = 'general'  # Reset to general mode
-    
-    welcome_message = f"""🤖 Welcome to the Education Bot!
-
-I'm your AI-powered learning assistant. Choose a learning mode below:
-
-Rate limit: {RATE_LIMIT_PER_USER} messages per minute"""
-    
-    # Create inline keyboard
-    keyboard = [
-        [
-            InlineKeyboardButton("✍️ Writing", callback_data="writing"),
-            InlineKeyboardButton("🗣️ Speaking", callback_data="speaking")
-        ],
-        [
-            InlineKeyboardButton("📖 Reading", callback_data="reading"),
-            InlineKeyboardButton("👂 Listening", callback_data="listening")
-        ],
-        [
-            InlineKeyboardButton("🎮 Mini App", callback_data="mini_app"),
-            InlineKeyboardButton("ℹ️ Help", callback_data="help")
-        ],
-        [
-            InlineKeyboardButton("📊 Status", callback_data="status")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await update.message.reply_text(welcome_message, reply_markup=reply_markup)
+    await screens.reply(update.message, "main_menu")
 
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle button callbacks"""
-    query = update.callback_query
-    user_id = query.from_user.id
-    await query.answer()
-    
-    if query.data == "writing":
-        user_modes[user_id] = 'writing'
-        await handle_writing_mode(query, context)
-    elif query.data == "speaking":
-        user_modes[user_id] = 'speaking'
-        await handle_speaking_mode(query, context)
-    elif query.data == "reading":
-        user_modes[user_id] = 'reading'
-        await handle_reading_mode(query, context)
-    elif query.data == "listening":
-        user_modes[user_id] = 'listening'
-        await handle_listening_mode(query, context)
-    elif query.data == "help":
-        await handle_help_mode(query, context)
-    elif query.data == "status":
-        await handle_status_mode(query, context)
-    elif query.data == "back_to_main":
-        user_modes[user_id] = 'general'
-        await show_main_menu(query, context)
-    elif query.data == "library":
-        await handle_library_mode(query, context)
-    elif query.data.startswith("level_"):
-        level = query.data.replace("level_", "")
-        await handle_level_selection(query, context, level)
-    elif query.data.startswith("book_"):
-        book_data = query.data.replace("book_", "")
-        level, book_index = book_data.split("_")
-        await handle_book_selection(query, context, level, int(book_index))
-    elif query.data == "back_to_reading":
-        await handle_reading_mode(query, context)
-    elif query.data == "back_to_library":
-        await handle_library_mode(query, context)
-    elif query.data == "listening_podcasts":
-        await handle_listening_podcasts(query, context)
-    elif query.data == "listening_movies":
-        await handle_listening_movies(query, context)
-    elif query.data == "listening_news":
-        await handle_listening_news(query, context)
-    elif query.data == "listening_audiomate":
-        await handle_listening_audiomate(query, context)
-    elif query.data == "back_to_listening":
-        await handle_listening_mode(query, context)
-    elif query.data == "mini_app":
-        user_modes[user_id] = 'mini_app'
-        await handle_mini_app(query, context)
-    elif query.data == "back_to_miniapp":
-        await handle_mini_app(query, context)
-    elif query.data.startswith("vocab_"):
-        await handle_vocabulary_game(query, context)
-    elif query.data.startswith("grammar_"):
-        await handle_grammar_quiz(query, context)
-    elif query.data.startswith("word_match_"):
-        await handle_word_matching(query, context)
-    elif query.data.startswith("fill_blank_"):
-        await handle_fill_blanks(query, context)
-    elif query.data == "daily_challenge":
-        await handle_daily_challenge(query, context)
-    elif query.data == "progress_stats":
-        await handle_progress_stats(query, context)
+    await callback_router.dispatch(update.callback_query, context)
 
-async def show_main_menu(query, context):
-    """Show the main menu"""
-    user_id = query.from_user.id
-    user_modes[user_id] = 'general'
-    
-    welcome_message = f"""🤖 Welcome to the Education Bot!
+screens.add("main_menu", f"""🤖 Welcome to the Education Bot!
 
 I'm your AI-powered learning assistant. Choose a learning mode below:
 
-Rate limit: {RATE_LIMIT_PER_USER} messages per minute"""
-    
-    keyboard = [
-        [
-            InlineKeyboardButton("✍️ Writing", callback_data="writing"),
-            InlineKeyboardButton("🗣️ Speaking", callback_data="speaking")
-        ],
-        [
-            InlineKeyboardButton("📖 Reading", callback_data="reading"),
-            InlineKeyboardButton("👂 Listening", callback_data="listening")
-        ],
-        [
-            InlineKeyboardButton("🎮 Mini App", callback_data="mini_app"),
-            InlineKeyboardButton("ℹ️ Help", callback_data="help")
-        ],
-        [
-            InlineKeyboardButton("📊 Status", callback_data="status")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(welcome_message, reply_markup=reply_markup)
+Rate limit: {RATE_LIMIT_PER_USER} messages per minute""", [
+    [("✍️ Writing", "writing"), ("🗣️ Speaking", "speaking")],
+    [("📖 Reading", "reading"), ("👂 Listening", "listening")],
+    [("🎮 Mini App", "mini_app"), ("ℹ️ Help", "help")],
+    [("📊 Status", "status")]
+], parse_mode=None)
 
-async def handle_writing_mode(query, context):
-    """Handle writing mode"""
-    message = """✍️ **Writing Mode**
+async def show_main_menu(query, context):
+    """Show the main menu"""
+    user_modes[query.from_user.id] = 'general'
+    await screens.edit(query, "main_menu")
+
+screens.add("writing", """✍️ **Writing Mode**
 
-Send me any text and I'll help you with:
-• Grammar corrections
+Send me any text and I'll check its spelling and grammar right away.
+Tap "Ask AI for more" for suggestions from the AI tutor, or ask me a
+question about:
 • Writing suggestions
 • Essay structure
 • Creative writing ideas
 • Academic writing tips
 
-Just type your message below!"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+Just type your message below!""", [
+    [("📝 Essay Assessment", "essay")],
+    [("🔙 Back to Menu", "back_to_main")]
+])
 
-async def handle_speaking_mode(query, context):
-    """Handle speaking mode"""
-    message = """🗣️ **Speaking Mode**
+async def handle_writing_mode(query, context):
+    """Handle writing mode"""
+    await screens.edit(query, "writing")
+
+# Local spelling and grammar checks, shared by writing hints and essays
+writing_checker = WritingChecker(load_word_frequencies(WORD_FREQUENCIES_PATH))
+writing_service = WritingService(writing_checker, gemini_service)
+
+async def handle_writing_hints(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Instant spelling and grammar hints, with a button to ask the AI"""
+    key, misspelled, issues = writing_service.check(update.message.text)
+    keyboard = [[InlineKeyboardButton("🤖 Ask AI for more", callback_data=f"writing_ai_{key}")],
+                [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]
+    await update.message.reply_text(writing_service.report(misspelled, issues),
+                                    reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+
+async def handle_writing_ai(query, context, key):
+    """The AI tutor's reply to text that got local hints"""
+    message = query.message
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]])
+    response = writing_service.cached(key)
+    if response is None:
+        if await rate_limiter.check(query.from_user.id):
+            time_until_reset = await rate_limiter.time_until_reset(query.from_user.id)
+            await message.reply_text(
+                f"⚠️ Rate limit exceeded! Please wait {int(time_until_reset / 1000)} seconds before asking the AI."
+            )
+            return
+        await message.chat.send_action(action="typing")
+        response = await writing_service.ask_ai(key)
+        if response is None:
+            await message.reply_text("This text is no longer available. Please send it again.", reply_markup=keyboard)
+            return
+    await message.reply_text(response, reply_markup=keyboard)
+
+screens.add("essay", """📝 **Essay Assessment**
+
+Send me an essay or a paragraph and I'll score it right away:
+• Spelling and common grammar mistakes
+• Sentence length and word variety
+
+Longer essays also get detailed feedback from the AI tutor.""", [
+    [("🔙 Back to Writing", "writing")]
+])
+
+async def handle_essay_mode(query, context):
+    """Handle essay assessment mode"""
+    await screens.edit(query, "essay")
+
+# Local essay checks; Gemini only for the detailed rubric
+essay_service = EssayService(EssayScorer(writing_checker), gemini_service)
+
+async def send_essay_feedback(message, user_id, key):
+    """Reply with the detailed AI feedback on an essay (a rate limit token
+    is spent only when Gemini has to be asked)"""
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]])
+    feedback = essay_service.cached(key)
+    if feedback is None:
+        if await rate_limiter.check(user_id):
+            time_until_reset = await rate_limiter.time_until_reset(user_id)
+            await message.reply_text(
+                f"⚠️ Rate limit exceeded! Please wait {int(time_until_reset / 1000)} seconds before asking for AI feedback."
+            )
+            return
+        await message.chat.send_action(action="typing")
+        feedback = await essay_service.detailed(key)
+        if feedback is None:
+            await message.reply_text("This essay is no longer available. Please send it again.", reply_markup=keyboard)
+            return
+    await message.reply_text(f"🤖 Detailed feedback:\n\n{feedback}", reply_markup=keyboard)
+
+async def handle_essay(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Score an essay locally; ask Gemini only when the text needs it"""
+    user_id = update.effective_user.id
+    key, result = essay_service.review(update.message.text)
+    report = essay_service.report(result)
+    if result.needs_ai:
+        await update.message.reply_text(report, parse_mode='Markdown')
+        await send_essay_feedback(update.message, user_id, key)
+        return
+    keyboard = [[InlineKeyboardButton("🤖 Detailed AI feedback", callback_data=f"essay_ai_{key}")],
+                [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]
+    await update.message.reply_text(report, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+
+async def handle_essay_ai(query, context, key):
+    """Detailed AI feedback on an essay that was scored locally"""
+    await send_essay_feedback(query.message, query.from_user.id, key)
+
+screens.add("speaking", """🗣️ **Speaking Mode**
 
 Send me voice messages and I'll help you with:
 • Pronunciation feedback
@@ -354,16 +355,15 @@ Send me voice messages and I'll help you with:
 • Public speaking tips
 • Language learning
 
-Send a voice message or type your text!"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+Send a voice message or type your text!""", [
+    [("🔙 Back to Menu", "back_to_main")]
+])
 
-async def handle_reading_mode(query, context):
-    """Handle reading mode"""
-    message = """📖 **Reading Mode**
+async def handle_speaking_mode(query, context):
+    """Handle speaking mode"""
+    await screens.edit(query, "speaking")
+
+screens.add("reading", """📖 **Reading Mode**
 
 Choose what you'd like to do:
 
@@ -372,19 +372,16 @@ Choose what you'd like to do:
 • Get vocabulary and analysis assistance
 • Discuss literature and reading strategies
 
-What would you like to do?"""
-    
-    keyboard = [
-        [InlineKeyboardButton("📚 Digital Library", callback_data="library")],
-        [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+What would you like to do?""", [
+    [("📚 Digital Library", "library")],
+    [("🔙 Back to Menu", "back_to_main")]
+])
 
-async def handle_library_mode(query, context):
-    """Handle library mode"""
-    message = """📚 **Digital Library**
+async def handle_reading_mode(query, context):
+    """Handle reading mode"""
+    await screens.edit(query, "reading")
+
+screens.add("library", """📚 **Digital Library**
 
 Choose your reading level:
 
@@ -395,62 +392,43 @@ Choose your reading level:
 • **Upper-intermediate**: Advanced classics, rich vocabulary
 • **Advanced**: Complex literature, sophisticated themes
 
-Select your level to see available books:"""
-    
-    keyboard = [
-        [
-            InlineKeyboardButton("🟢 Beginner", callback_data="level_beginner"),
-            InlineKeyboardButton("🟡 Elementary", callback_data="level_elementary")
-        ],
-        [
-            InlineKeyboardButton("🟠 Pre-intermediate", callback_data="level_pre_intermediate"),
-            InlineKeyboardButton("🔵 Intermediate", callback_data="level_intermediate")
-        ],
-        [
-            InlineKeyboardButton("🟣 Upper-intermediate", callback_data="level_upper_intermediate"),
-            InlineKeyboardButton("🔴 Advanced", callback_data="level_advanced")
-        ],
-        [InlineKeyboardButton("🔙 Back to Reading", callback_data="back_to_reading")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+Select your level to see available books:""", [
+    [("🟢 Beginner", "level_beginner"), ("🟡 Elementary", "level_elementary")],
+    [("🟠 Pre-intermediate", "level_pre_intermediate"), ("🔵 Intermediate", "level_intermediate")],
+    [("🟣 Upper-intermediate", "level_upper_intermediate"), ("🔴 Advanced", "level_advanced")],
+    [("🔙 Back to Reading", "back_to_reading")]
+])
+
+async def handle_library_mode(query, context):
+    """Handle library mode"""
+    await screens.edit(query, "library")
+
+LEVEL_NAMES = {
+    'beginner': 'Beginner',
+    'elementary': 'Elementary',
+    'pre_intermediate': 'Pre-intermediate',
+    'intermediate': 'Intermediate',
+    'upper_intermediate': 'Upper-intermediate',
+    'advanced': 'Advanced'
+}
+
+screens.add("level_empty", "No books available for this level yet. Please check back later!", [
+    [("🔙 Back to Library", "back_to_library")]
+], parse_mode=None)
+
+for level, books in LIBRARY_BOOKS.items():
+    screens.add(f"level_{level}", f"""📚 **{LEVEL_NAMES[level]} Level Books**
+
+Available books for your level:""", [
+        [(f"📖 {book['title']} - {book['author']}", pack(BOOK, level, i))] for i, book in enumerate(books)
+    ] + [[("🔙 Back to Library", "back_to_library")]])
 
 async def handle_level_selection(query, context, level):
     """Handle level selection and show books"""
-    books = LIBRARY_BOOKS.get(level, [])
-    
-    if not books:
-        message = "No books available for this level yet. Please check back later!"
-        keyboard = [[InlineKeyboardButton("🔙 Back to Library", callback_data="back_to_library")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(message, reply_markup=reply_markup)
-        return
-    
-    level_names = {
-        'beginner': 'Beginner',
-        'elementary': 'Elementary', 
-        'pre_intermediate': 'Pre-intermediate',
-        'intermediate': 'Intermediate',
-        'upper_intermediate': 'Upper-intermediate',
-        'advanced': 'Advanced'
-    }
-    
-    message = f"""📚 **{level_names[level]} Level Books**
-
-Available books for your level:"""
-    
-    keyboard = []
-    for i, book in enumerate(books):
-        keyboard.append([InlineKeyboardButton(
-            f"📖 {book['title']} - {book['author']}", 
-            callback_data=f"book_{level}_{i}"
-        )])
-    
-    keyboard.append([InlineKeyboardButton("🔙 Back to Library", callback_data="back_to_library")])
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+    if LIBRARY_BOOKS.get(level):
+        await screens.edit(query, f"level_{level}")
+    else:
+        await screens.edit(query, "level_empty")
 
 async def handle_book_selection(query, context, level, book_index):
     """Handle book selection and send PDF"""
@@ -471,8 +449,9 @@ Here's your book! Enjoy reading! 📖✨"""
     keyboard = [[InlineKeyboardButton("🔙 Back to Library", callback_data="back_to_library")]]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    # Send the message first
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+    # Send the message first; a repeated tap on the same book stops here
+    if not await render_cache.edit(query, message, reply_markup=reply_markup, parse_mode='Markdown'):
+        return
     
     # Check if the PDF file exists
     file_path = book['file_path']
@@ -514,26 +493,21 @@ For now, you can find this book online or in your local library! 📚""",
             parse_mode='Markdown'
         )
 
+screens.add("listening", """👂 **Listening Mode**
+
+Choose your listening practice:""", [
+    [("🎧 Podcasts", "listening_podcasts")],
+    [("🎬 Movies & TV Shows", "listening_movies")],
+    [("📺 News Videos / TED Talks / YouTube Channels", "listening_news")],
+    [("👂AudioMate", "listening_audiomate")],
+    [("🔙 Back to Menu", "back_to_main")]
+])
+
 async def handle_listening_mode(query, context):
     """Handle listening mode"""
-    message = """👂 **Listening Mode**
+    await screens.edit(query, "listening")
 
-Choose your listening practice:"""
-    
-    keyboard = [
-        [InlineKeyboardButton("🎧 Podcasts", callback_data="listening_podcasts")],
-        [InlineKeyboardButton("🎬 Movies & TV Shows", callback_data="listening_movies")],
-        [InlineKeyboardButton("📺 News Videos / TED Talks / YouTube Channels", callback_data="listening_news")],
-        [InlineKeyboardButton("👂AudioMate", callback_data="listening_audiomate")],
-        [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-
-async def handle_listening_podcasts(query, context):
-    """Handle podcast listening mode"""
-    message = """🎧 **Podcasts for English Learning**
+screens.add("listening_podcasts", """🎧 **Podcasts for English Learning**
 
 Here are some recommended podcasts to improve your English listening skills:
 
@@ -559,16 +533,15 @@ These podcasts will help you:
 • Improve listening comprehension
 • Learn natural conversation patterns
 • Expand vocabulary
-• Practice different accents and speaking styles"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Listening", callback_data="back_to_listening")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+• Practice different accents and speaking styles""", [
+    [("🔙 Back to Listening", "back_to_listening")]
+])
 
-async def handle_listening_movies(query, context):
-    """Handle movies and TV shows listening mode"""
-    message = """🎬 **Movies & TV Shows for English Learning**
+async def handle_listening_podcasts(query, context):
+    """Handle podcast listening mode"""
+    await screens.edit(query, "listening_podcasts")
+
+screens.add("listening_movies", """🎬 **Movies & TV Shows for English Learning**
 
 Great series and movies to improve your English:
 
@@ -613,16 +586,15 @@ These will help you:
 • Learn conversational English
 • Understand cultural references
 • Improve pronunciation
-• Practice different dialects"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Listening", callback_data="back_to_listening")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+• Practice different dialects""", [
+    [("🔙 Back to Listening", "back_to_listening")]
+])
 
-async def handle_listening_news(query, context):
-    """Handle news videos and educational content"""
-    message = """📺 **News Videos / TED Talks / YouTube Channels**
+async def handle_listening_movies(query, context):
+    """Handle movies and TV shows listening mode"""
+    await screens.edit(query, "listening_movies")
+
+screens.add("listening_news", """📺 **News Videos / TED Talks / YouTube Channels**
 
 Enhance your English with educational content:
 
@@ -647,16 +619,15 @@ https://www.youtube.com/
 • Use subtitles initially, then try without
 • Take notes of new vocabulary
 • Pause and replay difficult sections
-• Discuss what you learned"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Listening", callback_data="back_to_listening")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+• Discuss what you learned""", [
+    [("🔙 Back to Listening", "back_to_listening")]
+])
 
-async def handle_listening_audiomate(query, context):
-    """Handle AudioMate - original audio processing functionality"""
-    message = """👂 **AudioMate**
+async def handle_listening_news(query, context):
+    """Handle news videos and educational content"""
+    await screens.edit(query, "listening_news")
+
+screens.add("listening_audiomate", """👂 **AudioMate**
 
 Send me audio files and I'll help you with:
 • Audio transcription
@@ -665,126 +636,113 @@ Send me audio files and I'll help you with:
 • Note-taking from audio
 • Podcast discussions
 
-Send an audio file or ask about listening skills!"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Listening", callback_data="back_to_listening")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+Send an audio file or ask about listening skills!""", [
+    [("🔙 Back to Listening", "back_to_listening")]
+])
 
-# Store user progress and game data
-user_progress = {}
-user_game_data = {}
-
-# Vocabulary data for games
-VOCABULARY_DATA = {
-    'beginner': [
-        {'word': 'cat', 'definition': 'A small domesticated carnivorous mammal', 'example': 'The cat is sleeping on the sofa.'},
-        {'word': 'house', 'definition': 'A building for human habitation', 'example': 'I live in a big house.'},
-        {'word': 'book', 'definition': 'A written or printed work consisting of pages', 'example': 'I am reading a good book.'},
-        {'word': 'water', 'definition': 'A colorless, transparent, odorless liquid', 'example': 'I drink water every day.'},
-        {'word': 'happy', 'definition': 'Feeling or showing pleasure or contentment', 'example': 'She looks very happy today.'},
-    ],
-    'intermediate': [
-        {'word': 'perseverance', 'definition': 'Persistence in doing something despite difficulty', 'example': 'Her perseverance helped her achieve success.'},
-        {'word': 'magnificent', 'definition': 'Impressively beautiful, elaborate, or extravagant', 'example': 'The view from the mountain was magnificent.'},
-        {'word': 'collaborate', 'definition': 'Work jointly on an activity', 'example': 'We need to collaborate to finish this project.'},
-        {'word': 'ambitious', 'definition': 'Having a strong desire for success or achievement', 'example': 'He is an ambitious young entrepreneur.'},
-        {'word': 'inevitable', 'definition': 'Certain to happen; unavoidable', 'example': 'Change is inevitable in life.'},
-    ],
-    'advanced': [
-        {'word': 'serendipity', 'definition': 'The occurrence of events by chance in a happy way', 'example': 'Meeting my mentor was pure serendipity.'},
-        {'word': 'ubiquitous', 'definition': 'Present, appearing, or found everywhere', 'example': 'Smartphones are ubiquitous in modern society.'},
-        {'word': 'ephemeral', 'definition': 'Lasting for a very short time', 'example': 'The beauty of cherry blossoms is ephemeral.'},
-        {'word': 'quintessential', 'definition': 'Representing the most perfect example of a quality', 'example': 'He is the quintessential gentleman.'},
-        {'word': 'perspicacious', 'definition': 'Having keen insight; shrewd', 'example': 'Her perspicacious analysis impressed everyone.'},
-    ]
-}
+async def handle_listening_audiomate(query, context):
+    """Handle AudioMate - original audio processing functionality"""
+    await screens.edit(query, "listening_audiomate")
 
-GRAMMAR_QUESTIONS = [
-    {
-        'question': 'Choose the correct form: "She ___ to the store yesterday."',
-        'options': ['go', 'goes', 'went', 'going'],
-        'correct': 2,
-        'explanation': '"Went" is the past tense of "go" and matches with "yesterday".'
-    },
-    {
-        'question': 'Which is correct: "I have ___ this movie before."',
-        'options': ['see', 'saw', 'seen', 'seeing'],
-        'correct': 2,
-        'explanation': '"Seen" is used with "have" in present perfect tense.'
-    },
-    {
-        'question': 'Complete: "If it ___ tomorrow, we will stay home."',
-        'options': ['rain', 'rains', 'rained', 'raining'],
-        'correct': 1,
-        'explanation': 'First conditional uses present simple in the if-clause.'
-    },
-    {
-        'question': 'Choose correct: "She is good ___ mathematics."',
-        'options': ['in', 'at', 'on', 'with'],
-        'correct': 1,
-        'explanation': 'We use "good at" for skills and abilities.'
-    },
-    {
-        'question': 'Which is right: "There ___ many people at the party."',
-        'options': ['was', 'were', 'is', 'are'],
-        'correct': 1,
-        'explanation': '"Were" is used with plural subjects in past tense.'
-    }
-]
-
-WORD_PAIRS = [
-    {'english': 'Happy', 'synonym': 'Joyful'},
-    {'english': 'Big', 'synonym': 'Large'},
-    {'english': 'Smart', 'synonym': 'Intelligent'},
-    {'english': 'Fast', 'synonym': 'Quick'},
-    {'english': 'Beautiful', 'synonym': 'Gorgeous'},
-    {'english': 'Difficult', 'synonym': 'Challenging'},
-    {'english': 'Important', 'synonym': 'Significant'},
-    {'english': 'Angry', 'synonym': 'Furious'},
-]
-
-FILL_BLANK_SENTENCES = [
-    {
-        'sentence': 'The weather is very ___ today.',
-        'options': ['nice', 'book', 'run', 'water'],
-        'correct': 0,
-        'hint': 'Think about describing weather positively.'
-    },
-    {
-        'sentence': 'I need to ___ my homework before dinner.',
-        'options': ['eat', 'finish', 'sleep', 'walk'],
-        'correct': 1,
-        'hint': 'What do you do with homework?'
-    },
-    {
-        'sentence': 'She ___ a beautiful song at the concert.',
-        'options': ['danced', 'painted', 'sang', 'wrote'],
-        'correct': 2,
-        'hint': 'What do you do with songs at concerts?'
-    },
-    {
-        'sentence': 'The ___ is shining brightly in the sky.',
-        'options': ['moon', 'sun', 'star', 'cloud'],
-        'correct': 1,
-        'hint': 'What gives us light during the day?'
-    }
-]
+# Store user progress and game data
+user_progress = state_store.register('user_progress', encode=UserProgress.to_dict, decode=UserProgress.from_dict)
+# Abandoned quiz sessions expire after SESSION_IDLE_TTL_S of inactivity.
+# With SHARED_STATE_PATH set, sessions are visible to every bot process.
+if SHARED_STATE_PATH:
+    user_game_data = SharedSessionStore(
+        SharedDatabase(SHARED_STATE_PATH),
+        ttl_seconds=SESSION_IDLE_TTL_S,
+        max_sessions=MAX_GAME_SESSIONS,
+        encode=GameSession.to_dict,
+        decode=GameSession.from_dict
+    )
+else:
+    user_game_data = SessionStore(
+        state_store.register('user_game_data', encode=GameSession.to_dict, decode=GameSession.from_dict),
+        ttl_seconds=SESSION_IDLE_TTL_S,
+        max_sessions=MAX_GAME_SESSIONS
+    )
+
+# Quiz content (vocabulary, grammar, word pairs, fill-the-blank sentences)
+content_bank = load_content_bank(CONTENT_BANK_PATH, CONTENT_SOURCES)
+
+# Spaced repetition: per-user review cards, keyed by vocabulary word
+review_scheduler = ReviewScheduler(state_store.register('review_decks', encode=Deck.to_list, decode=Deck.from_list))
+
+# Ability and item difficulty estimates (learned difficulty per "game:id")
+adaptive_engine = AdaptiveEngine(state_store.register('item_difficulty'))
+
+# Global, weekly and per-level rankings, rebuilt from progress at startup
+leaderboards = Leaderboards(state_store.register('weekly_points'), LEVEL_DIFFICULTY)
+leaderboards.load(user_progress)
+
+def get_progress(user_id):
+    """Get a user's progress record, creating it on first use"""
+    progress = user_progress.get(user_id)
+    if progress is None:
+        progress = UserProgress()
+        user_progress[user_id] = progress
+    return progress
+
+def pick_items(game, bank, user_id, count=1, group=None, exclude=None):
+    """count random items of a bank, favouring those near the user's ability"""
+    candidates = content_bank.sample(bank, min(content_bank.count(bank, group), count + CANDIDATES), group)
+    if exclude is not None and len(candidates) > count:
+        candidates = [item for item in candidates if item != exclude]
+    return adaptive_engine.choose(game, get_progress(user_id), candidates, count)
+
+def update_level(progress):
+    """Move the user to the level their ability estimate supports; returns
+    a line for the results message"""
+    level = adaptive_engine.level_for(progress)
+    if level == progress.level:
+        return ""
+    went_up = LEVEL_DIFFICULTY[level] > LEVEL_DIFFICULTY.get(progress.level, float('-inf'))
+    progress.level = level
+    if went_up:
+        return f"\n🎉 **LEVEL UP!** You're now at {level.title()} level!"
+    return f"\n📘 Your level is now {level.title()}, to match your recent answers."
+
+def finish_game(user_id, progress, score):
+    """Count a finished game worth score points and re-rank the user;
+    returns the level line for the results message"""
+    progress.games_played += 1
+    level_line = update_level(progress)
+    leaderboards.update(user_id, progress, gained=score)
+    return level_line
+
+def next_word(user_id, level, exclude=None):
+    """Entry of the user's next vocabulary question: a due review, else a
+    word from their level they have not seen yet"""
+    if not content_bank.count('vocabulary', level):
+        level = 'beginner'
+    word = review_scheduler.next_item(
+        user_id, lambda: pick_items('vocab', 'vocabulary', user_id, group=level)[0]['word'], exclude
+    )
+    index = content_bank.find('vocabulary', word)
+    if index is None:
+        # The word was removed from the content since it was reviewed
+        review_scheduler.forget(user_id, word)
+        return content_bank.choice('vocabulary', level)
+    return content_bank.get('vocabulary', index)
+
+def wrong_definitions(word_data, count=3):
+    """Definitions of words precomputed as plausible distractors"""
+    return [item['definition'] for item in content_bank.related('vocabulary', word_data, count)]
+
+MINI_APP_KEYBOARD = build_keyboard([
+    [("📚 Vocabulary Quiz", "vocab_quiz"), ("📝 Grammar Challenge", "grammar_quiz")],
+    [("🎯 Word Matching", "word_match_start"), ("✏️ Fill the Blanks", "fill_blank_start")],
+    [("🏆 Daily Challenge", "daily_challenge"), ("📊 Progress Stats", "progress_stats")],
+    [("🔙 Back to Menu", "back_to_main")]
+])
 
 async def handle_mini_app(query, context):
     """Handle mini app main menu"""
     user_id = query.from_user.id
     
     # Initialize user progress if not exists
-    if user_id not in user_progress:
-        user_progress[user_id] = {
-            'vocab_score': 0,
-            'grammar_score': 0,
-            'games_played': 0,
-            'streak_days': 0,
-            'level': 'beginner'
-        }
+    progress = get_progress(user_id)
     
     message = """🎮 **Learning Mini App**
 
@@ -796,618 +754,165 @@ Welcome to your interactive English learning playground! Choose an activity to b
 • Games Played: {games_played}
 • Current Level: {level}
 
-🚀 **Ready to learn and have fun?**""".format(**user_progress[user_id])
-    
-    keyboard = [
-        [
-            InlineKeyboardButton("📚 Vocabulary Quiz", callback_data="vocab_quiz"),
-            InlineKeyboardButton("📝 Grammar Challenge", callback_data="grammar_quiz")
-        ],
-        [
-            InlineKeyboardButton("🎯 Word Matching", callback_data="word_match_start"),
-            InlineKeyboardButton("✏️ Fill the Blanks", callback_data="fill_blank_start")
-        ],
-        [
-            InlineKeyboardButton("🏆 Daily Challenge", callback_data="daily_challenge"),
-            InlineKeyboardButton("📊 Progress Stats", callback_data="progress_stats")
-        ],
-        [
-            InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-
-async def handle_vocabulary_game(query, context):
-    """Handle vocabulary quiz game"""
-    user_id = query.from_user.id
-    action = query.data.replace("vocab_", "")
-    
-    if action == "quiz":
-        # Start new vocabulary quiz
-        level = user_progress.get(user_id, {}).get('level', 'beginner')
-        vocab_list = VOCABULARY_DATA.get(level, VOCABULARY_DATA['beginner'])
-        
-        # Select random word
-        import random
-        word_data = random.choice(vocab_list)
-        
-        # Store current question
-        user_game_data[user_id] = {
-            'game_type': 'vocab',
-            'current_word': word_data,
-            'score': 0,
-            'question_count': 1,
-            'total_questions': 5
-        }
-        
-        # Create options (correct definition + 3 wrong ones)
-        all_definitions = []
-        for vocab_level in VOCABULARY_DATA.values():
-            all_definitions.extend([v['definition'] for v in vocab_level])
-        
-        wrong_definitions = [d for d in all_definitions if d != word_data['definition']]
-        options = [word_data['definition']] + random.sample(wrong_definitions, 3)
-        random.shuffle(options)
-        
-        correct_index = options.index(word_data['definition'])
-        user_game_data[user_id]['correct_answer'] = correct_index
-        user_game_data[user_id]['options'] = options
-        
-        message = f"""📚 **Vocabulary Quiz** (Question 1/5)
-
-**Word:** `{word_data['word'].upper()}`
-
-**Choose the correct definition:**"""
-        
-        keyboard = []
-        for i, option in enumerate(options):
-            keyboard.append([InlineKeyboardButton(f"{chr(65+i)}. {option[:50]}...", callback_data=f"vocab_answer_{i}")])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    elif action.startswith("answer_"):
-        # Handle quiz answer
-        selected = int(action.replace("answer_", ""))
-        game_data = user_game_data.get(user_id, {})
-        
-        if not game_data:
-            await query.answer("Game session expired. Please start a new quiz.")
-            return
-        
-        correct_answer = game_data['correct_answer']
-        is_correct = selected == correct_answer
-        
-        if is_correct:
-            game_data['score'] += 1
-            result_text = "✅ Correct!"
-        else:
-            result_text = f"❌ Wrong! The correct answer was: {game_data['options'][correct_answer]}"
-        
-        # Show example
-        example_text = f"\n\n💡 **Example:** {game_data['current_word']['example']}"
-        
-        if game_data['question_count'] < game_data['total_questions']:
-            # Continue to next question
-            await query.answer(result_text)
-            game_data['question_count'] += 1
-            
-            # Get next word
-            level = user_progress.get(user_id, {}).get('level', 'beginner')
-            vocab_list = VOCABULARY_DATA.get(level, VOCABULARY_DATA['beginner'])
-            import random
-            word_data = random.choice(vocab_list)
-            game_data['current_word'] = word_data
-            
-            # Create new options
-            all_definitions = []
-            for vocab_level in VOCABULARY_DATA.values():
-                all_definitions.extend([v['definition'] for v in vocab_level])
-            
-            wrong_definitions = [d for d in all_definitions if d != word_data['definition']]
-            options = [word_data['definition']] + random.sample(wrong_definitions, 3)
-            random.shuffle(options)
-            
-            correct_index = options.index(word_data['definition'])
-            game_data['correct_answer'] = correct_index
-            game_data['options'] = options
-            
-            message = f"""📚 **Vocabulary Quiz** (Question {game_data['question_count']}/5)
-
-{result_text}{example_text}
-
-**Word:** `{word_data['word'].upper()}`
-
-**Choose the correct definition:**"""
-            
-            keyboard = []
-            for i, option in enumerate(options):
-                keyboard.append([InlineKeyboardButton(f"{chr(65+i)}. {option[:50]}...", callback_data=f"vocab_answer_{i}")])
-            
-            keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-        else:
-            # Quiz completed
-            final_score = game_data['score']
-            user_progress[user_id]['vocab_score'] += final_score
-            user_progress[user_id]['games_played'] += 1
-            
-            # Level up logic
-            if user_progress[user_id]['vocab_score'] >= 20 and user_progress[user_id]['level'] == 'beginner':
-                user_progress[user_id]['level'] = 'intermediate'
-                level_up_text = "\n🎉 **LEVEL UP!** You're now at Intermediate level!"
-            elif user_progress[user_id]['vocab_score'] >= 50 and user_progress[user_id]['level'] == 'intermediate':
-                user_progress[user_id]['level'] = 'advanced'
-                level_up_text = "\n🎉 **LEVEL UP!** You're now at Advanced level!"
-            else:
-                level_up_text = ""
-            
-            message = f"""🎯 **Quiz Complete!**
-
-{result_text}{example_text}
-
-**Final Score:** {final_score}/5
-**Total Vocabulary Score:** {user_progress[user_id]['vocab_score']}
-{level_up_text}
-
-Great job! Keep practicing to improve your vocabulary! 📚✨"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔄 Play Again", callback_data="vocab_quiz")],
-                [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-            
-            # Clear game data
-            if user_id in user_game_data:
-                del user_game_data[user_id]
-
-async def handle_grammar_quiz(query, context):
-    """Handle grammar quiz game"""
-    user_id = query.from_user.id
-    action = query.data.replace("grammar_", "")
-    
-    if action == "quiz":
-        # Start new grammar quiz
-        import random
-        question_data = random.choice(GRAMMAR_QUESTIONS)
-        
-        # Store current question
-        user_game_data[user_id] = {
-            'game_type': 'grammar',
-            'current_question': question_data,
-            'score': 0,
-            'question_count': 1,
-            'total_questions': 3
-        }
-        
-        message = f"""📝 **Grammar Challenge** (Question 1/3)
-
-{question_data['question']}
-
-**Choose the correct answer:**"""
-        
-        keyboard = []
-        for i, option in enumerate(question_data['options']):
-            keyboard.append([InlineKeyboardButton(f"{chr(65+i)}. {option}", callback_data=f"grammar_answer_{i}")])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    elif action.startswith("answer_"):
-        # Handle quiz answer
-        selected = int(action.replace("answer_", ""))
-        game_data = user_game_data.get(user_id, {})
-        
-        if not game_data:
-            await query.answer("Game session expired. Please start a new quiz.")
-            return
-        
-        correct_answer = game_data['current_question']['correct']
-        is_correct = selected == correct_answer
-        
-        if is_correct:
-            game_data['score'] += 1
-            result_text = "✅ Correct!"
-        else:
-            result_text = f"❌ Wrong! The correct answer was: {game_data['current_question']['options'][correct_answer]}"
-        
-        explanation = f"\n\n💡 **Explanation:** {game_data['current_question']['explanation']}"
-        
-        if game_data['question_count'] < game_data['total_questions']:
-            # Continue to next question
-            await query.answer(result_text)
-            game_data['question_count'] += 1
-            
-            # Get next question
-            import random
-            question_data = random.choice(GRAMMAR_QUESTIONS)
-            game_data['current_question'] = question_data
-            
-            message = f"""📝 **Grammar Challenge** (Question {game_data['question_count']}/3)
-
-{result_text}{explanation}
-
-{question_data['question']}
-
-**Choose the correct answer:**"""
-            
-            keyboard = []
-            for i, option in enumerate(question_data['options']):
-                keyboard.append([InlineKeyboardButton(f"{chr(65+i)}. {option}", callback_data=f"grammar_answer_{i}")])
-            
-            keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-        else:
-            # Quiz completed
-            final_score = game_data['score']
-            user_progress[user_id]['grammar_score'] += final_score
-            user_progress[user_id]['games_played'] += 1
-            
-            message = f"""🎯 **Grammar Challenge Complete!**
-
-{result_text}{explanation}
-
-**Final Score:** {final_score}/3
-**Total Grammar Score:** {user_progress[user_id]['grammar_score']}
-
-Excellent work! Grammar is the foundation of good English! 📝✨"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔄 Try Again", callback_data="grammar_quiz")],
-                [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-            
-            # Clear game data
-            if user_id in user_game_data:
-                del user_game_data[user_id]
-
-async def handle_word_matching(query, context):
-    """Handle word matching game"""
-    user_id = query.from_user.id
-    action = query.data.replace("word_match_", "")
-    
-    if action == "start":
-        # Start word matching game
-        import random
-        pairs = random.sample(WORD_PAIRS, 4)  # Select 4 pairs
-        
-        # Create shuffled options
-        words = [(pair['english'], 'english') for pair in pairs] + [(pair['synonym'], 'synonym') for pair in pairs]
-        random.shuffle(words)
-        
-        user_game_data[user_id] = {
-            'game_type': 'word_match',
-            'pairs': pairs,
-            'words': words,
-            'selected': [],
-            'matched': [],
-            'score': 0
-        }
-        
-        message = """🎯 **Word Matching Game**
-
-Match the synonyms! Select two words that have similar meanings.
-
-**Instructions:**
-1. Click on a word to select it
-2. Click on its synonym to make a match
-3. Match all 4 pairs to win!
-
-**Words to match:**"""
-        
-        keyboard = []
-        row = []
-        for i, (word, word_type) in enumerate(words):
-            if i % 2 == 0 and i > 0:
-                keyboard.append(row)
-                row = []
-            row.append(InlineKeyboardButton(f"{word}", callback_data=f"word_match_select_{i}"))
-        if row:
-            keyboard.append(row)
-        
-        keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    elif action.startswith("select_"):
-        # Handle word selection
-        selected_index = int(action.replace("select_", ""))
-        game_data = user_game_data.get(user_id, {})
-        
-        if not game_data or selected_index in game_data['matched']:
-            await query.answer("Word already matched or game not found!")
-            return
-        
-        if selected_index in game_data['selected']:
-            # Deselect word
-            game_data['selected'].remove(selected_index)
-            await query.answer("Word deselected")
-        else:
-            # Select word
-            game_data['selected'].append(selected_index)
-            
-            if len(game_data['selected']) == 2:
-                # Check if it's a match
-                word1_idx, word2_idx = game_data['selected']
-                word1, type1 = game_data['words'][word1_idx]
-                word2, type2 = game_data['words'][word2_idx]
-                
-                # Check if they form a pair
-                is_match = False
-                for pair in game_data['pairs']:
-                    if (word1 == pair['english'] and word2 == pair['synonym']) or \
-                       (word1 == pair['synonym'] and word2 == pair['english']):
-                        is_match = True
-                        break
-                
-                if is_match:
-                    game_data['matched'].extend(game_data['selected'])
-                    game_data['score'] += 1
-                    await query.answer("✅ Great match!")
-                else:
-                    await query.answer("❌ Not a match, try again!")
-                
-                game_data['selected'] = []
-                
-                # Check if game is complete
-                if len(game_data['matched']) == len(game_data['words']):
-                    user_progress[user_id]['games_played'] += 1
-                    user_progress[user_id]['vocab_score'] += game_data['score']
-                    
-                    message = f"""🎉 **Congratulations!**
-
-You matched all pairs correctly!
-
-**Score:** {game_data['score']}/4
-**Total Games Played:** {user_progress[user_id]['games_played']}
-
-Your vocabulary skills are improving! 🌟"""
-                    
-                    keyboard = [
-                        [InlineKeyboardButton("🔄 Play Again", callback_data="word_match_start")],
-                        [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
-                    
-                    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-                    
-                    # Clear game data
-                    if user_id in user_game_data:
-                        del user_game_data[user_id]
-                    return
-        
-        # Update display
-        message = """🎯 **Word Matching Game**
-
-Match the synonyms! Select two words that have similar meanings.
-
-**Selected:** """ + (", ".join([game_data['words'][i][0] for i in game_data['selected']]) if game_data['selected'] else "None") + f"""
-**Matches Found:** {len(game_data['matched'])//2}/4
-
-**Words to match:**"""
-        
-        keyboard = []
-        row = []
-        for i, (word, word_type) in enumerate(game_data['words']):
-            if i % 2 == 0 and i > 0:
-                keyboard.append(row)
-                row = []
-            
-            if i in game_data['matched']:
-                button_text = f"✅ {word}"
-            elif i in game_data['selected']:
-                button_text = f"🔸 {word}"
-            else:
-                button_text = word
-            
-            row.append(InlineKeyboardButton(button_text, callback_data=f"word_match_select_{i}"))
-        if row:
-            keyboard.append(row)
-        
-        keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-
-async def handle_fill_blanks(query, context):
-    """Handle fill in the blanks game"""
-    user_id = query.from_user.id
-    action = query.data.replace("fill_blank_", "")
-    
-    if action == "start":
-        # Start fill in the blanks game
-        import random
-        sentence_data = random.choice(FILL_BLANK_SENTENCES)
-        
-        user_game_data[user_id] = {
-            'game_type': 'fill_blank',
-            'current_sentence': sentence_data,
-            'score': 0,
-            'question_count': 1,
-            'total_questions': 3
-        }
-        
-        message = f"""✏️ **Fill in the Blanks** (Question 1/3)
-
-Complete the sentence by choosing the correct word:
-
-**"{sentence_data['sentence']}"**
-
-💡 **Hint:** {sentence_data['hint']}"""
-        
-        keyboard = []
-        for i, option in enumerate(sentence_data['options']):
-            keyboard.append([InlineKeyboardButton(f"{chr(65+i)}. {option}", callback_data=f"fill_blank_answer_{i}")])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-    
-    elif action.startswith("answer_"):
-        # Handle answer
-        selected = int(action.replace("answer_", ""))
-        game_data = user_game_data.get(user_id, {})
-        
-        if not game_data:
-            await query.answer("Game session expired. Please start a new game.")
-            return
-        
-        correct_answer = game_data['current_sentence']['correct']
-        is_correct = selected == correct_answer
-        
-        if is_correct:
-            game_data['score'] += 1
-            result_text = "✅ Perfect!"
-        else:
-            result_text = f"❌ Not quite! The correct answer was: {game_data['current_sentence']['options'][correct_answer]}"
-        
-        # Show completed sentence
-        completed_sentence = game_data['current_sentence']['sentence'].replace('___', f"**{game_data['current_sentence']['options'][correct_answer]}**")
-        
-        if game_data['question_count'] < game_data['total_questions']:
-            # Continue to next question
-            await query.answer(result_text)
-            game_data['question_count'] += 1
-            
-            # Get next sentence
-            import random
-            sentence_data = random.choice(FILL_BLANK_SENTENCES)
-            game_data['current_sentence'] = sentence_data
-            
-            message = f"""✏️ **Fill in the Blanks** (Question {game_data['question_count']}/3)
-
-{result_text}
-**Complete sentence:** "{completed_sentence}"
-
-**New sentence:**
-"{sentence_data['sentence']}"
-
-💡 **Hint:** {sentence_data['hint']}"""
-            
-            keyboard = []
-            for i, option in enumerate(sentence_data['options']):
-                keyboard.append([InlineKeyboardButton(f"{chr(65+i)}. {option}", callback_data=f"fill_blank_answer_{i}")])
-            
-            keyboard.append([InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")])
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-        else:
-            # Game completed
-            final_score = game_data['score']
-            user_progress[user_id]['grammar_score'] += final_score
-            user_progress[user_id]['games_played'] += 1
-            
-            message = f"""🎯 **Fill in the Blanks Complete!**
-
-{result_text}
-**Complete sentence:** "{completed_sentence}"
+🚀 **Ready to learn and have fun?**""".format(**progress.to_dict())
+    
+    await render_cache.edit(query, message, reply_markup=MINI_APP_KEYBOARD, parse_mode='Markdown')
+
+class VocabularyQuiz(QuizGame):
+    """Pick the definition of a word: due reviews first, then new words"""
+    name = 'vocab'
+    title = "📚 **Vocabulary Quiz**"
+    complete_title = "🎯 **Quiz Complete!**"
+    total = 5
+    shuffle = True
+    option_width = 50
+    restart = ("🔄 Play Again", "vocab_quiz")
+    closing = "Great job! Keep practicing to improve your vocabulary! 📚✨"
+
+    def next_item(self, user_id, previous):
+        return next_word(user_id, get_progress(user_id).level, exclude=previous and previous['word'])
+
+    def ask(self, item):
+        prompt = f"**Word:** `{item['word'].upper()}`\n\n**Choose the correct definition:**"
+        return prompt, [item['definition']] + wrong_definitions(item), 0
+
+    def explain(self, item, right_option):
+        return f"\n\n💡 **Example:** {item['example']}"
+
+    def rate(self, user_id, item, correct):
+        review_scheduler.review(user_id, item['word'], correct)
+        adaptive_engine.record(get_progress(user_id), self.name, item, correct)
+
+    def finish(self, user_id, score):
+        progress = get_progress(user_id)
+        progress.vocab_score += score
+        level_line = finish_game(user_id, progress, score)
+        return f"**Total Vocabulary Score:** {progress.vocab_score}\n{level_line}"
+
+class GrammarQuiz(QuizGame):
+    """Choose the grammatically correct option"""
+    name = 'grammar'
+    title = "📝 **Grammar Challenge**"
+    complete_title = "🎯 **Grammar Challenge Complete!**"
+    restart = ("🔄 Try Again", "grammar_quiz")
+    closing = "Excellent work! Grammar is the foundation of good English! 📝✨"
+
+    def next_item(self, user_id, previous):
+        return pick_items(self.name, 'grammar', user_id, exclude=previous)[0]
+
+    def ask(self, item):
+        return f"{item['question']}\n\n**Choose the correct answer:**", item['options'], item['correct']
+
+    def explain(self, item, right_option):
+        return f"\n\n💡 **Explanation:** {item['explanation']}"
+
+    def rate(self, user_id, item, correct):
+        adaptive_engine.record(get_progress(user_id), self.name, item, correct)
+
+    def finish(self, user_id, score):
+        progress = get_progress(user_id)
+        progress.grammar_score += score
+        level_line = finish_game(user_id, progress, score)
+        return f"**Total Grammar Score:** {progress.grammar_score}\n{level_line}"
+
+class FillBlankGame(QuizGame):
+    """Complete a sentence with the missing word"""
+    name = 'fill_blank'
+    title = "✏️ **Fill in the Blanks**"
+    complete_title = "🎯 **Fill in the Blanks Complete!**"
+    right_text = "✅ Perfect!"
+    wrong_text = "❌ Not quite! The correct answer was: {}"
+    restart = ("🔄 Play Again", "fill_blank_start")
+    closing = "Great job completing the sentences! 📝✨"
+
+    def next_item(self, user_id, previous):
+        return pick_items(self.name, 'fill_blank', user_id, exclude=previous)[0]
+
+    def ask(self, item):
+        prompt = f"""Complete the sentence by choosing the correct word:
+
+**"{item['sentence']}"**
+
+💡 **Hint:** {item['hint']}"""
+        return prompt, item['options'], item['correct']
+
+    def explain(self, item, right_option):
+        completed = item['sentence'].replace('___', f"**{right_option}**")
+        return f'\n**Complete sentence:** "{completed}"'
+
+    def rate(self, user_id, item, correct):
+        adaptive_engine.record(get_progress(user_id), self.name, item, correct)
+
+    def finish(self, user_id, score):
+        progress = get_progress(user_id)
+        progress.grammar_score += score
+        level_line = finish_game(user_id, progress, score)
+        return f"**Total Grammar Score:** {progress.grammar_score}\n{level_line}"
+
+class WordMatchGame(MatchGame):
+    """Match four words with their synonyms"""
+    name = 'word_match'
+    restart = ("🔄 Play Again", "word_match_start")
+
+    def next_pairs(self, user_id):
+        return pick_items(self.name, 'word_pairs', user_id, count=4)
+
+    def rate(self, user_id, pair, correct, guess):
+        adaptive_engine.record(get_progress(user_id), self.name, pair, correct, guess=guess)
+
+    def finish(self, user_id, score):
+        progress = get_progress(user_id)
+        progress.vocab_score += score
+        level_line = finish_game(user_id, progress, score)
+        return f"**Total Games Played:** {progress.games_played}\n{level_line}"
+
+def award_daily_bonus(user_id, kind, streak):
+    """Credit a completed daily challenge"""
+    progress = get_progress(user_id)
+    if kind.game == 'grammar':
+        progress.grammar_score += kind.bonus
+    else:
+        progress.vocab_score += kind.bonus
+    progress.streak_days = streak
+    leaderboards.update(user_id, progress, gained=kind.bonus)
 
-**Final Score:** {final_score}/3
-**Total Grammar Score:** {user_progress[user_id]['grammar_score']}
+# The day's challenge is derived from the date (same day in the broadcast's timezone)
+daily_challenges = DailyChallengeService(state_store, content_bank, award_daily_bonus, render_cache, DAILY_BROADCAST_TZ)
 
-Great job completing the sentences! 📝✨"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔄 Play Again", callback_data="fill_blank_start")],
-                [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
-            
-            # Clear game data
-            if user_id in user_game_data:
-                del user_game_data[user_id]
+# Mini app games share sessions, the render path and answer timing
+games = GameEngine(user_game_data, render_cache, on_finish=daily_challenges.complete)
+games.add(VocabularyQuiz())
+games.add(GrammarQuiz())
+games.add(FillBlankGame())
+games.add(WordMatchGame())
 
 async def handle_daily_challenge(query, context):
-    """Handle daily challenge"""
-    user_id = query.from_user.id
-    
-    # Simple daily challenge - mixed mini quiz
-    import random
-    challenge_type = random.choice(['vocab', 'grammar', 'word_match'])
-    
-    if challenge_type == 'vocab':
-        message = """🏆 **Daily Challenge - Vocabulary Master**
-
-Today's challenge: Score 4/5 on a vocabulary quiz to earn bonus points!
+    """Show today's daily challenge"""
+    await daily_challenges.show(query)
 
-**Reward:** +5 bonus points
-**Current streak:** {} days""".format(user_progress.get(user_id, {}).get('streak_days', 0))
-        
-        keyboard = [
-            [InlineKeyboardButton("🎯 Accept Challenge", callback_data="vocab_quiz")],
-            [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-        ]
-    elif challenge_type == 'grammar':
-        message = """🏆 **Daily Challenge - Grammar Expert**
-
-Today's challenge: Get perfect score on grammar quiz to earn bonus points!
-
-**Reward:** +3 bonus points
-**Current streak:** {} days""".format(user_progress.get(user_id, {}).get('streak_days', 0))
-        
-        keyboard = [
-            [InlineKeyboardButton("🎯 Accept Challenge", callback_data="grammar_quiz")],
-            [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-        ]
-    else:
-        message = """🏆 **Daily Challenge - Matching Master**
-
-Today's challenge: Complete word matching game without mistakes!
-
-**Reward:** +4 bonus points
-**Current streak:** {} days""".format(user_progress.get(user_id, {}).get('streak_days', 0))
-        
-        keyboard = [
-            [InlineKeyboardButton("🎯 Accept Challenge", callback_data="word_match_start")],
-            [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
-        ]
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+async def handle_daily_accept(query, context):
+    """Start today's challenge with its fixed question set"""
+    challenge = daily_challenges.challenge()
+    level = user_progress.get(query.from_user.id, UserProgress()).level
+    await games.start(query, challenge.kind.game, challenge.items_for(level), challenge.day)
 
 async def handle_progress_stats(query, context):
     """Handle progress statistics"""
     user_id = query.from_user.id
-    stats = user_progress.get(user_id, {
-        'vocab_score': 0,
-        'grammar_score': 0,
-        'games_played': 0,
-        'streak_days': 0,
-        'level': 'beginner'
-    })
+    stats = user_progress.get(user_id, UserProgress())
     
-    total_score = stats['vocab_score'] + stats['grammar_score']
+    total_score = stats.vocab_score + stats.grammar_score
+    rank = leaderboards.overall.rank(user_id)
     
     # Calculate achievements
     achievements = []
-    if stats['games_played'] >= 10:
+    if stats.games_played >= 10:
         achievements.append("🎮 Game Master (10+ games)")
-    if stats['vocab_score'] >= 25:
+    if stats.vocab_score >= 25:
         achievements.append("📚 Vocabulary Expert (25+ vocab points)")
-    if stats['grammar_score'] >= 15:
+    if stats.grammar_score >= 15:
         achievements.append("📝 Grammar Guru (15+ grammar points)")
-    if stats['level'] == 'advanced':
+    if stats.level == 'advanced':
         achievements.append("🎓 Advanced Learner")
     
     if not achievements:
@@ -1416,14 +921,15 @@ async def handle_progress_stats(query, context):
     message = f"""📊 **Your Learning Progress**
 
 🎯 **Scores:**
-• Vocabulary: {stats['vocab_score']} points
-• Grammar: {stats['grammar_score']} points
+• Vocabulary: {stats.vocab_score} points
+• Grammar: {stats.grammar_score} points
 • Total Score: {total_score} points
 
 🎮 **Activity:**
-• Games Played: {stats['games_played']}
-• Current Level: {stats['level'].title()}
-• Streak: {stats['streak_days']} days
+• Games Played: {stats.games_played}
+• Current Level: {stats.level.title()}
+• Streak: {daily_challenges.streak(user_id)} days
+• Global Rank: {f"#{rank} of {len(leaderboards.overall)}" if rank else "not ranked yet"}
 
 🏆 **Achievements:**
 {chr(10).join(achievements)}
@@ -1435,16 +941,61 @@ async def handle_progress_stats(query, context):
 Keep learning and improving! 🌟"""
     
     keyboard = [
+        [InlineKeyboardButton("🏆 Leaderboards", callback_data="leaderboard_global")],
         [InlineKeyboardButton("🎮 Play More Games", callback_data="back_to_miniapp")],
         [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
+    await render_cache.edit(query, message, reply_markup=reply_markup, parse_mode='Markdown')
 
-async def handle_help_mode(query, context):
-    """Handle help mode"""
-    help_message = f"""📚 **Education Bot Help**
+LEADERBOARD_MEDALS = ["🥇", "🥈", "🥉"]
+
+async def handle_leaderboard(query, context, board_name):
+    """Show the top 10 of the global, weekly or own-level leaderboard and the user's rank"""
+    user_id = query.from_user.id
+    if board_name == 'global':
+        board, title = leaderboards.board('global'), "🌍 **All-Time Leaderboard**"
+    elif board_name == 'weekly':
+        board, title = leaderboards.board('weekly'), "📅 **This Week's Leaderboard**"
+    elif board_name == 'level':
+        level = user_progress.get(user_id, UserProgress()).level
+        board, title = leaderboards.board(level), f"🎓 **{level.title()} Leaderboard**"
+    else:
+        await query.answer("Leaderboard not found!")
+        return
+    
+    lines = []
+    for position, (member, score) in enumerate(board.top(10), 1):
+        badge = LEADERBOARD_MEDALS[position - 1] if position <= len(LEADERBOARD_MEDALS) else f"{position}."
+        name = "**You**" if member == user_id else f"Learner #{member % 10000:04d}"
+        lines.append(f"{badge} {name} — {score} pts")
+    
+    rank = board.rank(user_id)
+    if rank is None:
+        your_rank = "You're not ranked yet. Finish a game to earn points!"
+    else:
+        your_rank = f"**Your rank:** #{rank} of {len(board)} ({board.score(user_id)} pts)"
+    
+    message = f"""{title}
+
+{chr(10).join(lines) if lines else "No scores yet. Be the first!"}
+
+{your_rank}"""
+    
+    keyboard = [
+        [
+            InlineKeyboardButton("🌍 All-Time", callback_data="leaderboard_global"),
+            InlineKeyboardButton("📅 Weekly", callback_data="leaderboard_weekly"),
+            InlineKeyboardButton("🎓 My Level", callback_data="leaderboard_level")
+        ],
+        [InlineKeyboardButton("🔙 Back to Progress", callback_data="progress_stats")]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    await render_cache.edit(query, message, reply_markup=reply_markup, parse_mode='Markdown')
+
+screens.add("help", f"""📚 **Education Bot Help**
 
 **Learning Modes:**
 • ✍️ **Writing**: Grammar, essays, creative writing
@@ -1471,18 +1022,19 @@ async def handle_help_mode(query, context):
 **Commands:**
 • /start - Show main menu
 • /help - Show this help
-• /status - Check rate limit status"""
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(help_message, reply_markup=reply_markup, parse_mode='Markdown')
+• /status - Check rate limit status""", [
+    [("🔙 Back to Menu", "back_to_main")]
+])
+
+async def handle_help_mode(query, context):
+    """Handle help mode"""
+    await screens.edit(query, "help")
 
 async def handle_status_mode(query, context):
     """Handle status mode"""
     user_id = query.from_user.id
-    remaining = rate_limiter.get_remaining_requests(user_id)
-    time_until_reset = rate_limiter.get_time_until_reset(user_id)
+    remaining = await rate_limiter.remaining_requests(user_id)
+    time_until_reset = await rate_limiter.time_until_reset(user_id)
     
     status_message = f"""📊 **Rate Limit Status**
 
@@ -1494,7 +1046,7 @@ You can send {remaining} more messages in this time window."""
     keyboard = [[InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_main")]]
     reply_markup = InlineKeyboardMarkup(keyboard)
     
-    await query.edit_message_text(status_message, reply_markup=reply_markup, parse_mode='Markdown')
+    await render_cache.edit(query, status_message, reply_markup=reply_markup, parse_mode='Markdown')
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /help command"""
@@ -1503,8 +1055,8 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /status command"""
     user_id = update.effective_user.id
-    remaining = rate_limiter.get_remaining_requests(user_id)
-    time_until_reset = rate_limiter.get_time_until_reset(user_id)
+    remaining = await rate_limiter.remaining_requests(user_id)
+    time_until_reset = await rate_limiter.time_until_reset(user_id)
     
     status_message = f"""📊 **Rate Limit Status**
 
@@ -1524,9 +1076,17 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
     current_mode = user_modes.get(user_id, 'general')
     
     try:
+        # Essays and writing are checked locally; only the AI costs a rate limit token
+        if current_mode == 'essay':
+            await handle_essay(update, context)
+            return
+        if current_mode == 'writing' and not is_request(message):
+            await handle_writing_hints(update, context)
+            return
+        
         # Check rate limit
-        if rate_limiter.is_rate_limited(user_id):
-            time_until_reset = rate_limiter.get_time_until_reset(user_id)
+        if await rate_limiter.check(user_id):
+            time_until_reset = await rate_limiter.time_until_reset(user_id)
             await update.message.reply_text(
                 f"⚠️ Rate limit exceeded! Please wait {int(time_until_reset / 1000)} seconds before sending another message."
             )
@@ -1558,8 +1118,8 @@ async def handle_voice_message(update: Update, context: ContextTypes.DEFAULT_TYP
     
     try:
         # Check rate limit
-        if rate_limiter.is_rate_limited(user_id):
-            time_until_reset = rate_limiter.get_time_until_reset(user_id)
+        if await rate_limiter.check(user_id):
+            time_until_reset = await rate_limiter.time_until_reset(user_id)
             await update.message.reply_text(
                 f"⚠️ Rate limit exceeded! Please wait {int(time_until_reset / 1000)} seconds before sending another message."
             )
@@ -1591,8 +1151,8 @@ async def handle_audio_message(update: Update, context: ContextTypes.DEFAULT_TYP
     
     try:
         # Check rate limit
-        if rate_limiter.is_rate_limited(user_id):
-            time_until_reset = rate_limiter.get_time_until_reset(user_id)
+        if await rate_limiter.check(user_id):
+            time_until_reset = await rate_limiter.time_until_reset(user_id)
             await update.message.reply_text(
                 f"⚠️ Rate limit exceeded! Please wait {int(time_until_reset / 1000)} seconds before sending another message."
             )
@@ -1624,8 +1184,8 @@ async def handle_document_message(update: Update, context: ContextTypes.DEFAULT_
         
         try:
             # Check rate limit
-            if rate_limiter.is_rate_limited(user_id):
-                time_until_reset = rate_limiter.get_time_until_reset(user_id)
+            if await rate_limiter.check(user_id):
+                time_until_reset = await rate_limiter.time_until_reset(user_id)
                 await update.message.reply_text(
                     f"⚠️ Rate limit exceeded! Please wait {int(time_until_reset / 1000)} seconds before sending another message."
                 )
@@ -1649,21 +1209,274 @@ async def handle_document_message(update: Update, context: ContextTypes.DEFAULT_
     else:
         await update.message.reply_text('📄 I received a document, but I can only process audio files. Please send a voice message or audio file.')
 
+async def mark_user_reachable(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """A user who blocked the bot and wrote again gets broadcasts again"""
+    if update.effective_user is not None:
+        broadcast_service.mark_reachable(update.effective_user.id)
+
+async def check_out_shared_session(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Read the user's quiz session off the event loop before the handlers run"""
+    if update.effective_user is not None:
+        await user_game_data.checkout(update.effective_user.id)
+
+async def commit_shared_sessions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Write back quiz sessions changed while handling this update"""
+    await user_game_data.commit()
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle errors"""
     logger.error(f'Update {update} caused error {context.error}')
     if update and update.message:
         await update.message.reply_text('❌ An unexpected error occurred. Please try again later.')
 
+def with_mode(mode, handler):
+    """Wrap a handler so it switches the user's mode first"""
+    async def routed(query, context):
+        user_modes[query.from_user.id] = mode
+        await handler(query, context)
+    return routed
+
+def parse_book(rest):
+    """'pre_intermediate_3' -> ('pre_intermediate', 3)"""
+    level, book_index = rest.rsplit('_', 1)
+    return level, int(book_index)
+
+def parse_game_action(rest):
+    """'quiz' -> ('quiz',), 'answer_2' -> ('answer', 2)"""
+    action, _, selected = rest.partition('_')
+    return (action, int(selected)) if selected else (action,)
+
+# Button callbacks: exact keys and prefixes resolved in one lookup
+callback_router = CallbackRouter()
+callback_router.add("writing", with_mode('writing', handle_writing_mode))
+callback_router.add("essay", with_mode('essay', handle_essay_mode))
+callback_router.add("speaking", with_mode('speaking', handle_speaking_mode))
+callback_router.add("reading", with_mode('reading', handle_reading_mode))
+callback_router.add("listening", with_mode('listening', handle_listening_mode))
+callback_router.add("mini_app", with_mode('mini_app', handle_mini_app))
+callback_router.add("help", handle_help_mode)
+callback_router.add("status", handle_status_mode)
+callback_router.add("back_to_main", show_main_menu)
+callback_router.add("library", handle_library_mode)
+callback_router.add("back_to_reading", handle_reading_mode)
+callback_router.add("back_to_library", handle_library_mode)
+callback_router.add("listening_podcasts", handle_listening_podcasts)
+callback_router.add("listening_movies", handle_listening_movies)
+callback_router.add("listening_news", handle_listening_news)
+callback_router.add("listening_audiomate", handle_listening_audiomate)
+callback_router.add("back_to_listening", handle_listening_mode)
+callback_router.add("back_to_miniapp", handle_mini_app)
+callback_router.add("daily_challenge", handle_daily_challenge)
+callback_router.add("daily_accept", handle_daily_accept)
+callback_router.add("progress_stats", handle_progress_stats)
+callback_router.add_prefix("leaderboard_", handle_leaderboard, lambda rest: (rest,))
+callback_router.add_prefix("essay_ai_", handle_essay_ai, lambda rest: (rest,))
+callback_router.add_prefix("writing_ai_", handle_writing_ai, lambda rest: (rest,))
+callback_router.add_prefix("level_", handle_level_selection)
+callback_router.add_prefix("book_", handle_book_selection, parse_book)
+# Game handlers answer the query themselves, with the outcome of the tap
+for game in games.games:
+    callback_router.add_prefix(f"{game}_", games.route(game), parse_game_action, answers=True)
+callback_router.add_packed(BOOK, handle_book_selection)
+callback_router.add_packed(ANSWER, games.answer, answers=True)
+
+# Different chats are handled in parallel, each chat strictly in order
+update_processor = PerChatUpdateProcessor(CONCURRENT_UPDATES)
+
+# Every outgoing message is throttled globally and per chat
+outbound_dispatcher = OutboundDispatcher(OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST)
+
+def daily_broadcast_message(day):
+    """Message pushed to every user when the day's challenge opens"""
+    message = """🏆 **Today's Daily Challenge is ready!**
+
+A new challenge is waiting for you. Keep your streak going and earn bonus points!"""
+    keyboard = [[InlineKeyboardButton("🎯 Open Daily Challenge", callback_data="daily_challenge")]]
+    return message, InlineKeyboardMarkup(keyboard)
+
+def known_users():
+    """Everyone who has used the bot (private chat id == user id)"""
+    return set(user_modes.keys()) | set(user_progress.keys())
+
+broadcast_service = BroadcastService(
+    state_store, known_users, daily_broadcast_message,
+    DAILY_BROADCAST_TIME or '09:00', DAILY_BROADCAST_TZ, DAILY_BROADCAST_BATCH
+)
+
+# Health checks and metrics are served from the bot's own event loop
+http_server = HTTPServer(port=int(os.environ.get('PORT', 10000)))
+
+# getUpdates goes through this request so readiness can see the last good poll
+updates_request = MonitoredRequest()
+
+# Long-running tasks are cancelled on shutdown (Application.stop would wait on them)
+background_tasks = []
+
+async def sweep_game_sessions():
+    """Periodically expire idle quiz sessions and log session metrics"""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_S)
+        # The shared store deletes on its writer thread
+        removed = await user_game_data.sweep() if SHARED_STATE_PATH else user_game_data.sweep()
+        if removed:
+            sessions = await user_game_data.stats() if SHARED_STATE_PATH else user_game_data.stats()
+            logger.info(f'Expired {removed} idle game sessions: {sessions}')
+
+async def post_init(application: Application):
+    """Start background tasks and the HTTP server once the application is initialized"""
+    state_store.start()
+    await http_server.start()
+    # Load the Gemini client in the background once health checks are served
+    background_tasks.append(asyncio.create_task(asyncio.to_thread(gemini_service.warm_up)))
+    background_tasks.append(asyncio.create_task(asyncio.to_thread(writing_checker.warm_up)))
+    background_tasks.append(asyncio.create_task(sweep_game_sessions()))
+    background_tasks.append(asyncio.create_task(daily_challenges.run()))
+    if DAILY_BROADCAST_TIME:
+        background_tasks.append(asyncio.create_task(broadcast_service.run(application.bot)))
+
+async def post_shutdown(application: Application):
+    """Stop background tasks and flush pending user state before the process exits"""
+    await http_server.stop()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await state_store.stop()
+
+async def home_endpoint(request):
+    """Root endpoint"""
+    return 200, {'message': 'Education Bot is running!', 'status': 'active'}
+
+async def collect_metrics():
+    """Gather runtime metrics from the state, session and rate limit stores"""
+    # The shared stores count their rows on a worker thread
+    if SHARED_STATE_PATH:
+        sessions, limits = await user_game_data.stats(), await rate_limiter.stats()
+    else:
+        sessions, limits = user_game_data.stats(), rate_limiter.stats()
+    return {
+        'updates': update_processor.stats(),
+        'outbound': outbound_dispatcher.stats(),
+        'state_store': state_store.stats(),
+        'sessions': sessions,
+        'rate_limiter': limits,
+        'broadcast': broadcast_service.stats(),
+        'callbacks': callback_router.stats(),
+        'render_cache': render_cache.stats(),
+        'content': content_bank.stats(),
+        'reviews': review_scheduler.stats(),
+        'adaptive': adaptive_engine.stats(),
+        'games': games.stats(),
+        'leaderboards': leaderboards.stats(),
+        'daily_challenge': daily_challenges.stats(),
+        'writing': writing_service.stats(),
+        'essays': essay_service.stats(),
+    }
+
+def readiness_report(application, receiver=None):
+    """Health check body: ready when the bot runs and updates are arriving"""
+    checks = {'application_running': application.running}
+    if receiver is None:
+        # Long polling returns at least once per poll timeout when healthy
+        since_poll = updates_request.seconds_since_success()
+        checks['polling'] = since_poll is not None and since_poll < POLL_STALE_AFTER_S
+        last_update_at = updates_request.last_success_at
+    else:
+        last_update_at = receiver.stats()['last_update_at']
+    ready = all(checks.values())
+
+    breaker = gemini_service.breaker.stats()
+    if not ready:
+        status = 'unhealthy'
+    elif breaker['state'] != 'closed':
+        status = 'degraded'  # menus and quizzes still work without Gemini
+    else:
+        status = 'healthy'
+
+    outbound = outbound_dispatcher.stats()
+    return {
+        'status': status,
+        'service': 'Education Bot',
+        'version': '1.0',
+        'checks': checks,
+        'gemini_breaker': breaker,
+        'last_update_at': last_update_at,
+        'queues': {
+            'updates': application.update_queue.qsize(),
+            'waiting_chats': update_processor.stats()['waiting_chats'],
+            'outbound_interactive': outbound['queued_interactive'],
+            'outbound_bulk': outbound['queued_bulk'],
+            'state_pending': state_store.stats()['pending'],
+        },
+    }
+
+def register_http_routes(application, receiver=None):
+    """Route /health, / and /metrics (and the webhook, when given) on http_server"""
+    async def health_endpoint(request):
+        """Readiness check for deployment platforms (503 when not ready)"""
+        report = readiness_report(application, receiver)
+        return (503 if report['status'] == 'unhealthy' else 200), report
+
+    async def metrics_endpoint(request):
+        metrics = await collect_metrics()
+        metrics['update_queue'] = application.update_queue.qsize()
+        if receiver is None:
+            metrics['polling'] = updates_request.stats()
+        else:
+            metrics['webhook'] = receiver.stats()
+        return 200, metrics
+
+    http_server.route('GET', '/health', health_endpoint)
+    http_server.route('GET', '/', home_endpoint)
+    http_server.route('GET', '/metrics', metrics_endpoint)
+    if receiver is not None:
+        http_server.route('POST', WEBHOOK_PATH, receiver)
+
+async def run_webhook(application: Application):
+    """Receive updates from Telegram on the HTTP server instead of polling"""
+    receiver = WebhookReceiver(application.update_queue, application.bot, WEBHOOK_SECRET_TOKEN)
+    register_http_routes(application, receiver)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await application.initialize()
+    await post_init(application)
+    try:
+        await application.start()
+        await application.bot.set_webhook(
+            url=WEBHOOK_URL.rstrip('/') + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            allowed_updates=Update.ALL_TYPES
+        )
+        await stop_event.wait()
+    finally:
+        if application.running:
+            await application.stop()
+        await application.shutdown()
+        await post_shutdown(application)
+
 def main():
     """Start the bot and web server"""
-    # Start Flask server in a separate thread for health checks
-    flask_thread = threading.Thread(target=run_flask, daemon=True)
-    flask_thread.start()
-    print("🌐 Web server started for health checks")
-    
     # Create Telegram bot application
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(update_processor)
+        .rate_limiter(outbound_dispatcher)
+        .get_updates_request(updates_request)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    
+    # Users who write again are taken off the unreachable list first
+    application.add_handler(TypeHandler(Update, mark_user_reachable), group=-1)
+    
+    # Shared sessions are read off the event loop before the update is handled
+    if SHARED_STATE_PATH:
+        application.add_handler(TypeHandler(Update, check_out_shared_session), group=-2)
     
     # Add command handlers
     application.add_handler(CommandHandler("start", start_command))
@@ -1679,6 +1492,10 @@ def main():
     application.add_handler(MessageHandler(filters.AUDIO, handle_audio_message))
     application.add_handler(MessageHandler(filters.Document.ALL, handle_document_message))
     
+    # Shared sessions are written back after the update's handler has run
+    if SHARED_STATE_PATH:
+        application.add_handler(TypeHandler(Update, commit_shared_sessions), group=1)
+    
     # Add error handler
     application.add_error_handler(error_handler)
     
@@ -1690,7 +1507,12 @@ def main():
     print(f"Health check available at: http://localhost:{os.environ.get('PORT', 10000)}/health")
     
     # Run the bot
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if WEBHOOK_URL:
+        print(f"Receiving updates via webhook at {WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}")
+        asyncio.run(run_webhook(application))
+    else:
+        register_http_routes(application)
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,141 @@
+import asyncio
+import bisect
+import logging
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from telegram.error import BadRequest, Forbidden
+from utils.send_queue import PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastService:
+    """Pushes one message per day to every known user.
+
+    Recipients are walked in ascending user id order in batches. After each
+    batch the cursor (last user id handled) is checkpointed in the state
+    store and flushed, so a restart resumes right after the last finished
+    batch. Sends use bulk priority so the outbound dispatcher keeps them
+    behind interactive replies and inside Telegram's flood limits.
+    """
+
+    def __init__(self, state_store, recipients, render, send_time='09:00', timezone='UTC', batch_size=100):
+        self.state_store = state_store
+        self.checkpoints = state_store.register('broadcasts')
+        self.unreachable = state_store.register('broadcast_unreachable')
+        self.recipients = recipients
+        self.render = render
+        self.send_hour, self.send_minute = (int(part) for part in send_time.split(':'))
+        try:
+            self.timezone = ZoneInfo(timezone)
+        except ZoneInfoNotFoundError:
+            logger.error(f'Unknown timezone {timezone}, broadcasting on UTC')
+            self.timezone = ZoneInfo('UTC')
+        self.batch_size = batch_size
+        self.last_report = None
+
+    def _send_at(self, day):
+        return datetime(day.year, day.month, day.day, self.send_hour, self.send_minute, tzinfo=self.timezone)
+
+    def _seconds_until_next(self):
+        """Seconds until the next broadcast is due (0 if today's is due or unfinished)"""
+        now = datetime.now(self.timezone)
+        today = now.date()
+        checkpoint = self.checkpoints.get(today.isoformat())
+        if now >= self._send_at(today):
+            if checkpoint is None or not checkpoint['done']:
+                return 0
+            return (self._send_at(today + timedelta(days=1)) - now).total_seconds()
+        return (self._send_at(today) - now).total_seconds()
+
+    async def run(self, bot):
+        """Wait for each day's send time and broadcast"""
+        while True:
+            delay = self._seconds_until_next()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self.broadcast(bot, datetime.now(self.timezone).date())
+            except Exception as error:
+                logger.error(f'Daily broadcast failed: {error}')
+                await asyncio.sleep(60)
+
+    async def _send(self, bot, user_id, text, reply_markup):
+        try:
+            await bot.send_message(
+                chat_id=user_id,
+                text=text,
+                reply_markup=reply_markup,
+                parse_mode='Markdown',
+                rate_limit_args=PRIORITY_BULK
+            )
+            return True
+        except Forbidden as error:
+            # Blocked the bot or deleted the account: skip them until they
+            # write to the bot again
+            logger.info(f'User {user_id} is unreachable: {error}')
+            self.unreachable[user_id] = int(time.time())
+            return False
+        except BadRequest as error:
+            # Most likely a problem with the message itself: count it as
+            # failed, but keep the user
+            logger.warning(f'Broadcast to {user_id} was rejected: {error}')
+            return False
+
+    def mark_reachable(self, user_id):
+        """The user wrote to the bot again: include them in broadcasts"""
+        if user_id in self.unreachable:
+            del self.unreachable[user_id]
+
+    async def broadcast(self, bot, day):
+        """Send the day's message to everyone not reached yet"""
+        key = day.isoformat()
+        checkpoint = self.checkpoints.get(key) or {'cursor': None, 'sent': 0, 'failed': 0, 'done': False}
+        self.checkpoints[key] = checkpoint
+        if checkpoint['done']:
+            return checkpoint
+
+        recipients = sorted(set(self.recipients()) - set(self.unreachable.keys()))
+        start = 0 if checkpoint['cursor'] is None else bisect.bisect_right(recipients, checkpoint['cursor'])
+        remaining = len(recipients) - start
+        text, reply_markup = self.render(day)
+        logger.info(f'Broadcasting {key} to {remaining} users (resuming at {start})')
+
+        started = time.monotonic()
+        sent = 0
+        for offset in range(start, len(recipients), self.batch_size):
+            batch = recipients[offset:offset + self.batch_size]
+            results = await asyncio.gather(
+                *(self._send(bot, user_id, text, reply_markup) for user_id in batch),
+                return_exceptions=True
+            )
+            delivered = sum(1 for result in results if result is True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f'Broadcast send failed: {result}')
+            sent += delivered
+            checkpoint['sent'] += delivered
+            checkpoint['failed'] += len(batch) - delivered
+            checkpoint['cursor'] = batch[-1]
+            self.checkpoints.touch(key)
+            await self.state_store.flush()
+
+        checkpoint['done'] = True
+        self.checkpoints.touch(key)
+        await self.state_store.flush()
+
+        elapsed = time.monotonic() - started
+        self.last_report = {
+            'day': key,
+            'sent': checkpoint['sent'],
+            'failed': checkpoint['failed'],
+            'seconds': round(elapsed, 1),
+            'messages_per_second': round(sent / elapsed, 1) if elapsed else 0.0,
+        }
+        logger.info(f'Broadcast {key} finished: {self.last_report}')
+        return checkpoint
+
+    def stats(self):
+        return {'last_broadcast': self.last_report}
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from utils.screens import ScreenRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ChallengeKind:
+    game: str
+    title: str
+    goal: str
+    bonus: int
+    # Content bank the questions come from, how many, and the mistakes allowed
+    bank: str
+    count: int
+    max_misses: int
+
+
+KINDS = (
+    ChallengeKind('vocab', "Vocabulary Master", "Score 4/5 on a vocabulary quiz to earn bonus points!", 5, 'vocabulary', 5, 1),
+    ChallengeKind('grammar', "Grammar Expert", "Get perfect score on grammar quiz to earn bonus points!", 3, 'grammar', 3, 0),
+    ChallengeKind('word_match', "Matching Master", "Complete word matching game without mistakes!", 4, 'word_pairs', 4, 0),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DailyChallenge:
+    day: str
+    kind: ChallengeKind
+    # Question set per content group (level); '' for banks without groups
+    items: dict
+
+    def items_for(self, level):
+        return self.items.get(level) or next(iter(self.items.values()))
+
+
+class DailyChallengeService:
+    """The day's challenge, the same for every user and every process.
+
+    Each day's challenge kind and question set are drawn from a PRNG seeded
+    with the date, so any worker (or a restart) derives the same day. run()
+    prepares today and tomorrow ahead of time; the screens a tap shows are
+    built once per day and variant, so a tap is a cache read. Completions
+    are recorded in ``completions`` (user_id -> [day, streak]): a day counts
+    once, however often the challenge is replayed, and completing the day
+    after the last one extends the streak.
+    """
+
+    def __init__(self, state_store, content_bank, on_complete, render_cache, timezone='UTC'):
+        self.content_bank = content_bank
+        self.completions = state_store.register('daily_completions')
+        self.on_complete = on_complete
+        self.screens = ScreenRegistry(render_cache)
+        try:
+            self.timezone = ZoneInfo(timezone)
+        except ZoneInfoNotFoundError:
+            logger.error(f'Unknown timezone {timezone}, using UTC for daily challenges')
+            self.timezone = ZoneInfo('UTC')
+        self.challenges = {}
+        self.completed = 0
+        self.attempts = 0
+
+    def today(self):
+        return datetime.now(self.timezone).date()
+
+    def generate(self, day):
+        """The challenge of a day, derived from the date alone"""
+        rng = random.Random(f'daily-challenge:{day.isoformat()}')
+        kind = rng.choice(KINDS)
+        items = {}
+        for group in self.content_bank.groups(kind.bank):
+            count = min(kind.count, self.content_bank.count(kind.bank, group or None))
+            items[group] = tuple(self.content_bank.sample(kind.bank, count, group or None, rng))
+        return DailyChallenge(day.isoformat(), kind, items)
+
+    def prepare(self, day):
+        key = day.isoformat()
+        if key not in self.challenges:
+            self.challenges[key] = self.generate(day)
+        return self.challenges[key]
+
+    def challenge(self, day=None):
+        day = day or self.today()
+        return self.challenges.get(day.isoformat()) or self.prepare(day)
+
+    def _drop_before(self, day):
+        key = day.isoformat()
+        for old in [old for old in self.challenges if old < key]:
+            del self.challenges[old]
+        for name in [name for name in self.screens.screens if name[0] < key]:
+            del self.screens.screens[name]
+
+    def _seconds_until_tomorrow(self):
+        now = datetime.now(self.timezone)
+        tomorrow = now.date() + timedelta(days=1)
+        midnight = datetime(tomorrow.year, tomorrow.month, tomorrow.day, tzinfo=self.timezone)
+        return (midnight - now).total_seconds()
+
+    async def run(self):
+        """Keep today's and tomorrow's challenges ready"""
+        while True:
+            today = self.today()
+            self._drop_before(today)
+            self.prepare(today)
+            self.prepare(today + timedelta(days=1))
+            await asyncio.sleep(self._seconds_until_tomorrow() + 1)
+
+    def streak(self, user_id, today=None):
+        """Current streak: days in a row up to today or yesterday"""
+        record = dict.get(self.completions, user_id)
+        if record is None:
+            return 0
+        today = today or self.today()
+        if record[0] in (today.isoformat(), (today - timedelta(days=1)).isoformat()):
+            return record[1]
+        return 0
+
+    def _screen(self, challenge, streak, done):
+        name = (challenge.day, streak, done)
+        if name in self.screens.screens:
+            return name
+        kind = challenge.kind
+        if done:
+            message = f"""🏆 **Daily Challenge - {kind.title}**
+
+✅ **Completed today!** Come back tomorrow for a new challenge.
+
+**Current streak:** {streak} days"""
+            rows = [[("🎮 Play More Games", "back_to_miniapp")]]
+        else:
+            message = f"""🏆 **Daily Challenge - {kind.title}**
+
+Today's challenge: {kind.goal}
+
+**Reward:** +{kind.bonus} bonus points
+**Current streak:** {streak} days"""
+            rows = [[("🎯 Accept Challenge", "daily_accept")]]
+        rows.append([("🔙 Back to Mini App", "back_to_miniapp")])
+        self.screens.add(name, message, rows)
+        return name
+
+    async def show(self, query):
+        """Show today's challenge, or that the user already completed it"""
+        user_id = query.from_user.id
+        today = self.today()
+        challenge = self.challenge(today)
+        record = dict.get(self.completions, user_id)
+        done = record is not None and record[0] == challenge.day
+        await self.screens.edit(query, self._screen(challenge, self.streak(user_id, today), done))
+
+    def complete(self, user_id, session):
+        """Record a finished round that played a challenge; returns the
+        line to add to its results"""
+        if session.challenge is None:
+            return ''
+        self.attempts += 1
+        challenge = self.challenge(date.fromisoformat(session.challenge))
+        kind = challenge.kind
+        if session.misses > kind.max_misses:
+            return f"\n🏆 Daily challenge not completed this time: {kind.goal} Try again today!"
+        record = dict.get(self.completions, user_id)
+        if record is not None and record[0] >= challenge.day:
+            return "\n🏆 Daily challenge already completed. Come back tomorrow!"
+        yesterday = (date.fromisoformat(challenge.day) - timedelta(days=1)).isoformat()
+        streak = record[1] + 1 if record is not None and record[0] == yesterday else 1
+        self.completions[user_id] = [challenge.day, streak]
+        self.completed += 1
+        self.on_complete(user_id, kind, streak)
+        return f"\n🏆 **Daily Challenge Complete!** +{kind.bonus} bonus points\n🔥 **Streak:** {streak} days"
+
+    def stats(self):
+        return {
+            'prepared_days': sorted(self.challenges),
+            'cached_screens': len(self.screens.screens),
+            'attempts': self.attempts,
+            'completed': self.completed,
+        }
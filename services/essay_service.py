@@ -0,0 +1,92 @@
+import logging
+
+from telegram.helpers import escape_markdown
+
+logger = logging.getLogger(__name__)
+
+RUBRIC_PROMPT = """Assess this essay by an English learner. A local checker already found:
+{findings}
+
+Score it from 0 to 5 on each of: Task & Content, Organization, Vocabulary, Grammar & Spelling.
+Give the four scores, then the three most useful corrections (quote the original and the fix),
+then one sentence of encouragement. Keep it under 250 words.
+
+Essay:
+{text}"""
+
+
+class EssayService:
+    """Essay assessment in two tiers.
+
+    Every essay is scored by the local EssayScorer first, which answers in
+    about a millisecond. Gemini is asked for the detailed rubric only when
+    the local result says the text needs it (or the user asks for it), and
+    its feedback is cached with the local score by the text's hash, so a
+    resubmitted essay costs no second request.
+    """
+
+    def __init__(self, scorer, llm):
+        self.scorer = scorer
+        self.llm = llm
+        self.local_only = 0
+        self.ai_requests = 0
+
+    def review(self, text):
+        """(key, EssayScore) of text"""
+        key, result = self.scorer.score(text)
+        if not result.needs_ai:
+            self.local_only += 1
+        return key, result
+
+    def report(self, result):
+        """Local feedback on a scored essay (Markdown; the quoted text is escaped)"""
+        lines = [f"📝 **Essay Score: {result.score}/100**", ""]
+        lines.append(f"**Words:** {result.words}  **Sentences:** {result.sentences}")
+        lines.append(f"**Average sentence length:** {result.avg_sentence_length} words")
+        lines.append(f"**Word variety:** {round(result.diversity * 100)}%")
+        if result.long_sentences:
+            lines.append(f"✂️ {result.long_sentences} very long sentence(s): try splitting them.")
+        if result.misspelled:
+            lines.append("")
+            lines.append("**Spelling:** " + ", ".join(
+                f"{escape_markdown(word)} → {escape_markdown(suggestion)}" for word, suggestion in result.misspelled[:8]
+            ))
+        if result.issues:
+            lines.append("")
+            lines.append("**Grammar:**")
+            lines.extend(f"• {escape_markdown(issue)}" for issue in result.issues[:8])
+        if not result.misspelled and not result.issues:
+            lines.append("")
+            lines.append("✅ No spelling or grammar problems found.")
+        return "\n".join(lines)
+
+    def findings(self, result):
+        found = [f"{word} -> {suggestion}" for word, suggestion in result.misspelled]
+        found.extend(result.issues)
+        if result.long_sentences:
+            found.append(f"{result.long_sentences} sentence(s) over 30 words")
+        return "\n".join(f"- {item}" for item in found) or "- nothing"
+
+    def cached(self, key):
+        """Detailed feedback already given for this text, or None"""
+        return self.scorer.feedback(key)
+
+    async def detailed(self, key):
+        """Detailed AI feedback on the essay scored under key; None if the
+        essay is no longer cached"""
+        feedback = self.scorer.feedback(key)
+        if feedback is not None:
+            return feedback
+        scored = self.scorer.lookup(key)
+        if scored is None:
+            return None
+        text, result = scored
+        self.ai_requests += 1
+        feedback = await self.llm.generate_text(RUBRIC_PROMPT.format(findings=self.findings(result), text=text), mode='writing')
+        self.scorer.store_feedback(key, feedback)
+        return feedback
+
+    def stats(self):
+        stats = self.scorer.stats()
+        stats.update(local_only=self.local_only, ai_requests=self.ai_requests)
+        return stats
@@ -1,13 +1,30 @@
-import google.generativeai as genai
 from config import GEMINI_API_KEY, MAX_MESSAGE_LENGTH
+from utils.circuit_breaker import CircuitBreaker
 
 class GeminiService:
     def __init__(self):
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # google.generativeai takes most of the bot's import time, so the
+        # client is created on first use (or by warm_up after startup)
+        self._model = None
+        # Fail fast while Gemini is down instead of every user waiting on it
+        self.breaker = CircuitBreaker()
     
+    @property
+    def model(self):
+        if self._model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=GEMINI_API_KEY)
+            self._model = genai.GenerativeModel('gemini-1.5-flash')
+        return self._model
+
+    def warm_up(self):
+        """Create the client ahead of the first request (blocking; run in a thread)"""
+        return self.model
+
     async def generate_text(self, prompt, context='', mode='general'):
         """Generate text response using Gemini with mode-specific context"""
+        if not self.breaker.allow():
+            raise Exception('The AI service is temporarily unavailable. Please try again in a minute.')
         try:
             # Add mode-specific context
             mode_contexts = {
@@ -21,17 +38,43 @@ class GeminiService:
             mode_context = mode_contexts.get(mode, mode_contexts['general'])
             full_prompt = f"{mode_context}\n\nContext: {context}\n\nUser: {prompt}" if context else f"{mode_context}\n\nUser: {prompt}"
             
-            response = self.model.generate_content(full_prompt)
-            text = response.text
-            
-            # Truncate if response is too long for Telegram
-            if len(text) > MAX_MESSAGE_LENGTH:
-                text = text[:MAX_MESSAGE_LENGTH - 3] + '...'
-            
-            return text
+            response = await self.model.generate_content_async(full_prompt)
         except Exception as error:
             print(f'Error generating text with Gemini: {error}')
+            self.breaker.record_failure(error)
+            raise Exception('Failed to generate response. Please try again later.')
+        finally:
+            self.breaker.release()
+        
+        # Gemini answered; a blocked or empty response is not an outage
+        self.breaker.record_success()
+        try:
+            text = response.text
+        except Exception as error:
+            print(f'Gemini returned no text: {error}')
             raise Exception('Failed to generate response. Please try again later.')
+        
+        # Truncate if response is too long for Telegram
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[:MAX_MESSAGE_LENGTH - 3] + '...'
+        
+        return text
+    
+    async def generate_raw(self, prompt, json_output=False):
+        """Send prompt as is and return the whole reply: no tutor context and
+        no truncation (for offline jobs such as content generation)"""
+        if not self.breaker.allow():
+            raise Exception('The AI service is temporarily unavailable. Please try again in a minute.')
+        try:
+            generation_config = {'response_mime_type': 'application/json'} if json_output else None
+            response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        except Exception as error:
+            self.breaker.record_failure(error)
+            raise
+        finally:
+            self.breaker.release()
+        self.breaker.record_success()
+        return response.text
     
     async def transcribe_voice(self, audio_buffer):
         """Transcribe voice message (placeholder)"""
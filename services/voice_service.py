@@ -1,5 +1,4 @@
 import os
-import requests
 from config import TELEGRAM_BOT_TOKEN, VOICE_DOWNLOAD_PATH, VOICE_FORMAT
 import time
 
@@ -21,7 +20,8 @@ class VoiceService:
             file_name = f"{int(time.time())}_{file_id}.{VOICE_FORMAT}"
             local_path = os.path.join(VOICE_DOWNLOAD_PATH, file_name)
             
-            # Download the file
+            # Download the file (requests is only loaded once someone sends voice)
+            import requests
             file_url = f"https://api.telegram.org/file/bot{TELEGRAM_BOT_TOKEN}/{file_path}"
             response = requests.get(file_url, stream=True)
             response.raise_for_status()
@@ -0,0 +1,72 @@
+import logging
+
+from telegram.helpers import escape_markdown
+
+from utils.writing_checker import TextCache, text_key
+
+logger = logging.getLogger(__name__)
+
+
+class WritingService:
+    """Instant writing-mode hints.
+
+    Text sent in writing mode is checked by the local WritingChecker and
+    answered at once with its spelling and grammar hints; Gemini is asked
+    only when the user taps "Ask AI for more". Checked texts and the AI
+    replies are cached by the text's hash, so asking twice costs one
+    request.
+    """
+
+    def __init__(self, checker, llm, max_texts=2000):
+        self.checker = checker
+        self.llm = llm
+        # key -> [text, AI reply or None]
+        self.cache = TextCache(max_texts)
+        self.hints = 0
+        self.ai_requests = 0
+
+    def check(self, text):
+        """(key, misspelled, issues) of text"""
+        key = text_key(text)
+        misspelled, issues = self.checker.check(text)
+        if self.cache.get(key) is None:
+            self.cache.put(key, [text, None])
+        self.hints += 1
+        return key, misspelled, issues
+
+    def report(self, misspelled, issues):
+        """Hints on a checked text (Markdown; the quoted text is escaped)"""
+        if not misspelled and not issues:
+            return "✍️ **Writing check**\n\n✅ No spelling or grammar mistakes found."
+        lines = ["✍️ **Writing check**"]
+        if misspelled:
+            lines.append("")
+            lines.append("**Spelling:** " + ", ".join(
+                f"{escape_markdown(word)} → {escape_markdown(suggestion)}" for word, suggestion in misspelled[:8]
+            ))
+        if issues:
+            lines.append("")
+            lines.append("**Grammar:**")
+            lines.extend(f"• {escape_markdown(issue)}" for issue in issues[:8])
+        return "\n".join(lines)
+
+    def cached(self, key):
+        """AI reply already given for this text, or None"""
+        entry = self.cache.get(key)
+        return entry[1] if entry is not None else None
+
+    async def ask_ai(self, key):
+        """The writing tutor's reply to the text checked under key; None if
+        the text is no longer cached"""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] is None:
+            self.ai_requests += 1
+            entry[1] = await self.llm.process_message(entry[0], mode='writing')
+        return entry[1]
+
+    def stats(self):
+        stats = self.checker.stats()
+        stats.update(hints=self.hints, ai_requests=self.ai_requests, cached_texts=len(self.cache))
+        return stats
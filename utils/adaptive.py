@@ -0,0 +1,109 @@
+import math
+import random
+
+# Item difficulty priors for the content levels (logit scale)
+LEVEL_DIFFICULTY = {'beginner': -1.0, 'intermediate': 0.0, 'advanced': 1.0}
+# Chance of guessing a four-option question right
+GUESS = 0.25
+# Items are picked so the user should get about this share right
+TARGET_SUCCESS = 0.7
+# How far above an item's difficulty the ability is at that success rate
+TARGET_OFFSET = math.log((TARGET_SUCCESS - GUESS) / (1 - TARGET_SUCCESS))
+# Random candidates weighed per pick, and how fast the weight of an item
+# falls with its distance from the target difficulty
+CANDIDATES = 6
+SPREAD = 0.75
+# Answers before the level follows the ability estimate, and how far past
+# the midpoint between two levels the ability must go before it switches
+MIN_ANSWERS_FOR_LEVEL = 10
+LEVEL_MARGIN = 0.15
+# Step sizes shrink as more answers are seen
+USER_STEP = (0.8, 0.1)
+ITEM_STEP = (0.4, 0.05)
+
+
+def expected(ability, difficulty, guess=GUESS):
+    """Probability of a correct answer (Rasch model with a guessing floor)"""
+    return guess + (1 - guess) / (1 + math.exp(difficulty - ability))
+
+
+def step(limits, answers):
+    start, floor = limits
+    return max(floor, start / (1 + answers / 20))
+
+
+def item_key(game, item):
+    return f"{game}:{item.get('id', item.get('word'))}"
+
+
+class AdaptiveEngine:
+    """Online Elo-style estimates of user ability and item difficulty.
+
+    Each answer moves the user's ability and the item's difficulty by the
+    gap between the outcome and the expected probability; both steps are
+    O(1). Abilities live on UserProgress; learned item difficulties in
+    ``items`` ("game:id" -> [difficulty, answers]), falling back to the
+    item's own 'difficulty' prior.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.answers = 0
+
+    def difficulty(self, game, item):
+        # Plain dict read: looking an item up must not mark it for flushing
+        learned = dict.get(self.items, item_key(game, item))
+        return learned[0] if learned is not None else item.get('difficulty', 0.0)
+
+    def target(self, ability):
+        """Difficulty the user should be practising at"""
+        return ability - TARGET_OFFSET
+
+    def ability(self, progress):
+        if progress.answers == 0:
+            # Start from the level the user had before any answers were rated
+            return LEVEL_DIFFICULTY.get(progress.level, 0.0) + TARGET_OFFSET
+        return progress.ability
+
+    def choose(self, game, progress, candidates, count=1, rng=random):
+        """count of the candidates, favouring those near the user's target
+        difficulty while still varying when the candidates are few"""
+        target = self.target(self.ability(progress))
+        candidates = list(candidates)
+        chosen = []
+        while candidates and len(chosen) < count:
+            # The floor keeps far-off items possible (and the weights non-zero)
+            weights = [math.exp(-((self.difficulty(game, item) - target) / SPREAD) ** 2) + 1e-6 for item in candidates]
+            chosen.append(candidates.pop(rng.choices(range(len(candidates)), weights)[0]))
+        return chosen
+
+    def record(self, progress, game, item, correct, guess=GUESS):
+        """Update progress.ability and the item's difficulty after one answer"""
+        progress.ability = self.ability(progress)
+        key = item_key(game, item)
+        learned = self.items.get(key) or [item.get('difficulty', 0.0), 0]
+        surprise = (1.0 if correct else 0.0) - expected(progress.ability, learned[0], guess)
+        progress.ability += step(USER_STEP, progress.answers) * surprise
+        progress.answers += 1
+        learned[0] -= step(ITEM_STEP, learned[1]) * surprise
+        learned[1] += 1
+        self.items[key] = learned
+        self.answers += 1
+
+    def level_for(self, progress):
+        """Level matching the ability estimate, with hysteresis between levels"""
+        if progress.answers < MIN_ANSWERS_FOR_LEVEL:
+            return progress.level
+        target = self.target(progress.ability)
+        best = min(LEVEL_DIFFICULTY, key=lambda level: abs(LEVEL_DIFFICULTY[level] - target))
+        if progress.level in LEVEL_DIFFICULTY and best != progress.level:
+            midpoint = (LEVEL_DIFFICULTY[best] + LEVEL_DIFFICULTY[progress.level]) / 2
+            if abs(target - midpoint) < LEVEL_MARGIN:
+                return progress.level
+        return best
+
+    def stats(self):
+        return {
+            'rated_items': len(self.items),
+            'answers': self.answers,
+        }
@@ -0,0 +1,88 @@
+import base64
+import binascii
+
+# Packed payloads start with this marker; plain keys like "vocab_quiz" never do
+PACKED_PREFIX = '~'
+
+# Bump when a kind's fields change; older buttons then fail to decode and
+# are dropped as unmatched instead of being misread
+VERSION = 1
+
+# Telegram rejects callback_data longer than 64 bytes
+MAX_CALLBACK_BYTES = 64
+
+# Code tables for fields that hold names; only append, never reorder
+LEVELS = ('beginner', 'elementary', 'pre_intermediate', 'intermediate', 'upper_intermediate', 'advanced')
+GAMES = ('vocab', 'grammar', 'word_match', 'fill_blank')
+
+# Payload kinds: one entry per field, either None (unsigned integer) or the
+# code table the field's name is stored as an index into
+BOOK = 1
+ANSWER = 2
+SCHEMAS = {
+    BOOK: (LEVELS, None),                # level, book index
+    ANSWER: (GAMES, None, None),         # game, question number, option
+}
+KIND_NAMES = {BOOK: 'book', ANSWER: 'answer'}
+
+# base64url -> standard alphabet, so decoding can call binascii directly
+_FROM_URLSAFE = str.maketrans('-_', '+/')
+
+
+def pack(kind, *values):
+    """Encode a payload as '~' + base64url(version, kind, varint fields)"""
+    fields = SCHEMAS[kind]
+    if len(values) != len(fields):
+        raise ValueError(f'kind {kind} takes {len(fields)} values, got {len(values)}')
+
+    raw = bytearray((VERSION, kind))
+    for table, value in zip(fields, values):
+        if table is not None:
+            value = table.index(value)
+        if value < 0:
+            raise ValueError('packed values must be unsigned')
+        while value >= 0x80:
+            raw.append((value & 0x7F) | 0x80)
+            value >>= 7
+        raw.append(value)
+
+    data = PACKED_PREFIX + base64.urlsafe_b64encode(bytes(raw)).rstrip(b'=').decode('ascii')
+    if len(data) > MAX_CALLBACK_BYTES:
+        raise ValueError(f'callback data is {len(data)} bytes, limit is {MAX_CALLBACK_BYTES}')
+    return data
+
+
+def unpack(data):
+    """Decode packed callback data into (kind, values); ValueError if malformed or outdated"""
+    if not data.startswith(PACKED_PREFIX):
+        raise ValueError('not a packed payload')
+    encoded = data[1:]
+    try:
+        raw = binascii.a2b_base64((encoded + '=' * (-len(encoded) % 4)).translate(_FROM_URLSAFE))
+    except binascii.Error as error:
+        raise ValueError(f'bad payload encoding: {error}')
+    if len(raw) < 2 or raw[0] != VERSION:
+        raise ValueError('unsupported payload version')
+
+    kind = raw[1]
+    fields = SCHEMAS.get(kind)
+    if fields is None:
+        raise ValueError(f'unknown payload kind {kind}')
+
+    values = []
+    value = shift = 0
+    for byte in raw[2:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    if shift or len(values) != len(fields):
+        raise ValueError('payload does not match its schema')
+    for position, table in enumerate(fields):
+        if table is not None:
+            if values[position] >= len(table):
+                raise ValueError('payload code out of range')
+            values[position] = table[values[position]]
+    return kind, tuple(values)
@@ -0,0 +1,153 @@
+import logging
+import time
+from utils.callback_data import KIND_NAMES, PACKED_PREFIX, unpack
+
+logger = logging.getLogger(__name__)
+
+# Trie node key marking that a route ends at this node
+_ROUTE = ''
+
+
+class Route:
+    __slots__ = ('name', 'handler', 'parse', 'answers', 'calls', 'errors', 'total_s', 'max_s')
+
+    def __init__(self, name, handler, parse=None, answers=False):
+        self.name = name
+        self.handler = handler
+        self.parse = parse
+        self.answers = answers
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+
+class CallbackRouter:
+    """Maps callback_data to handlers without scanning a list of conditions.
+
+    Exact keys are a dict lookup. Prefix routes live in a character trie and
+    the longest registered prefix wins, so lookup cost depends on the length
+    of the data, not on how many routes exist. A prefix route's ``parse``
+    turns the rest of the data into handler arguments. Buttons are reused
+    across taps, so resolved (route, args) pairs are cached per callback data
+    and most taps cost a single dict lookup.
+    Packed payloads (see utils.callback_data) are routed by their kind and
+    the handler gets the decoded fields as arguments.
+    Handlers are called as ``handler(query, context, *args)``. The query
+    is answered before the handler runs, unless the route was added with
+    ``answers=True``: then the handler answers it (e.g. with a toast).
+    """
+
+    def __init__(self, cache_size=4096):
+        self.exact = {}
+        self.trie = {}
+        self.packed = {}
+        self.routes = []
+        self.cache = {}
+        self.cache_size = cache_size
+        self.unmatched = 0
+
+    def add(self, key, handler, answers=False):
+        route = Route(key, handler, answers=answers)
+        self.exact[key] = route
+        self.routes.append(route)
+        return route
+
+    def add_prefix(self, prefix, handler, parse=None, answers=False):
+        """Route every key starting with prefix; parse(rest) returns the handler args"""
+        route = Route(prefix + '*', handler, parse, answers)
+        node = self.trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_ROUTE] = route
+        self.routes.append(route)
+        return route
+
+    def add_packed(self, kind, handler, answers=False):
+        """Route packed payloads of one kind; the handler gets the decoded fields"""
+        route = Route(PACKED_PREFIX + KIND_NAMES.get(kind, str(kind)), handler, answers=answers)
+        self.packed[kind] = route
+        self.routes.append(route)
+        return route
+
+    def resolve(self, data):
+        """Return (route, args) for callback data, or (None, ()) if nothing matches"""
+        resolved = self.cache.get(data)
+        if resolved is not None:
+            return resolved
+        resolved = self._lookup(data)
+        if resolved[0] is not None and self.cache_size:
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[data] = resolved
+        return resolved
+
+    def _lookup(self, data):
+        route = self.exact.get(data)
+        if route is not None:
+            return route, ()
+        if data.startswith(PACKED_PREFIX):
+            kind, values = unpack(data)
+            return self.packed.get(kind), values
+
+        node = self.trie
+        match = None
+        end = 0
+        for index, char in enumerate(data):
+            node = node.get(char)
+            if node is None:
+                break
+            if _ROUTE in node:
+                match = node[_ROUTE]
+                end = index + 1
+        if match is None:
+            return None, ()
+
+        rest = data[end:]
+        if match.parse is None:
+            return match, (rest,)
+        return match, tuple(match.parse(rest))
+
+    async def dispatch(self, query, context):
+        """Answer the query and run the handler for query.data, recording its latency"""
+        try:
+            route, args = self.resolve(query.data or '')
+        except ValueError:
+            route = None
+        if route is None or not route.answers:
+            # A query can be answered only once
+            await query.answer()
+        if route is None:
+            self.unmatched += 1
+            logger.warning(f'No route for callback data {query.data!r}')
+            return False
+
+        started = time.perf_counter()
+        try:
+            await route.handler(query, context, *args)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            route.calls += 1
+            route.total_s += elapsed
+            if elapsed > route.max_s:
+                route.max_s = elapsed
+        return True
+
+    def stats(self):
+        """Per-route call counts and latency, for routes that were used"""
+        return {
+            'unmatched': self.unmatched,
+            'cached_keys': len(self.cache),
+            'routes': {
+                route.name: {
+                    'calls': route.calls,
+                    'errors': route.errors,
+                    'avg_ms': round(route.total_s / route.calls * 1000, 2),
+                    'max_ms': round(route.max_s * 1000, 2),
+                }
+                for route in self.routes if route.calls
+            },
+        }
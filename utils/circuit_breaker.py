@@ -0,0 +1,68 @@
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow()`` refuses calls for ``reset_timeout`` seconds. Then one trial
+    call is let through (half open): success closes the breaker, failure
+    opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.last_failure = None
+        self.last_success_at = None
+        self.rejected = 0
+
+    def allow(self):
+        """True if a call may go ahead now"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self.trial_running = False
+        if self.state == HALF_OPEN and not self.trial_running:
+            self.trial_running = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.trial_running = False
+        self.last_success_at = time.time()
+
+    def record_failure(self, error=None):
+        self.failures += 1
+        self.last_failure = str(error) if error is not None else None
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = self.clock()
+        self.trial_running = False
+
+    def release(self):
+        """End a call without an outcome (it was cancelled), so a half-open
+        breaker lets the next trial through"""
+        self.trial_running = False
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'rejected': self.rejected,
+            'last_failure': self.last_failure,
+            'last_success_at': self.last_success_at,
+        }
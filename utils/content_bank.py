@@ -0,0 +1,316 @@
+import csv
+import json
+import logging
+import mmap
+import os
+import random
+import struct
+from abc import ABC, abstractmethod
+
+from utils.adaptive import LEVEL_DIFFICULTY
+from utils.distractors import DistractorIndex
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EBQB'
+VERSION = 2
+# magic, version, directory length
+HEADER = struct.Struct('<4sHI')
+OFFSET = struct.Struct('<Q')
+INDEX = struct.Struct('<I')
+
+# A record's stable key (for find) is the first of these fields it has
+KEY_FIELDS = ('id', 'word')
+
+# CSV columns that hold lists ("a|b|c") or integers
+LIST_FIELDS = ('options',)
+INT_FIELDS = ('correct',)
+GROUP_COLUMNS = ('level', 'topic')
+
+
+def read_sources(paths):
+    """Read JSON and CSV sources into {bank: {group: [record, ...]}}.
+
+    A JSON source maps bank names to a list of records (one unnamed group)
+    or to {group: [records]}. A CSV source is one bank named after the file,
+    or "bank=path.csv"; its level or topic column becomes the group.
+    """
+    banks = {}
+    for path in paths:
+        bank_name, _, file_path = path.rpartition('=')
+        if file_path.endswith('.csv'):
+            bank_name = bank_name or os.path.splitext(os.path.basename(file_path))[0]
+            groups = banks.setdefault(bank_name, {})
+            with open(file_path, newline='', encoding='utf-8') as source:
+                for row in csv.DictReader(source):
+                    group = next((row.pop(column) for column in GROUP_COLUMNS if column in row), '')
+                    for field in LIST_FIELDS:
+                        if field in row:
+                            row[field] = row[field].split('|')
+                    for field in INT_FIELDS:
+                        if field in row:
+                            row[field] = int(row[field])
+                    groups.setdefault(group, []).append(row)
+        else:
+            with open(file_path, encoding='utf-8') as source:
+                for name, records in json.load(source).items():
+                    if isinstance(records, list):
+                        records = {'': records}
+                    groups = banks.setdefault(name, {})
+                    for group, items in records.items():
+                        groups.setdefault(group, []).extend(items)
+    return banks
+
+
+def prepare(banks):
+    """Precompute per-record extras: a difficulty prior for items grouped
+    by level, and the distractors of vocabulary words"""
+    for groups in banks.values():
+        for group, items in groups.items():
+            if group in LEVEL_DIFFICULTY:
+                for item in items:
+                    item.setdefault('difficulty', LEVEL_DIFFICULTY[group])
+    vocabulary = banks.get('vocabulary')
+    if vocabulary:
+        index = DistractorIndex(vocabulary)
+        items = [item for group in vocabulary.values() for item in group]
+        for item, neighbours in zip(items, index.neighbours):
+            item['distractors'] = list(neighbours)
+    return banks
+
+
+def record_key(item):
+    for field in KEY_FIELDS:
+        if field in item:
+            return str(item[field])
+    return None
+
+
+def compile_bank(banks, path):
+    """Write banks to a content bank file at path.
+
+    Layout: header, JSON directory, offsets table (one little-endian u64
+    per record plus an end marker, relative to the data section), the
+    records as compact UTF-8 JSON, then a key table per keyed bank: key
+    offsets (u64), record indices (u32) and the keys, sorted by key. The
+    file is replaced atomically, so processes that have the old one mapped
+    keep reading it safely.
+    """
+    directory = {'banks': {}}
+    blobs = []
+    key_tables = []
+    for bank_name, groups in banks.items():
+        bank = {'start': len(blobs), 'groups': {}}
+        keys = []
+        for group, items in groups.items():
+            bank['groups'][group] = [len(blobs) - bank['start'], len(items)]
+            for item in items:
+                key = record_key(item)
+                if key is not None:
+                    keys.append((key.encode('utf-8'), len(blobs) - bank['start']))
+                blobs.append(json.dumps(item, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        bank['count'] = len(blobs) - bank['start']
+        if keys:
+            keys.sort()
+            key_tables.append((bank, keys))
+        directory['banks'][bank_name] = bank
+    directory['records'] = len(blobs)
+    # Key tables follow the records; their positions are relative to the data section
+    position = sum(len(blob) for blob in blobs)
+    for bank, keys in key_tables:
+        bank['keys'] = [len(keys), position]
+        position += OFFSET.size * (len(keys) + 1) + INDEX.size * len(keys) + sum(len(key) for key, _ in keys)
+    directory_bytes = json.dumps(directory, ensure_ascii=False).encode('utf-8')
+
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(tmp_path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, len(directory_bytes)))
+        out.write(directory_bytes)
+        position = 0
+        for blob in blobs:
+            out.write(OFFSET.pack(position))
+            position += len(blob)
+        out.write(OFFSET.pack(position))
+        for blob in blobs:
+            out.write(blob)
+        for _, keys in key_tables:
+            position = 0
+            for key, _ in keys:
+                out.write(OFFSET.pack(position))
+                position += len(key)
+            out.write(OFFSET.pack(position))
+            for _, index in keys:
+                out.write(INDEX.pack(index))
+            for key, _ in keys:
+                out.write(key)
+    os.replace(tmp_path, path)
+    return directory['records']
+
+
+class BaseBank(ABC):
+    """Random access to quiz records by bank and group (level or topic)"""
+
+    @abstractmethod
+    def get(self, bank, index):
+        """Record at index of a bank"""
+
+    @abstractmethod
+    def span(self, bank, group=None):
+        """(first index, count) of a bank, or of one of its groups"""
+
+    @abstractmethod
+    def groups(self, bank):
+        """Group names of a bank"""
+
+    @abstractmethod
+    def find(self, bank, key):
+        """Index of the record whose id (or word) is key, or None"""
+
+    def count(self, bank, group=None):
+        try:
+            return self.span(bank, group)[1]
+        except KeyError:
+            return 0
+
+    def choice(self, bank, group=None, rng=random):
+        start, count = self.span(bank, group)
+        return self.get(bank, start + rng.randrange(count))
+
+    def sample(self, bank, k, group=None, rng=random):
+        start, count = self.span(bank, group)
+        return [self.get(bank, start + i) for i in rng.sample(range(count), k)]
+
+    def related(self, bank, item, k, rng=random):
+        """k of the records precomputed as item's distractors, closest first"""
+        neighbours = item.get('distractors', ())
+        # Favour the closest neighbours while still varying between questions
+        pool = neighbours[:max(k + 2, len(neighbours) // 2)]
+        return [self.get(bank, i) for i in rng.sample(pool, min(k, len(pool)))]
+
+
+class MemoryBank(BaseBank):
+    """Content held in Python objects; used when no compiled bank exists"""
+
+    def __init__(self, banks):
+        self.records = {}
+        self.ranges = {}
+        self.keys = {}
+        for bank_name, groups in banks.items():
+            records = []
+            ranges = {}
+            for group, items in groups.items():
+                ranges[group] = (len(records), len(items))
+                records.extend(items)
+            self.records[bank_name] = records
+            self.ranges[bank_name] = ranges
+            keys = ((record_key(item), index) for index, item in enumerate(records))
+            self.keys[bank_name] = {key: index for key, index in keys if key is not None}
+
+    def get(self, bank, index):
+        return self.records[bank][index]
+
+    def span(self, bank, group=None):
+        if group is None:
+            return 0, len(self.records[bank])
+        return self.ranges[bank][group]
+
+    def groups(self, bank):
+        return list(self.ranges.get(bank, ()))
+
+    def find(self, bank, key):
+        return self.keys.get(bank, {}).get(key)
+
+    def stats(self):
+        return {
+            'source': 'memory',
+            'records': sum(len(records) for records in self.records.values()),
+        }
+
+
+class ContentBank(BaseBank):
+    """Read-only, memory-mapped content bank file.
+
+    The records stay in the OS page cache, shared by every process that
+    maps the file; a lookup decodes just the one record it returns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as source:
+            self.map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, directory_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f'{path} is not a version {VERSION} content bank')
+        directory_end = HEADER.size + directory_length
+        directory = json.loads(self.map[HEADER.size:directory_end])
+        self.banks = directory['banks']
+        self.record_count = directory['records']
+        self.offsets_at = directory_end
+        self.data_at = directory_end + OFFSET.size * (self.record_count + 1)
+
+    def get(self, bank, index):
+        info = self.banks[bank]
+        if not 0 <= index < info['count']:
+            raise IndexError(f'{bank} has no record {index}')
+        start, end = struct.unpack_from('<QQ', self.map, self.offsets_at + OFFSET.size * (info['start'] + index))
+        return json.loads(self.map[self.data_at + start:self.data_at + end])
+
+    def span(self, bank, group=None):
+        info = self.banks[bank]
+        if group is None:
+            return 0, info['count']
+        return tuple(info['groups'][group])
+
+    def groups(self, bank):
+        return list(self.banks.get(bank, {}).get('groups', ()))
+
+    def find(self, bank, key):
+        """Binary search of the bank's key table, reading the mapped bytes"""
+        if 'keys' not in self.banks.get(bank, {}):
+            return None
+        count, at = self.banks[bank]['keys']
+        offsets_at = self.data_at + at
+        indices_at = offsets_at + OFFSET.size * (count + 1)
+        keys_at = indices_at + INDEX.size * count
+        target = key.encode('utf-8')
+
+        def key_at(position):
+            start, end = struct.unpack_from('<QQ', self.map, offsets_at + OFFSET.size * position)
+            return self.map[keys_at + start:keys_at + end]
+
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < count and key_at(low) == target:
+            return INDEX.unpack_from(self.map, indices_at + INDEX.size * low)[0]
+        return None
+
+    def close(self):
+        self.map.close()
+
+    def stats(self):
+        return {
+            'source': 'mmap',
+            'records': self.record_count,
+            'bytes': len(self.map),
+        }
+
+
+def load_content_bank(bank_path, source_paths):
+    """Map the compiled bank, or load the sources if it is missing or stale"""
+    if os.path.exists(bank_path):
+        bank_mtime = os.path.getmtime(bank_path)
+        if all(os.path.getmtime(path.rpartition('=')[2]) <= bank_mtime for path in source_paths):
+            try:
+                return ContentBank(bank_path)
+            except (OSError, ValueError) as e:
+                logger.error(f'Cannot map {bank_path}: {e}; loading the sources instead')
+        else:
+            logger.warning(f'{bank_path} is older than its sources; loading them instead (run build_content_bank.py)')
+    return MemoryBank(prepare(read_sources(source_paths)))
@@ -0,0 +1,328 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+
+from utils.adaptive import LEVEL_DIFFICULTY
+
+logger = logging.getLogger(__name__)
+
+PARTS_OF_SPEECH = ('noun', 'verb', 'adjective', 'adverb')
+MAX_TEXT_LENGTH = 240
+BLANK = '___'
+
+# One task line the prompt starts with (the fake LLM reads it back)
+TASK_LINE = re.compile(r'^Task: (\w+)(?: \((\w+)\))?, (\d+) items', re.M)
+
+PROMPTS = {
+    'vocabulary': """Task: vocabulary ({level}), {count} items
+Write {count} English vocabulary entries for {level} learners.
+Return only a JSON array. Each entry is an object with:
+"word" (one lowercase word), "pos" (one of: noun, verb, adjective, adverb),
+"definition" (one short sentence, without the word itself) and
+"example" (a sentence that uses the word).
+Avoid these words: {avoid}""",
+    'grammar': """Task: grammar, {count} items
+Write {count} multiple-choice English grammar questions for learners.
+Return only a JSON array. Each question is an object with:
+"question" (the question text, e.g. a sentence with ___ for the gap),
+"options" (exactly 4 different short answers), "correct" (index 0-3 of
+the right option) and "explanation" (one sentence on why it is right).""",
+    'fill_blank': """Task: fill_blank, {count} items
+Write {count} fill-in-the-blank English sentences for learners.
+Return only a JSON array. Each entry is an object with:
+"sentence" (a sentence with exactly one ___ where a word is missing),
+"options" (exactly 4 different single words), "correct" (index 0-3 of
+the word that fits) and "hint" (a short clue, without the answer).""",
+}
+
+
+def parse_items(text):
+    """JSON array from a model reply (code fences allowed); ValueError if there is none"""
+    start, end = text.find('['), text.rfind(']')
+    if start < 0 or end < start:
+        raise ValueError('no JSON array in the reply')
+    items = json.loads(text[start:end + 1])
+    if not isinstance(items, list):
+        raise ValueError('reply is not a JSON array')
+    return items
+
+
+def _text(item, field):
+    value = item.get(field)
+    if not isinstance(value, str):
+        return None
+    value = ' '.join(value.split())
+    return value if 0 < len(value) <= MAX_TEXT_LENGTH else None
+
+
+def _choice(item):
+    """(options, correct) if item has 4 distinct options and a valid index"""
+    options = item.get('options')
+    correct = item.get('correct')
+    if not isinstance(options, list) or len(options) != 4 or not isinstance(correct, int) or isinstance(correct, bool):
+        return None
+    options = [' '.join(option.split()) if isinstance(option, str) else '' for option in options]
+    if not all(options) or len({option.lower() for option in options}) != 4 or not 0 <= correct < 4:
+        return None
+    return options, correct
+
+
+def _mentions(text, word, endings=False):
+    """True if text has word as a whole word (with endings: also "walked" for "walk")"""
+    pattern = rf"(?<!\w){re.escape(word)}" + ('' if endings else r"(?!\w)")
+    return re.search(pattern, text, re.I) is not None
+
+
+def validate(kind, item):
+    """Normalized copy of a generated item, or (None, reason)"""
+    if not isinstance(item, dict):
+        return None, 'not an object'
+    if kind == 'vocabulary':
+        word = _text(item, 'word')
+        pos = _text(item, 'pos')
+        definition = _text(item, 'definition')
+        example = _text(item, 'example')
+        if not word or not word.isalpha():
+            return None, 'word'
+        word = word.lower()
+        if pos is None or pos.lower() not in PARTS_OF_SPEECH:
+            return None, 'part of speech'
+        if not definition or not example:
+            return None, 'missing text'
+        if not _mentions(example, word, endings=True):
+            return None, 'example without the word'
+        return {'word': word, 'pos': pos.lower(), 'definition': definition, 'example': example}, None
+    if kind == 'grammar':
+        question = _text(item, 'question')
+        explanation = _text(item, 'explanation')
+        choice = _choice(item)
+        if not question or not explanation:
+            return None, 'missing text'
+        if choice is None:
+            return None, 'options'
+        return {'question': question, 'options': choice[0], 'correct': choice[1], 'explanation': explanation}, None
+    if kind == 'fill_blank':
+        sentence = _text(item, 'sentence')
+        hint = _text(item, 'hint')
+        choice = _choice(item)
+        if not sentence or not hint:
+            return None, 'missing text'
+        if sentence.count(BLANK) != 1:
+            return None, 'blank'
+        if choice is None:
+            return None, 'options'
+        if _mentions(hint, choice[0][choice[1]]):
+            return None, 'hint gives the answer'
+        return {'sentence': sentence, 'options': choice[0], 'correct': choice[1], 'hint': hint}, None
+    return None, 'unknown kind'
+
+
+def dedup_key(kind, item):
+    """What makes two items the same question"""
+    if kind == 'vocabulary':
+        return item['word'].lower()
+    text = item['question'] if kind == 'grammar' else item['sentence']
+    return re.sub(r'[^a-z_]+', ' ', text.lower()).strip()
+
+
+ID_PREFIXES = {'grammar': 'grammar', 'fill_blank': 'fill'}
+
+
+class ContentPipeline:
+    """Generates quiz content in bulk with an LLM, offline.
+
+    The work is split into batches of ``batch_size`` items per bank (and
+    level for vocabulary). At most ``concurrency`` requests run at once;
+    a failed request or an unparseable reply is retried up to ``attempts``
+    times with exponential backoff. Every item is validated and normalized,
+    and items that repeat existing content or each other are dropped.
+    ``llm`` is anything with ``async generate_raw(prompt, json_output)``
+    returning text: GeminiService, or FakeLLM for tests and dry runs.
+    """
+
+    def __init__(self, llm, existing, concurrency=4, batch_size=10, attempts=4, backoff=1.0, rng=None):
+        self.llm = llm
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.attempts = attempts
+        self.backoff = backoff
+        self.rng = rng or random.Random()
+        self.seen = {kind: set() for kind in PROMPTS}
+        self.next_ids = {}
+        for kind, groups in existing.items():
+            if kind not in PROMPTS:
+                continue
+            for items in groups.values():
+                for item in items:
+                    self.seen[kind].add(dedup_key(kind, item))
+                    self._note_id(kind, item.get('id'))
+        self.stats = {'requests': 0, 'retries': 0, 'failed_batches': 0, 'received': 0,
+                      'accepted': 0, 'duplicates': 0, 'invalid': {}}
+
+    def _note_id(self, kind, item_id):
+        prefix = ID_PREFIXES.get(kind)
+        if prefix and isinstance(item_id, str) and item_id.startswith(prefix + '-'):
+            number = item_id[len(prefix) + 1:]
+            if number.isdigit():
+                self.next_ids[kind] = max(self.next_ids.get(kind, 1), int(number) + 1)
+
+    def _prompt(self, kind, group, count):
+        avoid = ''
+        if kind == 'vocabulary':
+            # A sample of known words keeps the model away from the commonest repeats
+            known = sorted(self.seen['vocabulary'])
+            avoid = ', '.join(self.rng.sample(known, min(40, len(known)))) or 'none'
+        return PROMPTS[kind].format(level=group, count=count, avoid=avoid)
+
+    async def _request(self, semaphore, prompt):
+        """Parsed reply items, or None once every attempt failed"""
+        for attempt in range(self.attempts):
+            if attempt:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + self.rng.random()))
+            async with semaphore:
+                self.stats['requests'] += 1
+                try:
+                    return parse_items(await self.llm.generate_raw(prompt, json_output=True))
+                except Exception as error:
+                    logger.warning(f'Generation attempt {attempt + 1}/{self.attempts} failed: {error}')
+        self.stats['failed_batches'] += 1
+        return None
+
+    def _accept(self, kind, items):
+        accepted = []
+        for item in items:
+            self.stats['received'] += 1
+            clean, reason = validate(kind, item)
+            if clean is None:
+                self.stats['invalid'][reason] = self.stats['invalid'].get(reason, 0) + 1
+                continue
+            key = dedup_key(kind, clean)
+            if key in self.seen[kind]:
+                self.stats['duplicates'] += 1
+                continue
+            self.seen[kind].add(key)
+            if kind in ID_PREFIXES:
+                number = self.next_ids.get(kind, 1)
+                self.next_ids[kind] = number + 1
+                clean = {'id': f'{ID_PREFIXES[kind]}-{number}', **clean}
+            accepted.append(clean)
+        self.stats['accepted'] += len(accepted)
+        return accepted
+
+    async def run(self, targets):
+        """Generate content for targets ({(kind, group): count}); returns
+        {kind: {group: [new items]}}"""
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        jobs = []
+        for (kind, group), count in targets.items():
+            for offset in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - offset)
+                jobs.append((kind, group, asyncio.ensure_future(self._request(semaphore, self._prompt(kind, group, size)))))
+        generated = {}
+        # Accept in submission order so ids and dedup do not depend on timing
+        for kind, group, job in jobs:
+            items = await job
+            if items:
+                generated.setdefault(kind, {}).setdefault(group, []).extend(self._accept(kind, items))
+        self.stats['seconds'] = round(time.perf_counter() - start, 2)
+        return generated
+
+
+def default_targets(per_bank):
+    targets = {('vocabulary', level): per_bank for level in LEVEL_DIFFICULTY}
+    targets[('grammar', '')] = per_bank
+    targets[('fill_blank', '')] = per_bank
+    return targets
+
+
+def merge_into_source(path, generated):
+    """Append generated items to a JSON content source (written atomically)"""
+    content = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as source:
+            content = json.load(source)
+    for kind, groups in generated.items():
+        for group, items in groups.items():
+            if group:
+                content.setdefault(kind, {}).setdefault(group, []).extend(items)
+            else:
+                content.setdefault(kind, []).extend(items)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as target:
+        json.dump(content, target, ensure_ascii=False, indent=2)
+        target.write('\n')
+    os.replace(tmp_path, path)
+
+
+class FakeLLM:
+    """Offline stand-in for GeminiService.generate_raw.
+
+    Answers each prompt's task line with made-up but well-formed items,
+    and can be told to fail, send broken JSON, invalid items or repeats
+    at given rates, after a simulated latency.
+    """
+
+    SYLLABLES = ('ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru', 'sa', 'te', 'vi', 'zo')
+
+    def __init__(self, seed=0, latency=0.0, failure_rate=0.0, broken_rate=0.0, invalid_rate=0.0, repeat_rate=0.0):
+        self.rng = random.Random(seed)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.broken_rate = broken_rate
+        self.invalid_rate = invalid_rate
+        self.repeat_rate = repeat_rate
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.sent = {}
+
+    def _word(self):
+        return ''.join(self.rng.choice(self.SYLLABLES) for _ in range(self.rng.randint(2, 4)))
+
+    def _item(self, kind):
+        word = self._word()
+        options = [self._word() for _ in range(3)]
+        correct = self.rng.randrange(4)
+        options.insert(correct, word)
+        if kind == 'vocabulary':
+            return {'word': word, 'pos': self.rng.choice(PARTS_OF_SPEECH),
+                    'definition': f'A made-up meaning number {self.rng.randrange(10 ** 6)}',
+                    'example': f'We used the {word} today.'}
+        if kind == 'grammar':
+            return {'question': f'Choose the correct form: "They ___ {word} every day."', 'options': options,
+                    'correct': correct, 'explanation': 'Only this form agrees with the subject.'}
+        return {'sentence': f'The {word} ___ very quickly.', 'options': options, 'correct': correct,
+                'hint': 'Think about what moves fast.'}
+
+    async def generate_raw(self, prompt, json_output=False):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.rng.random() < self.failure_rate:
+                raise RuntimeError('fake LLM unavailable')
+            if self.rng.random() < self.broken_rate:
+                return '```json\n[{"word": "unfinished"'
+            task = TASK_LINE.search(prompt)
+            kind, count = task.group(1), int(task.group(3))
+            sent = self.sent.setdefault(kind, [])
+            items = []
+            for _ in range(count):
+                if sent and self.rng.random() < self.repeat_rate:
+                    items.append(dict(self.rng.choice(sent)))
+                elif self.rng.random() < self.invalid_rate:
+                    items.append({**self._item(kind), 'options': ['only one'], 'pos': 'thing'})
+                else:
+                    item = self._item(kind)
+                    sent.append(item)
+                    items.append(item)
+            return f'```json\n{json.dumps(items)}\n```'
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,77 @@
+import random
+
+# Candidates scanned per spelling group when looking for confusable words
+GROUP_SCAN_LIMIT = 24
+
+
+class DistractorIndex:
+    """Wrong answers for the vocabulary quiz, precomputed once at load time.
+
+    Every word gets a short, fixed list of neighbours whose definitions are
+    plausible alternatives, best first:
+
+    1. same part of speech with similar spelling (shared beginning or
+       ending), from any level: nearest level first, then closest length,
+       e.g. "ambitious" / "ubiquitous";
+    2. same part of speech and level;
+    3. the rest of its part of speech, nearest level first;
+    4. anything from the same level, then from any level.
+
+    neighbours[i] holds entry indices, in the order the vocabulary lists its
+    levels and words. Picking options for a question is then a sample from
+    that list, which costs the same for a bank of 15 words or 50,000.
+    """
+
+    def __init__(self, vocabulary, neighbours=8, seed=0):
+        rng = random.Random(seed)
+        levels = list(vocabulary)
+        self.entries = []
+        for level_rank, level in enumerate(levels):
+            for item in vocabulary[level]:
+                self.entries.append((level_rank, item.get('pos', 'other'), item['word'], item['definition']))
+
+        by_bucket, by_pos, by_level, spelling = {}, {}, {}, {}
+        for index, (level_rank, pos, word, _) in enumerate(self.entries):
+            by_bucket.setdefault((level_rank, pos), []).append(index)
+            by_pos.setdefault(pos, []).append(index)
+            by_level.setdefault(level_rank, []).append(index)
+            lower = word.lower()
+            spelling.setdefault((pos, 'start', lower[:2]), []).append(index)
+            spelling.setdefault((pos, 'end', lower[-3:]), []).append(index)
+        for group in spelling.values():
+            rng.shuffle(group)
+
+        self.neighbours = []
+        for index, (level_rank, pos, word, definition) in enumerate(self.entries):
+            lower = word.lower()
+            chosen = []
+            seen = {definition}
+
+            def take(candidates):
+                for candidate in candidates:
+                    if len(chosen) == neighbours:
+                        return
+                    candidate_definition = self.entries[candidate][3]
+                    if candidate_definition not in seen:
+                        seen.add(candidate_definition)
+                        chosen.append(candidate)
+
+            similar = spelling[(pos, 'start', lower[:2])][:GROUP_SCAN_LIMIT] + spelling[(pos, 'end', lower[-3:])][:GROUP_SCAN_LIMIT]
+            similar.sort(key=lambda candidate: (
+                abs(self.entries[candidate][0] - level_rank),
+                abs(len(self.entries[candidate][2]) - len(word)),
+            ))
+            take(similar)
+            bucket = by_bucket[(level_rank, pos)]
+            if len(chosen) < neighbours:
+                take(rng.sample(bucket, min(len(bucket), neighbours * 4)))
+            same_pos = by_pos[pos]
+            if len(chosen) < neighbours:
+                take(sorted(
+                    rng.sample(same_pos, min(len(same_pos), neighbours * 8)),
+                    key=lambda candidate: abs(self.entries[candidate][0] - level_rank)
+                ))
+            for pool in (by_level[level_rank], range(len(self.entries))):
+                if len(chosen) < neighbours:
+                    take(rng.sample(pool, min(len(pool), neighbours * 4)))
+            self.neighbours.append(tuple(chosen))
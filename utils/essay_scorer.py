@@ -0,0 +1,120 @@
+from dataclasses import dataclass, field
+
+from utils.writing_checker import SENTENCE, WORD, TextCache, text_key
+
+# Texts shorter than this (in words) get local feedback only
+MIN_WORDS_FOR_AI = 50
+# Local scores at or above this, with nothing flagged, need no AI review
+FINE_SCORE = 85
+# Sentences longer than this (in words) are flagged as hard to read
+LONG_SENTENCE = 30
+# Window of the moving type-token ratio, so long texts are not penalized
+DIVERSITY_WINDOW = 50
+
+
+@dataclass(slots=True)
+class EssayScore:
+    words: int
+    sentences: int
+    avg_sentence_length: float
+    long_sentences: int
+    diversity: float
+    # [(word as written, suggestion)]
+    misspelled: list = field(default_factory=list)
+    issues: list = field(default_factory=list)
+    score: int = 0
+
+    @property
+    def needs_ai(self):
+        """Worth a detailed AI review: long enough, and not obviously fine"""
+        if self.words < MIN_WORDS_FOR_AI:
+            return False
+        return self.score < FINE_SCORE or bool(self.misspelled or self.issues)
+
+
+class EssayScorer:
+    """Fast in-process essay scoring, 0-100: the WritingChecker's spelling
+    and grammar findings, plus sentence length and lexical diversity.
+
+    The local score and the AI feedback of a text are cached by its hash,
+    for up to ``max_texts`` texts in LRU order.
+    """
+
+    def __init__(self, checker, max_texts=2000):
+        self.checker = checker
+        # key -> [text, EssayScore, AI feedback or None]
+        self.cache = TextCache(max_texts)
+        self.scored = 0
+        self.local_hits = 0
+        self.ai_hits = 0
+
+    def _diversity(self, words):
+        """Moving type-token ratio: distinct words per window, averaged"""
+        if len(words) <= DIVERSITY_WINDOW:
+            return len(set(words)) / len(words) if words else 0.0
+        starts = range(0, len(words) - DIVERSITY_WINDOW + 1, 5)
+        return sum(len(set(words[i:i + DIVERSITY_WINDOW])) for i in starts) / (len(starts) * DIVERSITY_WINDOW)
+
+    def _points(self, result):
+        """0-100: spelling, grammar, sentence length and diversity, 25 each"""
+        if not result.words:
+            return 0
+        # Mistakes per 100 words, counting short texts as 20 words
+        per_100 = 100 / max(result.words, 20)
+        spelling = max(0.0, 25 - 8 * len(result.misspelled) * per_100)
+        grammar = max(0.0, 25 - 8 * len(result.issues) * per_100)
+        average = result.avg_sentence_length
+        length = 25 - 2 * max(0.0, 8 - average, average - 22) - 5 * result.long_sentences
+        diversity = min(25.0, 25 * result.diversity / 0.7)
+        return round(spelling + grammar + max(0.0, length) + diversity)
+
+    def score(self, text):
+        """(key, EssayScore) of text; cached by key"""
+        key = text_key(text)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.local_hits += 1
+            return key, entry[1]
+
+        words = [word.lower() for word in WORD.findall(text)]
+        lengths = [length for length in (len(WORD.findall(sentence)) for sentence in SENTENCE.findall(text)) if length]
+        misspelled, issues = self.checker.check(text)
+        result = EssayScore(
+            words=len(words),
+            sentences=len(lengths),
+            avg_sentence_length=round(sum(lengths) / len(lengths), 1) if lengths else 0.0,
+            long_sentences=sum(1 for length in lengths if length > LONG_SENTENCE),
+            diversity=round(self._diversity(words), 2),
+            misspelled=misspelled,
+            issues=issues,
+        )
+        result.score = self._points(result)
+        self.scored += 1
+        self.cache.put(key, [text, result, None])
+        return key, result
+
+    def lookup(self, key):
+        """(text, EssayScore) scored under key, or None once it left the cache"""
+        entry = self.cache.get(key)
+        return (entry[0], entry[1]) if entry is not None else None
+
+    def feedback(self, key):
+        """Cached AI feedback of a text, or None"""
+        entry = self.cache.get(key)
+        if entry is None or entry[2] is None:
+            return None
+        self.ai_hits += 1
+        return entry[2]
+
+    def store_feedback(self, key, feedback):
+        entry = self.cache.get(key)
+        if entry is not None:
+            entry[2] = feedback
+
+    def stats(self):
+        return {
+            'cached_texts': len(self.cache),
+            'scored': self.scored,
+            'local_hits': self.local_hits,
+            'ai_hits': self.ai_hits,
+        }
@@ -0,0 +1,343 @@
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from utils.callback_data import pack, ANSWER
+
+BACK_TO_MINI_APP = [InlineKeyboardButton("🔙 Back to Mini App", callback_data="back_to_miniapp")]
+
+
+@dataclass(slots=True)
+class GameSession:
+    """One user's running game (slotted; stored as a plain dict)"""
+    game: str = ''
+    total: int = 0
+    question: int = 1
+    score: int = 0
+    misses: int = 0
+    # Items still to ask when the game plays a fixed set (a daily challenge)
+    queue: list = None
+    challenge: str = None
+    # Multiple-choice question being asked
+    item: dict = None
+    options: list = None
+    correct: int = 0
+    # Word matching board
+    pairs: list = None
+    words: list = None
+    selected: list = None
+    matched: list = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Sessions saved in another format load as unknown games and expire
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+class Game(ABC):
+    """A mini app game. Subclasses implement start() and answer()"""
+
+    name = ''
+    # (label, callback data) of the button that starts another round
+    restart = None
+
+    def __init__(self):
+        self.engine = None
+
+    @abstractmethod
+    async def start(self, query, user_id, items=None, challenge=None):
+        """Start a round; items replace the game's own picks when given"""
+
+    @abstractmethod
+    async def answer(self, query, user_id, session, option):
+        """Handle a tap on the option-th button of the user's session; answers
+        the query exactly once"""
+
+    def final_keyboard(self):
+        label, callback_data = self.restart
+        return [[(label, callback_data)]]
+
+
+class QuizGame(Game):
+    """Multiple-choice quiz: a fixed number of questions, one point each.
+
+    Subclasses provide the questions:
+    - next_item(user_id, previous) picks a content item,
+    - ask(item) returns (prompt, options, index of the right option),
+    - explain(item, right_option) adds the text shown after an answer,
+    - rate(user_id, item, correct) records the outcome,
+    - finish(user_id, score) updates progress and returns its summary.
+    """
+
+    title = ''
+    complete_title = ''
+    total = 3
+    # Shuffle the options, or keep the order the content lists them in
+    shuffle = False
+    right_text = "✅ Correct!"
+    wrong_text = "❌ Wrong! The correct answer was: {}"
+    option_width = None
+    closing = ''
+
+    @abstractmethod
+    def next_item(self, user_id, previous):
+        """Content item to ask next (previous is the last one asked)"""
+
+    @abstractmethod
+    def ask(self, item):
+        """(prompt, options, index of the right option) for item"""
+
+    def explain(self, item, right_option):
+        return ''
+
+    def rate(self, user_id, item, correct):
+        pass
+
+    def finish(self, user_id, score):
+        return ''
+
+    def _next_question(self, session, user_id):
+        item = session.queue.pop(0) if session.queue else self.next_item(user_id, session.item)
+        prompt, options, correct = self.ask(item)
+        order = list(range(len(options)))
+        if self.shuffle:
+            random.shuffle(order)
+        session.item = item
+        session.options = [options[i] for i in order]
+        session.correct = order.index(correct)
+        return prompt
+
+    def _question_screen(self, session, prompt, feedback=''):
+        text = f"{self.title} (Question {session.question}/{session.total})\n\n{feedback}{prompt}"
+        rows = []
+        for i, option in enumerate(session.options):
+            label = option if self.option_width is None else f"{option[:self.option_width]}..."
+            rows.append([(f"{chr(65 + i)}. {label}", pack(ANSWER, self.name, session.question, i))])
+        return text, rows
+
+    async def start(self, query, user_id, items=None, challenge=None):
+        session = GameSession(game=self.name, total=len(items) if items else self.total,
+                              queue=list(items) if items else None, challenge=challenge)
+        prompt = self._next_question(session, user_id)
+        self.engine.sessions[user_id] = session
+        await self.engine.render(query, *self._question_screen(session, prompt))
+
+    async def answer(self, query, user_id, session, option):
+        item = session.item
+        right_option = session.options[session.correct]
+        is_correct = option == session.correct
+        self.rate(user_id, item, is_correct)
+        if is_correct:
+            session.score += 1
+            result_text = self.right_text
+        else:
+            session.misses += 1
+            result_text = self.wrong_text.format(right_option)
+        feedback = f"{result_text}{self.explain(item, right_option)}\n\n"
+        await query.answer(result_text)
+
+        if session.question < session.total:
+            session.question += 1
+            prompt = self._next_question(session, user_id)
+            await self.engine.render(query, *self._question_screen(session, prompt, feedback))
+            return
+
+        summary = self.finish(user_id, session.score) + self.engine.finished(user_id, session)
+        text = f"{self.complete_title}\n\n{feedback}**Final Score:** {session.score}/{session.total}\n{summary}\n\n{self.closing}"
+        await self.engine.render(query, text, self.final_keyboard())
+        self.engine.end(user_id)
+
+
+class MatchGame(Game):
+    """Match words with their synonyms on a board of buttons.
+
+    Subclasses provide next_pairs(user_id) (dicts with 'english' and
+    'synonym'), rate(user_id, pair, correct, guess) and finish(user_id,
+    score). Buttons carry question 0: the board has no numbered questions.
+    """
+
+    intro = """🎯 **Word Matching Game**
+
+Match the synonyms! Select two words that have similar meanings."""
+
+    @abstractmethod
+    def next_pairs(self, user_id):
+        """Pairs to put on a new board"""
+
+    def rate(self, user_id, pair, correct, guess):
+        pass
+
+    def finish(self, user_id, score):
+        return ''
+
+    def _board(self, session):
+        rows = []
+        for i, (word, _) in enumerate(session.words):
+            if i % 2 == 0:
+                rows.append([])
+            if i in session.matched:
+                label = f"✅ {word}"
+            elif i in session.selected:
+                label = f"🔸 {word}"
+            else:
+                label = word
+            rows[-1].append((label, pack(ANSWER, self.name, 0, i)))
+        return rows
+
+    async def start(self, query, user_id, items=None, challenge=None):
+        pairs = list(items) if items else self.next_pairs(user_id)
+        words = [(pair['english'], 'english') for pair in pairs] + [(pair['synonym'], 'synonym') for pair in pairs]
+        random.shuffle(words)
+        session = GameSession(game=self.name, total=len(pairs), question=0, challenge=challenge,
+                              pairs=pairs, words=words, selected=[], matched=[])
+        self.engine.sessions[user_id] = session
+        text = f"""{self.intro}
+
+**Instructions:**
+1. Click on a word to select it
+2. Click on its synonym to make a match
+3. Match all {len(pairs)} pairs to win!
+
+**Words to match:**"""
+        await self.engine.render(query, text, self._board(session))
+
+    async def answer(self, query, user_id, session, option):
+        if not 0 <= option < len(session.words):
+            # A forged button, or one from a bigger board
+            await query.answer("That word is not on the board.")
+            return
+        if option in session.matched:
+            await query.answer("Word already matched or game not found!")
+            return
+        if option in session.selected:
+            session.selected.remove(option)
+            await query.answer("Word deselected")
+        else:
+            session.selected.append(option)
+            if len(session.selected) == 1:
+                await query.answer()
+            else:
+                word1 = session.words[session.selected[0]][0]
+                word2 = session.words[session.selected[1]][0]
+                is_match = any({word1, word2} == {pair['english'], pair['synonym']} for pair in session.pairs)
+                # Rate the attempt against the pair of the first word picked
+                attempted = next(pair for pair in session.pairs if word1 in (pair['english'], pair['synonym']))
+                unmatched = len(session.words) - len(session.matched)
+                self.rate(user_id, attempted, is_match, 1 / (unmatched - 1))
+
+                if is_match:
+                    session.matched.extend(session.selected)
+                    session.score += 1
+                    await query.answer("✅ Great match!")
+                else:
+                    session.misses += 1
+                    await query.answer("❌ Not a match, try again!")
+                session.selected = []
+
+                if len(session.matched) == len(session.words):
+                    summary = self.finish(user_id, session.score) + self.engine.finished(user_id, session)
+                    text = f"""🎉 **Congratulations!**
+
+You matched all pairs correctly!
+
+**Score:** {session.score}/{session.total}
+{summary}
+
+Your vocabulary skills are improving! 🌟"""
+                    await self.engine.render(query, text, self.final_keyboard())
+                    self.engine.end(user_id)
+                    return
+
+        selected = ", ".join(session.words[i][0] for i in session.selected) if session.selected else "None"
+        text = f"""{self.intro}
+
+**Selected:** {selected}
+**Matches Found:** {len(session.matched) // 2}/{session.total}
+
+**Words to match:**"""
+        await self.engine.render(query, text, self._board(session))
+
+
+class GameEngine:
+    """Runs the registered games on shared sessions and one render path,
+    and times every answer per game.
+
+    on_finish(user_id, session), if given, is called when a round ends and
+    returns text to add to the results (e.g. a daily challenge outcome).
+    """
+
+    def __init__(self, sessions, render_cache, on_finish=None):
+        self.sessions = sessions
+        self.render_cache = render_cache
+        self.on_finish = on_finish
+        self.games = {}
+        self.timings = {}
+
+    def add(self, game):
+        game.engine = self
+        self.games[game.name] = game
+        self.timings[game.name] = [0, 0.0, 0.0]
+        return game
+
+    async def render(self, query, text, rows):
+        """Edit the game message: rows of (label, callback data) plus the back button"""
+        keyboard = [[InlineKeyboardButton(label, callback_data=data) for label, data in row] for row in rows]
+        keyboard.append(BACK_TO_MINI_APP)
+        await self.render_cache.edit(query, text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+
+    def finished(self, user_id, session):
+        return self.on_finish(user_id, session) if self.on_finish is not None else ''
+
+    def end(self, user_id):
+        if user_id in self.sessions:
+            del self.sessions[user_id]
+
+    async def start(self, query, name, items=None, challenge=None):
+        await self.games[name].start(query, query.from_user.id, items, challenge)
+
+    async def answer(self, query, context, name, question, option):
+        """Answer from a packed button; question None skips the stale-tap check.
+        The query is answered here or by the game, not before."""
+        user_id = query.from_user.id
+        session = self.sessions.get(user_id)
+        if session is None or session.game != name:
+            await query.answer("Game session expired. Please start a new game.")
+            return
+        if question is not None and question != session.question:
+            await query.answer("That question was already answered.")
+            return
+        start = time.perf_counter()
+        try:
+            await self.games[name].answer(query, user_id, session, option)
+        finally:
+            elapsed = time.perf_counter() - start
+            timing = self.timings[name]
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def route(self, name):
+        """Handler for the older "<game>_<action>[_<option>]" callback data"""
+        async def handle(query, context, action, selected=None):
+            if selected is None:
+                await query.answer()
+                await self.start(query, name)
+            else:
+                await self.answer(query, context, name, None, selected)
+        return handle
+
+    def stats(self):
+        return {
+            name: {
+                'answers': answers,
+                'avg_ms': round(total_s / answers * 1000, 2) if answers else 0.0,
+                'max_ms': round(max_s * 1000, 2),
+            }
+            for name, (answers, total_s, max_s) in self.timings.items()
+        }
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+MAX_BODY_BYTES = 1024 * 1024
+HEADER_TIMEOUT_S = 30
+
+
+class PayloadTooLarge(ValueError):
+    """Request body over MAX_BODY_BYTES"""
+
+
+class Request:
+    __slots__ = ('method', 'path', 'headers', 'body')
+
+    def __init__(self, method, path, headers, body):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class HTTPServer:
+    """Minimal asyncio HTTP/1.1 server for health checks, metrics and webhooks.
+
+    Routes are async functions taking a Request and returning
+    ``(status, payload)`` where payload is a dict (sent as JSON), str or bytes.
+    It runs on the bot's own event loop, so no extra thread is needed.
+    """
+
+    def __init__(self, host='0.0.0.0', port=10000):
+        self.host = host
+        self.port = port
+        self.routes = {}
+        self.server = None
+        self.connections = set()
+
+    def route(self, method, path, handler):
+        self.routes[(method, path)] = handler
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        # Port 0 picks a free port (used by the benchmarks)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f'HTTP server listening on {self.host}:{self.port}')
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            # Idle keep-alive connections would otherwise keep wait_closed() waiting
+            for task in list(self.connections):
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, _version = request_line.decode('latin-1').split(' ', 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length', 0))
+        if length < 0:
+            raise ValueError('negative content-length')
+        if length > MAX_BODY_BYTES:
+            raise PayloadTooLarge('body too large')
+        body = await reader.readexactly(length) if length else b''
+        return Request(method, target.split('?', 1)[0], headers, body)
+
+    async def _dispatch(self, request):
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self.routes):
+                return 405, {'error': 'method not allowed'}
+            return 404, {'error': 'not found'}
+        try:
+            return await handler(request)
+        except Exception as error:
+            logger.error(f'Error handling {request.method} {request.path}: {error}')
+            return 500, {'error': 'internal error'}
+
+    async def _serve(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), HEADER_TIMEOUT_S)
+                except PayloadTooLarge:
+                    await self._respond(writer, 413, {'error': 'payload too large'}, keep_alive=False)
+                    break
+                except ValueError:
+                    # Malformed request line or Content-Length
+                    await self._respond(writer, 400, {'error': 'bad request'}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                status, payload = await self._dispatch(request)
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Cancelled by stop(); finish quietly instead of propagating into
+            # asyncio's connection callback (which logs it on Python < 3.11.8)
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, (dict, list)):
+            body = json.dumps(payload).encode()
+            content_type = 'application/json'
+        elif isinstance(payload, str):
+            body = payload.encode()
+            content_type = 'text/plain; charset=utf-8'
+        else:
+            body = payload or b''
+            content_type = 'application/octet-stream'
+
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
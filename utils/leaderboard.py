@@ -0,0 +1,300 @@
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# A node is promoted to the next level with probability 1/4, drawn two
+# random bits per level
+MAX_LEVEL = 32
+# Board keys pack (-score, member) into one int, which compares about
+# twice as fast as a tuple; members are user ids below 2**53
+MEMBER_BITS = 53
+MEMBER_MASK = (1 << MEMBER_BITS) - 1
+
+
+def board_key(member, score):
+    return (-score << MEMBER_BITS) + member
+
+
+def board_entry(key):
+    """(member, score) of a board key"""
+    return key & MEMBER_MASK, -(key >> MEMBER_BITS)
+
+
+def week_key(now):
+    """ISO week of a timestamp (UTC), e.g. '2026-W42'"""
+    return time.strftime('%G-W%V', time.gmtime(now))
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        # Positions skipped by following next[i]; to the end for the last node
+        self.width = [0] * levels
+
+
+class RankedList:
+    """Sorted keys in an indexable skip list.
+
+    Insert, remove, the rank of a key and the key at a rank all take
+    O(log n): every link records how many positions it skips.
+    """
+
+    def __init__(self, rng=None):
+        self.head = _Node(None, MAX_LEVEL)
+        self.levels = 1
+        self.size = 0
+        self.random = rng or random.Random()
+
+    def __len__(self):
+        return self.size
+
+    def _random_levels(self):
+        bits = self.random.getrandbits(2 * MAX_LEVEL - 2)
+        # One level per pair of zero bits at the bottom
+        return min(MAX_LEVEL, ((bits & -bits).bit_length() + 1) // 2) if bits else MAX_LEVEL
+
+    def _path(self, key):
+        """Last node before key on every level, and its position"""
+        update = [self.head] * self.levels
+        positions = [0] * self.levels
+        node, position = self.head, 0
+        for i in range(self.levels - 1, -1, -1):
+            following = node.next[i]
+            while following is not None and following.key < key:
+                position += node.width[i]
+                node = following
+                following = node.next[i]
+            update[i] = node
+            positions[i] = position
+        return update, positions
+
+    def insert(self, key):
+        update, positions = self._path(key)
+        levels = self._random_levels()
+        if levels > self.levels:
+            for i in range(self.levels, levels):
+                self.head.width[i] = self.size
+            update.extend([self.head] * (levels - self.levels))
+            positions.extend([0] * (levels - self.levels))
+            self.levels = levels
+        node = _Node(key, levels)
+        position = positions[0] + 1
+        for i in range(levels):
+            before = update[i]
+            node.next[i] = before.next[i]
+            before.next[i] = node
+            node.width[i] = before.width[i] - (position - 1 - positions[i])
+            before.width[i] = position - positions[i]
+        for i in range(levels, self.levels):
+            update[i].width[i] += 1
+        self.size += 1
+
+    def remove(self, key):
+        update, _ = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for i in range(self.levels):
+            before = update[i]
+            if before.next[i] is node:
+                before.width[i] += node.width[i] - 1
+                before.next[i] = node.next[i]
+            else:
+                before.width[i] -= 1
+        while self.levels > 1 and self.head.next[self.levels - 1] is None:
+            self.levels -= 1
+        self.size -= 1
+
+    def extend(self, keys):
+        """Append keys that are sorted and sort after every key already
+        present, in O(1) each (used to rebuild a list in one pass)"""
+        tails = [self.head] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node, position = self.head, 0
+        for i in range(self.levels - 1, -1, -1):
+            while node.next[i] is not None:
+                position += node.width[i]
+                node = node.next[i]
+            tails[i] = node
+            positions[i] = position
+        size = self.size
+        random_levels = self._random_levels
+        for key in keys:
+            size += 1
+            levels = random_levels()
+            node = _Node(key, levels)
+            for i in range(levels):
+                tail = tails[i]
+                tail.next[i] = node
+                tail.width[i] = size - positions[i]
+                tails[i] = node
+                positions[i] = size
+            if levels > self.levels:
+                self.levels = levels
+        for i in range(self.levels):
+            tails[i].width[i] = size - positions[i]
+        self.size = size
+
+    def rank(self, key):
+        """0-based position of key, or None if it is not in the list"""
+        node, position = self.head, 0
+        for i in range(self.levels - 1, -1, -1):
+            following = node.next[i]
+            while following is not None and following.key <= key:
+                position += node.width[i]
+                node = following
+                following = node.next[i]
+        if node is not self.head and node.key == key:
+            return position - 1
+        return None
+
+    def slice(self, start, stop):
+        """Keys at positions start to stop - 1"""
+        if start >= self.size or stop <= start:
+            return []
+        node, position = self.head, 0
+        for i in range(self.levels - 1, -1, -1):
+            while node.next[i] is not None and position + node.width[i] <= start + 1:
+                position += node.width[i]
+                node = node.next[i]
+        keys = []
+        while node is not None and len(keys) < stop - start:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+    def __iter__(self):
+        node = self.head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+
+class Leaderboard:
+    """Members ranked by score, highest first (ties by member id).
+
+    Only members with a positive score are ranked.
+    """
+
+    def __init__(self, rng=None):
+        self.scores = {}
+        self.ranking = RankedList(rng)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def set(self, member, score):
+        previous = self.scores.get(member)
+        if previous == score:
+            return
+        if previous is not None:
+            self.ranking.remove(board_key(member, previous))
+            del self.scores[member]
+        if score > 0:
+            self.scores[member] = score
+            self.ranking.insert(board_key(member, score))
+
+    def score(self, member):
+        return self.scores.get(member, 0)
+
+    def rank(self, member):
+        """1-based rank of member, or None if unranked"""
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        return self.ranking.rank(board_key(member, score)) + 1
+
+    def top(self, count):
+        """[(member, score)] of the count best members"""
+        return [board_entry(key) for key in self.ranking.slice(0, count)]
+
+    def load(self, scores):
+        """Replace the board with scores ({member: score}) in one pass:
+        the keys are sorted once and appended, rather than inserted one
+        by one"""
+        self.scores = {member: score for member, score in scores.items() if score > 0}
+        self.ranking = RankedList(self.ranking.random)
+        self.ranking.extend(sorted(board_key(member, score) for member, score in self.scores.items()))
+
+
+class Leaderboards:
+    """Global, weekly and per-level leaderboards, kept up to date as
+    progress changes.
+
+    The global and level boards rank total scores (vocabulary + grammar)
+    and are rebuilt from the persisted user progress at startup. Weekly
+    points are persisted per user in ``weekly_points`` (user_id -> [week,
+    points]) and reset when the ISO week changes.
+    """
+
+    def __init__(self, weekly_points, levels, clock=time.time, rng=None):
+        self.weekly_points = weekly_points
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.overall = Leaderboard(self.rng)
+        self.weekly = Leaderboard(self.rng)
+        self.levels = {level: Leaderboard(self.rng) for level in levels}
+        self.week = week_key(clock())
+        self.updates = 0
+
+    def _roll_week(self):
+        week = week_key(self.clock())
+        if week != self.week:
+            self.week = week
+            self.weekly.load({})
+            # Points from earlier weeks count for nothing; drop them once
+            for user_id in [user_id for user_id, record in self.weekly_points.items() if record[0] != week]:
+                del self.weekly_points[user_id]
+
+    def update(self, user_id, progress, gained=0):
+        """Re-rank user_id after progress changed; gained points count
+        towards this week's board"""
+        total = progress.vocab_score + progress.grammar_score
+        self.overall.set(user_id, total)
+        for level, board in self.levels.items():
+            board.set(user_id, total if level == progress.level else 0)
+        if gained:
+            self._roll_week()
+            record = dict.get(self.weekly_points, user_id)
+            points = (record[1] if record and record[0] == self.week else 0) + gained
+            self.weekly_points[user_id] = [self.week, points]
+            self.weekly.set(user_id, points)
+        self.updates += 1
+
+    def board(self, name):
+        """Board by name: 'global', 'weekly' or a level"""
+        if name == 'global':
+            return self.overall
+        if name == 'weekly':
+            self._roll_week()
+            return self.weekly
+        return self.levels[name]
+
+    def load(self, progress_by_user):
+        """Rebuild every board from user progress and the weekly points"""
+        start = time.perf_counter()
+        totals = {}
+        by_level = {level: {} for level in self.levels}
+        for user_id, progress in progress_by_user.items():
+            total = progress.vocab_score + progress.grammar_score
+            totals[user_id] = total
+            if progress.level in by_level:
+                by_level[progress.level][user_id] = total
+        self.week = week_key(self.clock())
+        self.overall.load(totals)
+        self.weekly.load({user_id: record[1] for user_id, record in self.weekly_points.items() if record[0] == self.week})
+        for level, board in self.levels.items():
+            board.load(by_level[level])
+        logger.info(f'Leaderboards built in {time.perf_counter() - start:.2f}s ({len(self.overall)} ranked users)')
+
+    def stats(self):
+        return {
+            'ranked': len(self.overall),
+            'weekly': len(self.weekly),
+            'updates': self.updates,
+        }
@@ -0,0 +1,40 @@
+import time
+from telegram.request import HTTPXRequest
+
+
+class MonitoredRequest(HTTPXRequest):
+    """HTTPXRequest that remembers when a getUpdates call last succeeded.
+
+    Used as the Application's get_updates_request, so every long poll goes
+    through it. A healthy poller succeeds at least once per poll timeout;
+    a stale timestamp means updates are not reaching the bot.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('connection_pool_size', 1)
+        super().__init__(*args, **kwargs)
+        self.last_success_at = None
+        self.failures = 0
+
+    async def do_request(self, *args, **kwargs):
+        try:
+            code, payload = await super().do_request(*args, **kwargs)
+        except Exception:
+            self.failures += 1
+            raise
+        if 200 <= code < 300:
+            self.last_success_at = time.time()
+        else:
+            self.failures += 1
+        return code, payload
+
+    def seconds_since_success(self):
+        if self.last_success_at is None:
+            return None
+        return time.time() - self.last_success_at
+
+    def stats(self):
+        return {
+            'last_success_at': self.last_success_at,
+            'failures': self.failures,
+        }
@@ -1,53 +1,147 @@
 import time
-from collections import defaultdict
-from config import RATE_LIMIT_PER_USER, RATE_LIMIT_WINDOW_MS
+from array import array
+from collections import OrderedDict
+from config import RATE_LIMIT_PER_USER, RATE_LIMIT_WINDOW_MS, SHARED_STATE_PATH
+
+class SlidingWindowRateLimiter:
+    """Sliding-window counter rate limiter with O(1) checks.
+
+    Per user it stores only the current window number and the request counts
+    of the current and previous fixed windows. The sliding estimate weights
+    the previous window by how much of it still overlaps the sliding window.
+
+    Users are kept in an OrderedDict moved to the end when their window rolls
+    over, so idle users collect at the front and are evicted from there
+    without scanning everyone. Freed slots in the arrays are reused.
+    """
+
+    def __init__(self, limit=RATE_LIMIT_PER_USER, window_ms=RATE_LIMIT_WINDOW_MS):
+        self.limit = limit
+        self.window_ms = window_ms
+        self.user_slots = OrderedDict()
+        self.free_slots = []
+        self.windows = array('q')
+        self.current = array('I')
+        self.previous = array('I')
+        self.next_sweep = 0
+        self.evicted = 0
+
+    def _slot(self, user_id, window):
+        """Return the user's slot with counters rolled forward to ``window``"""
+        slot = self.user_slots.get(user_id)
+        if slot is None:
+            if self.free_slots:
+                slot = self.free_slots.pop()
+            else:
+                slot = len(self.windows)
+                self.windows.append(0)
+                self.current.append(0)
+                self.previous.append(0)
+            self.windows[slot] = window
+            self.current[slot] = 0
+            self.previous[slot] = 0
+            self.user_slots[user_id] = slot
+        elif self.windows[slot] != window:
+            self.previous[slot] = self.current[slot] if self.windows[slot] == window - 1 else 0
+            self.current[slot] = 0
+            self.windows[slot] = window
+            self.user_slots.move_to_end(user_id)
+        return slot
+
+    def _estimate(self, slot, elapsed):
+        overlap = (self.window_ms - elapsed) / self.window_ms
+        return self.previous[slot] * overlap + self.current[slot]
+
+    def evict_idle(self, now=None):
+        """Forget users with no requests in the last two windows"""
+        now = time.time() * 1000 if now is None else now
+        window = int(now // self.window_ms)
+        evicted = 0
+        while self.user_slots:
+            user_id, slot = next(iter(self.user_slots.items()))
+            if self.windows[slot] >= window - 1:
+                break
+            self.user_slots.popitem(last=False)
+            self.free_slots.append(slot)
+            evicted += 1
+        self.evicted += evicted
+        return evicted
 
-class RateLimiter:
-    def __init__(self):
-        self.user_requests = defaultdict(list)
-    
     def is_rate_limited(self, user_id):
         """Check if user is rate limited"""
-        now = time.time() * 1000  # Convert to milliseconds
-        user_requests = self.user_requests[user_id]
-        
-        # Remove requests older than the window
-        valid_requests = [
-            timestamp for timestamp in user_requests 
-            if now - timestamp < RATE_LIMIT_WINDOW_MS
-        ]
-        
-        # Check if user has exceeded the limit
-        if len(valid_requests) >= RATE_LIMIT_PER_USER:
+        now = time.time() * 1000
+        if now >= self.next_sweep:
+            self.evict_idle(now)
+            self.next_sweep = now + self.window_ms
+
+        window = int(now // self.window_ms)
+        elapsed = now - window * self.window_ms
+        slot = self.user_slots.get(user_id)
+        if slot is None or self.windows[slot] != window:
+            slot = self._slot(user_id, window)
+
+        current = self.current[slot]
+        previous = self.previous[slot]
+        if previous:
+            current += previous * (self.window_ms - elapsed) / self.window_ms
+        if current >= self.limit:
             return True
-        
-        # Add current request
-        valid_requests.append(now)
-        self.user_requests[user_id] = valid_requests
-        
+
+        self.current[slot] += 1
         return False
-    
+
+    async def check(self, user_id):
+        """Count a request; True if the user is over the limit (same
+        interface as the shared limiter, which waits for its database)"""
+        return self.is_rate_limited(user_id)
+
     def get_remaining_requests(self, user_id):
         """Get remaining requests for user"""
-        now = time.time() * 1000
-        user_requests = self.user_requests[user_id]
-        valid_requests = [
-            timestamp for timestamp in user_requests 
-            if now - timestamp < RATE_LIMIT_WINDOW_MS
-        ]
-        
-        return max(0, RATE_LIMIT_PER_USER - len(valid_requests))
-    
+        if user_id not in self.user_slots:
+            return self.limit
+
+        window, elapsed = divmod(time.time() * 1000, self.window_ms)
+        slot = self._slot(user_id, int(window))
+        return max(0, int(self.limit - self._estimate(slot, elapsed)))
+
     def get_time_until_reset(self, user_id):
-        """Get time until rate limit resets"""
-        user_requests = self.user_requests[user_id]
-        if not user_requests:
+        """Get time until the next request is allowed, or until the counters
+        fully drain when the user is not limited"""
+        if user_id not in self.user_slots:
             return 0
-        
-        now = time.time() * 1000
-        oldest_request = min(user_requests)
-        reset_time = oldest_request + RATE_LIMIT_WINDOW_MS
-        return max(0, reset_time - now)
 
-# Create a global instance
-rate_limiter = RateLimiter() 
\ No newline at end of file
+        window, elapsed = divmod(time.time() * 1000, self.window_ms)
+        slot = self._slot(user_id, int(window))
+        previous, current = self.previous[slot], self.current[slot]
+        until_window_end = self.window_ms - elapsed
+
+        if self._estimate(slot, elapsed) < self.limit:
+            if current:
+                return until_window_end + self.window_ms
+            return until_window_end if previous else 0
+
+        if current >= self.limit:
+            # Wait for the next window, then for this window's weight to fade
+            return until_window_end + self.window_ms * (1 - self.limit / current)
+
+        # Wait until the previous window's weight fades below the headroom
+        return max(0, until_window_end - (self.limit - current) * self.window_ms / previous)
+
+    async def remaining_requests(self, user_id):
+        """Same as get_remaining_requests (interface of the shared limiter)"""
+        return self.get_remaining_requests(user_id)
+
+    async def time_until_reset(self, user_id):
+        """Same as get_time_until_reset (interface of the shared limiter)"""
+        return self.get_time_until_reset(user_id)
+
+    def stats(self):
+        return {'tracked_users': len(self.user_slots), 'evicted': self.evicted}
+
+# Create a global instance (shared across processes when configured)
+if SHARED_STATE_PATH:
+    from utils.shared_state import SharedDatabase, SharedRateLimiter
+    rate_limiter = SharedRateLimiter(SharedDatabase(SHARED_STATE_PATH))
+else:
+    rate_limiter = SlidingWindowRateLimiter()
+
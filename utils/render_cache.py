@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from telegram.error import BadRequest
+
+
+def fingerprint(text, reply_markup=None, parse_mode=None):
+    """Hash of everything an edit would change (markups hash by their buttons)"""
+    return hash((text, reply_markup, parse_mode))
+
+
+class RenderCache:
+    """Remembers what each bot message currently shows, per (chat, message_id).
+
+    An edit that would render exactly what the message already shows is
+    skipped without calling Telegram, which would only answer "message is
+    not modified". Entries are kept in LRU order and capped at
+    ``max_messages``; a forgotten message just costs one real edit.
+    ``max_messages=0`` remembers nothing, so every edit is sent (for when
+    other processes may edit the same messages).
+    """
+
+    def __init__(self, max_messages=20000):
+        self.max_messages = max_messages
+        self.entries = OrderedDict()
+        self.edits = 0
+        self.skipped = 0
+        self.not_modified = 0
+
+    def remember(self, chat_id, message_id, digest):
+        if not self.max_messages:
+            return
+        key = (chat_id, message_id)
+        self.entries[key] = digest
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_messages:
+            self.entries.popitem(last=False)
+
+    async def edit(self, query, text, reply_markup=None, parse_mode=None, digest=None):
+        """edit_message_text unless the message already shows this content.
+
+        Returns True if the message changed, False if it already showed it."""
+        message = query.message
+        if message is None:
+            # Inline-mode message: no chat/message id to key on
+            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+            return True
+
+        key = (message.chat_id, message.message_id)
+        if digest is None:
+            digest = fingerprint(text, reply_markup, parse_mode)
+        if self.entries.get(key) == digest:
+            self.entries.move_to_end(key)
+            self.skipped += 1
+            return False
+
+        changed = True
+        try:
+            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        except BadRequest as error:
+            if 'not modified' not in str(error).lower():
+                raise
+            # Content was already there (e.g. cache was cold after a restart)
+            self.not_modified += 1
+            changed = False
+        self.edits += 1
+        self.remember(message.chat_id, message.message_id, digest)
+        return changed
+
+    def stats(self):
+        return {
+            'tracked_messages': len(self.entries),
+            'edits': self.edits,
+            'skipped': self.skipped,
+            'not_modified': self.not_modified,
+        }
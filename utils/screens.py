@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from utils.render_cache import RenderCache, fingerprint
+
+# Characters that open an entity in Telegram's (legacy) Markdown mode
+_ESCAPABLE = '_*`['
+
+
+def lint_markdown(text):
+    """Return the problems Telegram's Markdown parser would reject, as strings.
+
+    Mirrors the legacy Markdown rules: *bold*, _italic_, `code`, ```pre```
+    and [text](url) must be closed, and a backslash escapes a marker.
+    """
+    problems = []
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char == '\\' and index + 1 < length and text[index + 1] in _ESCAPABLE:
+            index += 2
+            continue
+        if char in '*_':
+            end = text.find(char, index + 1)
+            if end < 0:
+                problems.append(f'unclosed {char} at offset {index}')
+                break
+            index = end + 1
+            continue
+        if char == '`':
+            marker = '```' if text.startswith('```', index) else '`'
+            end = text.find(marker, index + len(marker))
+            if end < 0:
+                problems.append(f'unclosed {marker} at offset {index}')
+                break
+            index = end + len(marker)
+            continue
+        if char == '[':
+            end = text.find(']', index + 1)
+            if end < 0:
+                problems.append(f'unclosed [ at offset {index}')
+                break
+            if text.startswith('(', end + 1):
+                close = text.find(')', end + 2)
+                if close < 0:
+                    problems.append(f'unclosed link url at offset {end + 1}')
+                    break
+                end = close
+            index = end + 1
+            continue
+        index += 1
+    return problems
+
+
+def build_keyboard(rows):
+    """Rows of (label, callback_data) tuples -> InlineKeyboardMarkup"""
+    return InlineKeyboardMarkup(tuple(
+        tuple(InlineKeyboardButton(label, callback_data=data) for label, data in row)
+        for row in rows
+    ))
+
+
+@dataclass(frozen=True, slots=True)
+class Screen:
+    text: str
+    reply_markup: InlineKeyboardMarkup
+    parse_mode: str
+    digest: int
+
+
+class ScreenRegistry:
+    """Static screens built once at import time.
+
+    Each screen's text is linted when it is added, so a broken Markdown
+    string fails at startup instead of on a user's tap. Screens and their
+    keyboards are immutable and shared by every request. Edits go through
+    a RenderCache, so re-showing the screen a message already displays
+    (a double tap on "Back") costs no API call.
+    """
+
+    def __init__(self, render_cache=None):
+        self.screens = {}
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
+
+    def add(self, name, text, rows, parse_mode='Markdown'):
+        if parse_mode == 'Markdown':
+            problems = lint_markdown(text)
+            if problems:
+                raise ValueError(f'Screen {name!r} has invalid Markdown: {", ".join(problems)}')
+        reply_markup = build_keyboard(rows)
+        screen = Screen(text, reply_markup, parse_mode, fingerprint(text, reply_markup, parse_mode))
+        self.screens[name] = screen
+        return screen
+
+    def __getitem__(self, name):
+        return self.screens[name]
+
+    async def edit(self, query, name):
+        """Replace the tapped message with a screen"""
+        screen = self.screens[name]
+        return await self.render_cache.edit(query, screen.text, screen.reply_markup, screen.parse_mode, screen.digest)
+
+    async def reply(self, message, name):
+        """Send a screen as a new message"""
+        screen = self.screens[name]
+        sent = await message.reply_text(screen.text, reply_markup=screen.reply_markup, parse_mode=screen.parse_mode)
+        if sent is not None:
+            self.render_cache.remember(sent.chat_id, sent.message_id, screen.digest)
@@ -0,0 +1,246 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Lower value = sent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+# Endpoints that post into a chat and count towards Telegram's flood limits
+THROTTLED_ENDPOINTS = {
+    'sendMessage', 'editMessageText', 'editMessageReplyMarkup', 'editMessageCaption',
+    'sendDocument', 'sendPhoto', 'sendAudio', 'sendVoice', 'sendVideo',
+    'sendMediaGroup', 'copyMessage', 'forwardMessage',
+}
+
+
+class TokenBucket:
+    """Token bucket in GCRA form: one timestamp instead of a token counter"""
+
+    __slots__ = ('interval', 'tolerance', 'tat')
+
+    def __init__(self, rate, burst=1):
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (burst - 1)
+        self.tat = 0.0  # theoretical arrival time of the next request
+
+    def delay(self, now):
+        """Seconds until a request would conform (0 if it can go now)"""
+        return max(0.0, self.tat - self.tolerance - now)
+
+    def consume(self, now):
+        self.tat = max(self.tat, now) + self.interval
+
+
+class ChatQueue:
+    """Requests of one chat: a heap of (priority, sequence, future), and the
+    entry that currently schedules the chat in the ready or waiting heap"""
+
+    __slots__ = ('entries', 'key')
+
+    def __init__(self):
+        self.entries = []
+        self.key = None
+
+
+class OutboundDispatcher(BaseRateLimiter):
+    """Central throttle for everything the bot sends to Telegram.
+
+    Plugged in as the Application's rate limiter, so every reply_text,
+    edit_message_text and send_document goes through it. Requests for
+    THROTTLED_ENDPOINTS wait in their chat's priority queue and are released
+    when both the global bucket and the chat's bucket have a token.
+    Interactive replies go before bulk sends (pass
+    ``rate_limit_args=PRIORITY_BULK``). A RetryAfter pauses all sending for
+    the given time and the request is queued again with its priority.
+
+    A chat with queued requests is in one of two heaps: ``ready`` (its
+    bucket has a token) ordered by its first request's priority, or
+    ``waiting`` ordered by the time its bucket has a token again. So a
+    dispatch costs O(log chats) however many throttled requests are queued.
+    """
+
+    def __init__(self, global_rate=30, chat_rate=1, chat_burst=3, max_retries=3):
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.chat_buckets = {}
+        self.chat_queues = {}
+        # (priority, sequence, chat_id) and (ready time, sequence, chat_id);
+        # an entry is current only while it is its chat's ChatQueue.key
+        self.ready = []
+        self.waiting = []
+        self.queued = 0
+        self.sequence = itertools.count()
+        self.paused_until = 0.0
+        self.wakeup = None
+        self.task = None
+        self.sent = 0
+        self.retries = 0
+        self.peak_depth = 0
+
+    async def initialize(self):
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def shutdown(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        for queue in self.chat_queues.values():
+            for _, _, future in queue.entries:
+                if not future.done():
+                    future.cancel()
+        self.chat_queues.clear()
+        self.ready.clear()
+        self.waiting.clear()
+        self.queued = 0
+
+    def _chat_bucket(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def _schedule(self, chat_id, queue, now):
+        """Put a chat in the ready or waiting heap (or drop its empty queue)"""
+        entries = queue.entries
+        while entries and entries[0][2].done():
+            heapq.heappop(entries)
+            self.queued -= 1
+        if not entries:
+            queue.key = None
+            del self.chat_queues[chat_id]
+            return
+        # Requests without a chat only wait for the global bucket
+        delay = self._chat_bucket(chat_id).delay(now) if chat_id is not None else 0.0
+        if delay > 0:
+            queue.key = (now + delay, next(self.sequence), chat_id)
+            heapq.heappush(self.waiting, queue.key)
+        else:
+            queue.key = (entries[0][0], entries[0][1], chat_id)
+            heapq.heappush(self.ready, queue.key)
+
+    def _pop_ready(self, now):
+        """Pop the highest-priority request whose chat has a token.
+
+        Returns (chat_id, future, None), or (None, None, seconds until a
+        waiting chat has a token) when every queued chat is still throttled."""
+        while self.waiting and self.waiting[0][0] <= now:
+            key = heapq.heappop(self.waiting)
+            queue = self.chat_queues.get(key[2])
+            if queue is not None and queue.key is key:
+                self._schedule(key[2], queue, now)
+        while self.ready:
+            key = heapq.heappop(self.ready)
+            chat_id = key[2]
+            queue = self.chat_queues.get(chat_id)
+            if queue is None or queue.key is not key:
+                continue
+            entries = queue.entries
+            if entries[0][2].done() or entries[0][:2] != key[:2]:
+                # The first request was cancelled: rank the chat again
+                self._schedule(chat_id, queue, now)
+                continue
+            _, _, future = heapq.heappop(entries)
+            self.queued -= 1
+            queue.key = None
+            return chat_id, future, None
+        return None, None, self.waiting[0][0] - now if self.waiting else None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.queued:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            now = loop.time()
+            wait = max(self.paused_until - now, self.global_bucket.delay(now))
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            chat_id, future, wait = self._pop_ready(now)
+            if future is None:
+                if wait is None:
+                    continue
+                # Sleep until a chat frees up, or until a new request arrives
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.global_bucket.consume(now)
+            if chat_id is not None:
+                self._chat_bucket(chat_id).consume(now)
+            self._schedule(chat_id, self.chat_queues[chat_id], now)
+            future.set_result(None)
+
+            if len(self.chat_buckets) > 10000:
+                # Buckets that are full again carry no state worth keeping
+                self.chat_buckets = {
+                    key: bucket for key, bucket in self.chat_buckets.items() if bucket.tat > now
+                }
+
+    async def _acquire(self, priority, chat_id):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self.chat_queues.get(chat_id)
+        if queue is None:
+            queue = self.chat_queues[chat_id] = ChatQueue()
+        entry = (priority, next(self.sequence), future)
+        heapq.heappush(queue.entries, entry)
+        self.queued += 1
+        self.peak_depth = max(self.peak_depth, self.queued)
+        if queue.key is None or queue.entries[0] is entry:
+            # New chat, or a request that goes before the chat's first one
+            self._schedule(chat_id, queue, loop.time())
+        self.wakeup.set()
+        await future
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        throttled = endpoint in THROTTLED_ENDPOINTS
+        priority = PRIORITY_INTERACTIVE if rate_limit_args is None else rate_limit_args
+        chat_id = data.get('chat_id')
+        for attempt in range(self.max_retries + 1):
+            if throttled:
+                await self._acquire(priority, chat_id)
+            try:
+                result = await callback(*args, **kwargs)
+                self.sent += 1
+                return result
+            except RetryAfter as error:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = error.retry_after
+                loop = asyncio.get_running_loop()
+                self.paused_until = max(self.paused_until, loop.time() + delay + 0.1)
+                logger.warning(f'Flood limit hit on {endpoint}, pausing sends for {delay}s')
+                if not throttled:
+                    await asyncio.sleep(delay + 0.1)
+
+    def stats(self):
+        """Queue depth and throughput metrics"""
+        interactive = sum(
+            1 for queue in self.chat_queues.values() for entry in queue.entries if entry[0] < PRIORITY_BULK
+        )
+        return {
+            'queued_interactive': interactive,
+            'queued_bulk': self.queued - interactive,
+            'queued_chats': len(self.chat_queues),
+            'peak_depth': self.peak_depth,
+            'sent': self.sent,
+            'retries': self.retries,
+        }
@@ -0,0 +1,130 @@
+import heapq
+import time
+
+
+class SessionStore:
+    """Game sessions with an idle TTL and a cap on the number of live sessions.
+
+    Expiry uses a min-heap of (deadline, key) with at most one entry per key.
+    Touching a session only moves its deadline in ``self.deadlines``; stale heap
+    entries are re-pushed when they reach the top, so a sweep only looks at
+    sessions that are actually due.
+    Because every session has the same TTL, the heap top is also the least
+    recently used session, which is what gets evicted when the cap is hit.
+    """
+
+    def __init__(self, backing=None, ttl_seconds=1800, max_sessions=50000, clock=time.monotonic):
+        self.data = backing if backing is not None else {}
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.deadlines = {}
+        self.heap = []
+        self.queued = set()
+        self.expired = 0
+        self.evicted = 0
+
+        # Sessions restored from disk get a fresh TTL
+        now = self.clock()
+        for key in list(self.data.keys()):
+            self._schedule(key, now)
+        self._evict_over_capacity()
+
+    def _schedule(self, key, now):
+        deadline = now + self.ttl
+        if key not in self.queued:
+            heapq.heappush(self.heap, (deadline, key))
+            self.queued.add(key)
+        self.deadlines[key] = deadline
+
+    def _drop(self, key):
+        self.deadlines.pop(key, None)
+        if key in self.data:
+            del self.data[key]
+
+    def _pop_due(self, now):
+        """Pop the heap top if it is due; return its key or None"""
+        while self.heap:
+            deadline, key = self.heap[0]
+            current = self.deadlines.get(key)
+            if current is None:
+                # Session was deleted explicitly
+                heapq.heappop(self.heap)
+                self.queued.discard(key)
+            elif current != deadline:
+                # Session was touched since this entry was pushed
+                heapq.heapreplace(self.heap, (current, key))
+            elif deadline <= now:
+                heapq.heappop(self.heap)
+                self.queued.discard(key)
+                return key
+            else:
+                return None
+        return None
+
+    def sweep(self, now=None):
+        """Expire idle sessions; returns how many were removed"""
+        now = self.clock() if now is None else now
+        removed = 0
+        key = self._pop_due(now)
+        while key is not None:
+            self._drop(key)
+            removed += 1
+            key = self._pop_due(now)
+        self.expired += removed
+        return removed
+
+    def _evict_over_capacity(self):
+        while len(self.deadlines) > self.max_sessions:
+            key = self._pop_due(float('inf'))
+            if key is None:
+                break
+            self._drop(key)
+            self.evicted += 1
+
+    def __contains__(self, key):
+        self.sweep()
+        return key in self.deadlines
+
+    def __getitem__(self, key):
+        self.sweep()
+        value = self.data[key]
+        self._schedule(key, self.clock())
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        now = self.clock()
+        self.sweep(now)
+        self.data[key] = value
+        self._schedule(key, now)
+        self._evict_over_capacity()
+
+    def __delitem__(self, key):
+        if key not in self.deadlines:
+            raise KeyError(key)
+        self._drop(key)
+
+    def pop(self, key, default=None):
+        if key not in self.deadlines:
+            return default
+        value = self.data[key]
+        self._drop(key)
+        return value
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def stats(self):
+        """Session metrics for logging and health checks"""
+        return {
+            'live_sessions': len(self.deadlines),
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'heap_size': len(self.heap),
+        }
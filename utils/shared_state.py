@@ -0,0 +1,396 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from config import RATE_LIMIT_PER_USER, RATE_LIMIT_WINDOW_MS
+
+logger = logging.getLogger(__name__)
+
+# Writes applied in one transaction by the writer thread
+MAX_WRITE_BATCH = 256
+
+
+class SharedDatabase:
+    """SQLite database shared by every bot process on the host.
+
+    Each process (and each fork) opens its own connections, one per
+    thread. Reads go through ``await read()`` on a worker thread; in WAL
+    mode they never wait for a writer. Writes are handed to a writer
+    thread, which applies them in ``BEGIN IMMEDIATE`` transactions, so
+    neither disk I/O nor another process's write lock stalls the event loop.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._jobs = None
+        self._writer_pid = None
+        self.writes = 0
+        self.write_errors = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits ('
+            'user_id INTEGER PRIMARY KEY, window INTEGER NOT NULL, '
+            'current INTEGER NOT NULL, previous INTEGER NOT NULL)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)')
+        return conn
+
+    @property
+    def conn(self):
+        """Connection for reads in this thread (blocking; on the event loop
+        use read())"""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.conn, local.pid = self._connect(), os.getpid()
+        return local.conn
+
+    def _read(self, query, args):
+        return query(self.conn, *args)
+
+    async def read(self, query, *args):
+        """Run ``query(conn, *args)`` on a worker thread and return its result"""
+        return await asyncio.to_thread(self._read, query, args)
+
+    def submit(self, write, *args):
+        """Run ``write(conn, *args)`` in a write transaction on the writer
+        thread; returns a concurrent.futures.Future with its result"""
+        if self._writer_pid != os.getpid():
+            # Threads do not survive a fork: start this process's own writer
+            self._jobs = queue.SimpleQueue()
+            threading.Thread(
+                target=self._write_loop, args=(self._jobs,), name='shared-state-writer', daemon=True
+            ).start()
+            self._writer_pid = os.getpid()
+        future = concurrent.futures.Future()
+        self._jobs.put((write, args, future))
+        return future
+
+    def _write_loop(self, jobs):
+        conn = self._connect()
+        while True:
+            batch = [jobs.get()]
+            while len(batch) < MAX_WRITE_BATCH:
+                try:
+                    batch.append(jobs.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(conn, batch)
+
+    def _apply(self, conn, batch):
+        # One transaction per batch; a savepoint per write, so a failing
+        # write is rolled back without losing the others
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for write, args, future in batch:
+                    conn.execute('SAVEPOINT write')
+                    try:
+                        results.append((future, write(conn, *args), None))
+                        conn.execute('RELEASE write')
+                    except Exception as error:
+                        conn.execute('ROLLBACK TO write')
+                        conn.execute('RELEASE write')
+                        results.append((future, None, error))
+                conn.execute('COMMIT')
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+        except Exception as error:
+            logger.error(f'Error writing shared state: {error}')
+            self.write_errors += len(batch)
+            for write, args, future in batch:
+                future.set_exception(error)
+            return
+        for future, result, error in results:
+            if error is None:
+                self.writes += 1
+                future.set_result(result)
+            else:
+                logger.error(f'Error writing shared state: {error}')
+                self.write_errors += 1
+                future.set_exception(error)
+
+    def stats(self):
+        return {'writes': self.writes, 'write_errors': self.write_errors}
+
+
+class SharedRateLimiter:
+    """Sliding-window counter rate limiter stored in the shared database, so
+    the limit applies to a user across all bot processes.
+
+    A request is checked and counted in one write transaction on the
+    writer thread: ``await check()`` on the event loop, or the blocking
+    ``is_rate_limited()`` elsewhere. The other queries also have an async
+    form that reads on a worker thread.
+    """
+
+    def __init__(self, database, limit=RATE_LIMIT_PER_USER, window_ms=RATE_LIMIT_WINDOW_MS):
+        self.db = database
+        self.limit = limit
+        self.window_ms = window_ms
+        self.next_sweep = 0
+
+    def _load(self, conn, user_id, window):
+        row = conn.execute(
+            'SELECT window, current, previous FROM rate_limits WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if row is None:
+            return 0, 0
+        stored_window, current, previous = row
+        if stored_window == window:
+            return current, previous
+        return 0, current if stored_window == window - 1 else 0
+
+    def _estimate(self, current, previous, elapsed):
+        return previous * (self.window_ms - elapsed) / self.window_ms + current
+
+    def _evict(self, conn, window):
+        return conn.execute('DELETE FROM rate_limits WHERE window < ?', (window - 1,)).rowcount
+
+    def evict_idle(self, now=None):
+        """Forget users with no requests in the last two windows (done by
+        the writer thread; returns a future with the number removed)"""
+        now = time.time() * 1000 if now is None else now
+        return self.db.submit(self._evict, int(now // self.window_ms))
+
+    def _count(self, conn, user_id, now):
+        window = int(now // self.window_ms)
+        current, previous = self._load(conn, user_id, window)
+        if self._estimate(current, previous, now - window * self.window_ms) >= self.limit:
+            return True
+        conn.execute(
+            'INSERT INTO rate_limits (user_id, window, current, previous) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (user_id) DO UPDATE SET '
+            'window = excluded.window, current = excluded.current, previous = excluded.previous',
+            (user_id, window, current + 1, previous)
+        )
+        return False
+
+    def _submit_check(self, user_id):
+        now = time.time() * 1000
+        if now >= self.next_sweep:
+            self.next_sweep = now + self.window_ms
+            self.evict_idle(now)
+        return self.db.submit(self._count, user_id, now)
+
+    async def check(self, user_id):
+        """Count a request; True if the user is over the limit"""
+        return await asyncio.wrap_future(self._submit_check(user_id))
+
+    def is_rate_limited(self, user_id):
+        """Check if user is rate limited (blocking; on the event loop use check())"""
+        return self._submit_check(user_id).result()
+
+    def _remaining(self, conn, user_id, now):
+        window = int(now // self.window_ms)
+        current, previous = self._load(conn, user_id, window)
+        return max(0, int(self.limit - self._estimate(current, previous, now - window * self.window_ms)))
+
+    def get_remaining_requests(self, user_id):
+        """Get remaining requests for user (blocking; on the event loop use
+        remaining_requests())"""
+        return self._remaining(self.db.conn, user_id, time.time() * 1000)
+
+    async def remaining_requests(self, user_id):
+        """Get remaining requests for user"""
+        return await self.db.read(self._remaining, user_id, time.time() * 1000)
+
+    def _until_reset(self, conn, user_id, now):
+        window = int(now // self.window_ms)
+        elapsed = now - window * self.window_ms
+        current, previous = self._load(conn, user_id, window)
+        until_window_end = self.window_ms - elapsed
+
+        if self._estimate(current, previous, elapsed) < self.limit:
+            if current:
+                return until_window_end + self.window_ms
+            return until_window_end if previous else 0
+
+        if current >= self.limit:
+            return until_window_end + self.window_ms * (1 - self.limit / current)
+
+        return max(0, until_window_end - (self.limit - current) * self.window_ms / previous)
+
+    def get_time_until_reset(self, user_id):
+        """Get time until the next request is allowed, or until the counters
+        fully drain when the user is not limited (blocking; on the event
+        loop use time_until_reset())"""
+        return self._until_reset(self.db.conn, user_id, time.time() * 1000)
+
+    async def time_until_reset(self, user_id):
+        """Get time until the next request is allowed, or until the counters
+        fully drain when the user is not limited"""
+        return await self.db.read(self._until_reset, user_id, time.time() * 1000)
+
+    def _tracked_users(self, conn):
+        return conn.execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0]
+
+    async def stats(self):
+        return {'tracked_users': await self.db.read(self._tracked_users), **self.db.stats()}
+
+
+# A checked-out key with no stored session (None marks one deleted since)
+_ABSENT = object()
+
+
+class SharedSessionStore:
+    """Game sessions stored in the shared database with an idle TTL.
+
+    Has the same interface as SessionStore, except that ``sweep()`` and
+    ``stats()`` are coroutines. Sessions read during an update
+    are mutated in place by the handlers, so they are kept as checked out,
+    together with sessions created or deleted meanwhile, and written back
+    by ``await commit()`` once the update has been handled. The update
+    finishes only after its writes are in the database, so the next update
+    of the user sees them whichever process handles it.
+
+    Updates run concurrently, each in its own task, so the checkouts are
+    kept per task in a context variable and ``commit()`` only writes back
+    those of the update that is finishing. ``await checkout()`` reads the
+    user's session on a worker thread before the handlers run; a key that
+    was not checked out that way is read on the spot. ``max_sessions`` is
+    enforced by the periodic sweep, so it can be exceeded in between.
+    """
+
+    def __init__(self, database, ttl_seconds=1800, max_sessions=50000, clock=time.time, encode=None, decode=None):
+        self.db = database
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.ttl = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._checkouts = contextvars.ContextVar(f'shared_sessions_{id(self)}', default=None)
+        self.expired = 0
+        self.evicted = 0
+
+    @property
+    def checked_out(self):
+        """Sessions checked out by the update handled in the current task"""
+        checked_out = self._checkouts.get()
+        if checked_out is None:
+            checked_out = {}
+            self._checkouts.set(checked_out)
+        return checked_out
+
+    def _load(self, conn, key, now):
+        # A read only: the idle TTL is refreshed when the session is committed
+        row = conn.execute(
+            'SELECT value FROM sessions WHERE key = ? AND expires_at > ?', (json.dumps(key), now)
+        ).fetchone()
+        return self.decode(json.loads(row[0])) if row is not None else _ABSENT
+
+    async def checkout(self, key):
+        """Read a session into the current update's checkouts"""
+        checked_out = self.checked_out
+        if key not in checked_out:
+            value = await self.db.read(self._load, key, self.clock())
+            # A handler may have set the key meanwhile
+            checked_out.setdefault(key, value)
+
+    def _checkout(self, key):
+        checked_out = self.checked_out
+        if key not in checked_out:
+            checked_out[key] = self._load(self.db.conn, key, self.clock())
+        return checked_out[key]
+
+    def _write(self, conn, stores, deletes, expires_at):
+        conn.executemany(
+            'INSERT INTO sessions (key, value, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at',
+            [(key, value, expires_at) for key, value in stores]
+        )
+        conn.executemany('DELETE FROM sessions WHERE key = ?', [(key,) for key in deletes])
+
+    def __contains__(self, key):
+        value = self._checkout(key)
+        return value is not None and value is not _ABSENT
+
+    def __getitem__(self, key):
+        value = self._checkout(key)
+        if value is None or value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self.checked_out[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.checked_out[key] = None
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        if key in self:
+            del self[key]
+        return value
+
+    async def commit(self):
+        """Write back the sessions checked out during the current update"""
+        checked_out = self._checkouts.get()
+        if not checked_out:
+            return
+        self._checkouts.set(None)
+        # Serialized here, so the writer thread never sees a session while
+        # a handler is changing it
+        stores = [
+            (json.dumps(key), json.dumps(self.encode(value), separators=(',', ':')))
+            for key, value in checked_out.items() if value is not None and value is not _ABSENT
+        ]
+        deletes = [json.dumps(key) for key, value in checked_out.items() if value is None]
+        if stores or deletes:
+            await asyncio.wrap_future(self.db.submit(self._write, stores, deletes, self.clock() + self.ttl))
+
+    def _sweep(self, conn, now):
+        removed = conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,)).rowcount
+        self.expired += removed
+        # The cap is enforced here rather than on every commit, so counting
+        # the rows costs one scan per sweep
+        overflow = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0] - self.max_sessions
+        if overflow > 0:
+            conn.execute(
+                'DELETE FROM sessions WHERE key IN '
+                '(SELECT key FROM sessions ORDER BY expires_at LIMIT ?)', (overflow,)
+            )
+            self.evicted += overflow
+        return removed
+
+    async def sweep(self, now=None):
+        """Delete expired sessions and evict the least recently used ones
+        over max_sessions; returns how many expired"""
+        now = self.clock() if now is None else now
+        return await asyncio.wrap_future(self.db.submit(self._sweep, now))
+
+    def _live_sessions(self, conn, now):
+        return conn.execute('SELECT COUNT(*) FROM sessions WHERE expires_at > ?', (now,)).fetchone()[0]
+
+    async def stats(self):
+        """Session metrics for logging and health checks"""
+        live_sessions = await self.db.read(self._live_sessions, self.clock())
+        return {'live_sessions': live_sessions, 'expired': self.expired, 'evicted': self.evicted, **self.db.stats()}
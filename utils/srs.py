@@ -0,0 +1,155 @@
+import heapq
+import time
+
+# SM-2 parameters; ease is kept in thousandths so cards stay all-integer
+DEFAULT_EASE = 2500
+MIN_EASE = 1300
+DAY = 24 * 60  # minutes
+# A missed card comes back within the same practice session instead of
+# SM-2's one day, like the learning steps of common SRS apps
+RELEARN_INTERVAL = 10
+# Quiz answers map to SM-2 quality grades (0-5)
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+# Random candidates tried when looking for a card the user has not seen
+NEW_CARD_TRIES = 8
+
+
+def sm2(interval, ease, repetitions, quality):
+    """Next (interval in minutes, ease, repetitions) after a review"""
+    ease = max(MIN_EASE, ease + 100 - (5 - quality) * (80 + (5 - quality) * 20))
+    if quality < 3:
+        return RELEARN_INTERVAL, ease, 0
+    if repetitions == 0:
+        interval = DAY
+    elif repetitions == 1:
+        interval = 6 * DAY
+    else:
+        interval = round(max(interval, DAY) * ease / 1000)
+    return interval, ease, repetitions + 1
+
+
+class Deck:
+    """One user's review cards with a heap of due times.
+
+    cards maps an item key (e.g. the vocabulary word) to (due, interval,
+    ease, repetitions), all ints: due in epoch seconds, interval in minutes.
+    The heap holds (due, item) and is cleaned lazily: an entry whose card
+    was reviewed again or forgotten is dropped when it surfaces.
+    """
+
+    __slots__ = ('cards', 'heap')
+
+    def __init__(self, cards=None):
+        self.cards = cards or {}
+        self.heap = [(card[0], item) for item, card in self.cards.items()]
+        heapq.heapify(self.heap)
+
+    def _top(self):
+        heap, cards = self.heap, self.cards
+        while heap and (heap[0][1] not in cards or cards[heap[0][1]][0] != heap[0][0]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def next_due(self, now):
+        """Item whose review is due at now, earliest first, or None"""
+        top = self._top()
+        if top is not None and top[0] <= now:
+            return top[1]
+        return None
+
+    def earliest(self, exclude=None):
+        """Item due soonest (to review ahead when nothing is due or new)"""
+        top = self._top()
+        if top is None or top[1] != exclude:
+            return top and top[1]
+        heapq.heappop(self.heap)
+        following = self._top()
+        heapq.heappush(self.heap, top)
+        return following and following[1]
+
+    def review(self, item, quality, now):
+        previous_due, interval, ease, repetitions = self.cards.get(item, (None, 0, DEFAULT_EASE, 0))
+        interval, ease, repetitions = sm2(interval, ease, repetitions, quality)
+        due = int(now) + interval * 60
+        self.cards[item] = (due, interval, ease, repetitions)
+        if due != previous_due:
+            heapq.heappush(self.heap, (due, item))
+        # Superseded entries pile up between pops; rebuild when they dominate
+        if len(self.heap) > 2 * len(self.cards) + 16:
+            self.heap = [(card[0], key) for key, card in self.cards.items()]
+            heapq.heapify(self.heap)
+        return due
+
+    def forget(self, item):
+        self.cards.pop(item, None)
+
+    def to_list(self):
+        """Flat [item, due, interval, ease, repetitions, ...] for storage"""
+        flat = []
+        for item, card in self.cards.items():
+            flat.append(item)
+            flat.extend(card)
+        return flat
+
+    @classmethod
+    def from_list(cls, flat):
+        return cls({flat[i]: tuple(flat[i + 1:i + 5]) for i in range(0, len(flat), 5)})
+
+
+class ReviewScheduler:
+    """Chooses each user's next quiz item: due reviews first, then new items"""
+
+    def __init__(self, decks, clock=time.time):
+        self.decks = decks
+        self.clock = clock
+        self.due_picks = 0
+        self.new_picks = 0
+        self.ahead_picks = 0
+        self.reviews = 0
+
+    def next_item(self, user_id, new_item, exclude=None):
+        """Item to ask user_id next.
+
+        new_item() returns a random candidate item; candidates already
+        in the user's deck are skipped. When nothing is due and no unseen
+        candidate turns up, the card due soonest is reviewed ahead of time.
+        """
+        deck = self.decks.get(user_id)
+        if deck is not None:
+            item = deck.next_due(self.clock())
+            if item is not None and item != exclude:
+                self.due_picks += 1
+                return item
+        candidate = None
+        for _ in range(NEW_CARD_TRIES):
+            candidate = new_item()
+            if (deck is None or candidate not in deck.cards) and candidate != exclude:
+                self.new_picks += 1
+                return candidate
+        ahead = deck.earliest(exclude) if deck is not None else None
+        self.ahead_picks += 1
+        return ahead if ahead is not None else candidate
+
+    def review(self, user_id, item, correct):
+        """Record an answer; returns the next due time (epoch seconds)"""
+        deck = self.decks.get(user_id)
+        if deck is None:
+            deck = self.decks[user_id] = Deck()
+        self.reviews += 1
+        return deck.review(item, CORRECT_QUALITY if correct else WRONG_QUALITY, self.clock())
+
+    def forget(self, user_id, item):
+        """Drop an item's card, e.g. when it no longer exists"""
+        deck = self.decks.get(user_id)
+        if deck is not None:
+            deck.forget(item)
+
+    def stats(self):
+        return {
+            'decks': len(self.decks),
+            'due_picks': self.due_picks,
+            'new_picks': self.new_picks,
+            'ahead_picks': self.ahead_picks,
+            'reviews': self.reviews,
+        }
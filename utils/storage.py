@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Backend that keeps nothing on disk (state is lost on restart)"""
+
+    def load(self, namespace):
+        return {}
+
+    def write_batch(self, batch):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    """SQLite key/value backend running in WAL mode"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = self._open()
+
+    def _open(self):
+        conn = None
+        try:
+            conn = self._connect()
+            if conn.execute('PRAGMA quick_check').fetchone()[0] == 'ok':
+                return conn
+        except sqlite3.DatabaseError:
+            # Not an SQLite file at all fails as early as the WAL pragma
+            pass
+
+        # The file is damaged beyond what WAL replay can fix: keep it for
+        # inspection and start again from an empty database.
+        if conn is not None:
+            conn.close()
+        broken_path = f"{self.path}.corrupt-{int(time.time())}"
+        os.replace(self.path, broken_path)
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        logger.error(f'State database was corrupt, moved it to {broken_path}')
+        return self._connect()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            # In WAL mode NORMAL only syncs at checkpoints; a committed batch
+            # survives a process crash, and a power loss can only drop the
+            # last batches, never corrupt the file.
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS kv ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                'PRIMARY KEY (namespace, key)) WITHOUT ROWID'
+            )
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def load(self, namespace):
+        """Load every stored entry of a namespace"""
+        rows = self.conn.execute('SELECT key, value FROM kv WHERE namespace = ?', (namespace,))
+        return {json.loads(key): json.loads(value) for key, value in rows}
+
+    def write_batch(self, batch):
+        """Apply (namespace, key, value) rows in one transaction; value None deletes"""
+        upserts = [(ns, key, value) for ns, key, value in batch if value is not None]
+        deletes = [(ns, key) for ns, key, value in batch if value is None]
+        with self.conn:
+            self.conn.execute('BEGIN')
+            if upserts:
+                self.conn.executemany(
+                    'INSERT INTO kv (namespace, key, value) VALUES (?, ?, ?) '
+                    'ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value',
+                    upserts
+                )
+            if deletes:
+                self.conn.executemany('DELETE FROM kv WHERE namespace = ? AND key = ?', deletes)
+
+    def close(self):
+        self.conn.close()
+
+
+def create_backend(name, path):
+    """Create a storage backend by name"""
+    if name == 'sqlite':
+        return SQLiteBackend(path)
+    if name == 'memory':
+        return MemoryBackend()
+    raise ValueError(f'Unknown state backend: {name}')
+
+
+class PersistentDict(dict):
+    """Dict that records which keys were touched so they can be flushed later.
+
+    Handlers mutate the stored values in place (``user_progress[uid]['x'] += 1``),
+    so any key that is read is treated as possibly modified.
+    """
+
+    def __init__(self, namespace, encode=None, decode=None):
+        super().__init__()
+        self.namespace = namespace
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.dirty = set()
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.dirty.add(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        self.dirty.add(key)
+        return super().setdefault(key, default)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.add(key)
+
+    def pop(self, key, *default):
+        self.dirty.add(key)
+        return super().pop(key, *default)
+
+    def touch(self, key):
+        """Mark a key as modified"""
+        self.dirty.add(key)
+
+    def take_changes(self):
+        """Serialize and clear the dirty keys (value None means deleted)"""
+        dirty, self.dirty = self.dirty, set()
+        changes = []
+        for key in dirty:
+            if dict.__contains__(self, key):
+                value = json.dumps(self.encode(dict.__getitem__(self, key)), separators=(',', ':'))
+            else:
+                value = None
+            changes.append((self.namespace, json.dumps(key), value))
+        return changes
+
+
+class StateStore:
+    """Write-behind store: handlers work on in-memory dicts, a background task
+    flushes the touched keys to the backend in batches."""
+
+    def __init__(self, backend, flush_interval=2.0):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.namespaces = {}
+        self.flushes = 0
+        self.rows_written = 0
+        self.last_flush_at = None
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def register(self, namespace, encode=None, decode=None):
+        """Create a persistent dict for a namespace and load its saved entries"""
+        data = PersistentDict(namespace, encode, decode)
+        for key, value in self.backend.load(namespace).items():
+            dict.__setitem__(data, key, data.decode(value))
+        self.namespaces[namespace] = data
+        logger.info(f'Loaded {len(data)} entries for {namespace}')
+        return data
+
+    def _collect(self):
+        batch = []
+        taken = []
+        for data in self.namespaces.values():
+            if data.dirty:
+                taken.append((data, set(data.dirty)))
+                batch.extend(data.take_changes())
+        return batch, taken
+
+    async def flush(self):
+        """Write all pending changes; the disk write happens off the event loop"""
+        async with self._lock:
+            # Serializing on the loop gives a consistent snapshot of the values
+            batch, taken = self._collect()
+            if not batch:
+                return 0
+            try:
+                await asyncio.to_thread(self.backend.write_batch, batch)
+            except BaseException:
+                # Nothing was written: the keys go out again with the next flush
+                for data, keys in taken:
+                    data.dirty |= keys
+                raise
+            self.flushes += 1
+            self.rows_written += len(batch)
+            self.last_flush_at = time.time()
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as error:
+                logger.error(f'Error flushing state: {error}')
+
+    def start(self):
+        """Start the periodic flush task on the running loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task, write the remaining changes and close the backend"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self.backend.close()
+
+    def stats(self):
+        return {
+            'pending': sum(len(data.dirty) for data in self.namespaces.values()),
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'last_flush_at': self.last_flush_at,
+        }
@@ -0,0 +1,80 @@
+import asyncio
+from telegram.ext import BaseUpdateProcessor
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Process updates from different chats concurrently while keeping strict
+    FIFO order inside each chat.
+
+    Every update chains onto the previous pending update of its chat. The
+    chain link is taken before the first await, in the order the Application
+    hands updates over, so the order within a chat is the arrival order.
+    Only updates whose turn has come take one of ``max_concurrent_updates``
+    running slots, so a busy chat cannot block other chats while it waits.
+    ``max_pending_updates`` bounds how many updates may be queued in total.
+    """
+
+    __slots__ = ('running_limit', '_running', '_tails', 'active', 'peak_active', 'processed')
+
+    def __init__(self, max_concurrent_updates=16, max_pending_updates=4096):
+        super().__init__(max_pending_updates)
+        self.running_limit = max_concurrent_updates
+        self._running = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._tails = {}
+        self.active = 0
+        self.peak_active = 0
+        self.processed = 0
+
+    @staticmethod
+    def chat_key(update):
+        chat = getattr(update, 'effective_chat', None)
+        if chat is not None:
+            return chat.id
+        user = getattr(update, 'effective_user', None)
+        return user.id if user is not None else None
+
+    async def do_process_update(self, update, coroutine):
+        key = self.chat_key(update)
+        if key is None:
+            # Nothing to order against (e.g. inline queries without a chat)
+            async with self._running:
+                await coroutine
+            return
+
+        previous = self._tails.get(key)
+        done = asyncio.get_running_loop().create_future()
+        self._tails[key] = done
+        started = False
+        try:
+            if previous is not None:
+                # asyncio.wait does not raise if the previous update failed
+                await asyncio.wait([previous])
+            async with self._running:
+                started = True
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                try:
+                    await coroutine
+                finally:
+                    self.active -= 1
+                    self.processed += 1
+        finally:
+            if not started:
+                coroutine.close()
+            done.set_result(None)
+            if self._tails.get(key) is done:
+                del self._tails[key]
+
+    async def initialize(self):
+        """Nothing to allocate"""
+
+    async def shutdown(self):
+        """Nothing to free"""
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'peak_active': self.peak_active,
+            'waiting_chats': len(self._tails),
+            'processed': self.processed,
+        }
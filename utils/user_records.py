@@ -0,0 +1,25 @@
+import sys
+from dataclasses import asdict, dataclass
+
+
+@dataclass(slots=True)
+class UserProgress:
+    """Per-user mini app progress (slotted: no per-instance __dict__)"""
+    vocab_score: int = 0
+    grammar_score: int = 0
+    games_played: int = 0
+    streak_days: int = 0
+    level: str = 'beginner'
+    ability: float = 0.0
+    answers: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        # Ignore unknown keys so older/newer snapshots still load
+        record = cls(**{name: data[name] for name in cls.__slots__ if name in data})
+        # Share one string object per level name across all users
+        record.level = sys.intern(record.level)
+        return record
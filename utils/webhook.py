@@ -0,0 +1,50 @@
+import hmac
+import logging
+import time
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'x-telegram-bot-api-secret-token'
+
+
+class WebhookReceiver:
+    """HTTP route that validates Telegram webhook calls and queues the updates"""
+
+    def __init__(self, update_queue, bot=None, secret_token=''):
+        self.update_queue = update_queue
+        self.bot = bot
+        self.secret_token = secret_token
+        self.received = 0
+        self.rejected = 0
+        self.last_update_at = None
+
+    async def __call__(self, request):
+        if self.secret_token and not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ''), self.secret_token
+        ):
+            self.rejected += 1
+            return 403, {'error': 'invalid secret token'}
+
+        try:
+            data = request.json()
+            if not isinstance(data, dict):
+                raise ValueError('update is not a JSON object')
+            update = Update.de_json(data, self.bot)
+        except Exception as error:
+            logger.warning(f'Rejected malformed webhook update: {error}')
+            self.rejected += 1
+            return 400, {'error': 'malformed update'}
+
+        # Answer Telegram right away; handlers run from the update queue
+        await self.update_queue.put(update)
+        self.received += 1
+        self.last_update_at = time.time()
+        return 200, {'ok': True}
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'rejected': self.rejected,
+            'last_update_at': self.last_update_at,
+        }
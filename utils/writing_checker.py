@@ -0,0 +1,416 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+TOKEN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?|[.!?]")
+SENTENCE = re.compile(r'[^.!?]+[.!?]*')
+
+# Suffixes stripped to find the dictionary form of an inflected word
+SUFFIXES = ('ies', 'es', 's', 'ied', 'ed', 'ing', 'ly', 'er', 'est')
+
+# Common irregular verbs: base -> (past simple, past participle)
+IRREGULAR_VERBS = {
+    'be': ('was', 'been'), 'become': ('became', 'become'), 'begin': ('began', 'begun'),
+    'break': ('broke', 'broken'), 'bring': ('brought', 'brought'), 'build': ('built', 'built'),
+    'buy': ('bought', 'bought'), 'catch': ('caught', 'caught'), 'choose': ('chose', 'chosen'),
+    'come': ('came', 'come'), 'do': ('did', 'done'), 'draw': ('drew', 'drawn'),
+    'drink': ('drank', 'drunk'), 'drive': ('drove', 'driven'), 'eat': ('ate', 'eaten'),
+    'fall': ('fell', 'fallen'), 'feel': ('felt', 'felt'), 'find': ('found', 'found'),
+    'fly': ('flew', 'flown'), 'forget': ('forgot', 'forgotten'), 'get': ('got', 'got'),
+    'give': ('gave', 'given'), 'go': ('went', 'gone'), 'grow': ('grew', 'grown'),
+    'have': ('had', 'had'), 'hear': ('heard', 'heard'), 'keep': ('kept', 'kept'),
+    'know': ('knew', 'known'), 'leave': ('left', 'left'), 'lose': ('lost', 'lost'),
+    'make': ('made', 'made'), 'meet': ('met', 'met'), 'pay': ('paid', 'paid'),
+    'read': ('read', 'read'), 'ride': ('rode', 'ridden'), 'ring': ('rang', 'rung'),
+    'run': ('ran', 'run'), 'say': ('said', 'said'), 'see': ('saw', 'seen'),
+    'sell': ('sold', 'sold'), 'send': ('sent', 'sent'), 'sing': ('sang', 'sung'),
+    'sit': ('sat', 'sat'), 'sleep': ('slept', 'slept'), 'speak': ('spoke', 'spoken'),
+    'spend': ('spent', 'spent'), 'stand': ('stood', 'stood'), 'steal': ('stole', 'stolen'),
+    'swim': ('swam', 'swum'), 'take': ('took', 'taken'), 'teach': ('taught', 'taught'),
+    'tell': ('told', 'told'), 'think': ('thought', 'thought'), 'throw': ('threw', 'thrown'),
+    'understand': ('understood', 'understood'), 'wake': ('woke', 'woken'), 'wear': ('wore', 'worn'),
+    'win': ('won', 'won'), 'write': ('wrote', 'written'),
+}
+# Real words that look like a regular past of an irregular verb
+NOT_REGULARIZED = {'seed', 'ringed', 'singed', 'sited', 'wined', 'waked'}
+
+
+def _regularized(base):
+    """Regular-looking past forms of an irregular verb: go -> goed, run -> runned"""
+    if base.endswith('e'):
+        forms = {base + 'd'}
+    elif re.search(r'[^aeiou][aeiou][^aeiouwxy]$', base):
+        forms = {base + 'ed', base + base[-1] + 'ed'}
+    else:
+        forms = {base + 'ed'}
+    return forms - set(IRREGULAR_VERBS[base]) - NOT_REGULARIZED
+
+
+def _third_person(base):
+    if base.endswith(('s', 'sh', 'ch', 'o')):
+        return base + 'es'
+    if base.endswith('y') and base[-2] not in 'aeiou':
+        return base[:-1] + 'ies'
+    return base + 's'
+
+
+# 'be' is left out of both tables: its forms are too irregular to guess
+REGULARIZED = {form: base for base in IRREGULAR_VERBS if base != 'be' for form in _regularized(base)}
+# Past forms that are not also participles: "have went" -> "have gone"
+PAST_NOT_PARTICIPLE = {past: participle for past, participle in IRREGULAR_VERBS.values() if past != participle}
+# Present simple forms of irregular verbs -> base: "yesterday I go" -> "I went"
+PRESENT_FORMS = {form: base for base in IRREGULAR_VERBS if base != 'be' for form in (base, _third_person(base))}
+PRESENT_FORMS['has'] = 'have'
+PARTICIPLES = {participle for _, participle in IRREGULAR_VERBS.values()}
+PAST_MARKER = re.compile(r"\b(yesterday|ago|last (?:night|week|month|year|summer|winter|spring|autumn|weekend|time)|in (?:1[89]|20)\d\d)\b", re.I)
+# Subject, verb and the word after it (past an adverb): "I have (never) seen"
+SUBJECT_VERB = re.compile(
+    r"\b(i|you|he|she|it|we|they) (\w+)\b(?=(?:(?: (?:never|already|just|ever|not|always))? (\w+))?)", re.I
+)
+# A past time marker applies to its own clause only
+CLAUSE = re.compile(r",|;| and | but | because | that | when | so ", re.I)
+# Verbs about the present moment, often used next to a past time
+STATIVE_VERBS = {'think', 'know', 'understand', 'feel', 'forget'}
+QUANTITIES = r"(many|several|lots|a lot of \w+s|some \w+s|few|two|three|four|five|six|seven|eight|nine|ten|hundreds|thousands)"
+
+# Common learner mistakes: (pattern, message). Matched case-insensitively;
+# the message is formatted with the lowercased groups
+GRAMMAR_PATTERNS = [
+    (r"\b(\w+) \1\b", 'Repeated word: "{0} {0}"'),
+    (r"\b(could|should|would|must|might) of\b", 'Write "{0} have", not "{0} of"'),
+    (r"(?<!does )(?<!did )(?<!can )(?<!will )(?<!may )(?<!must )(?<!would )(?<!could )(?<!should )(?<!might )"
+     r"\b(he|she|it) (don't|have|are)\b", 'Check subject-verb agreement: "{0} {1}"'),
+    (r"\b(i) (is|are|has)\b", 'Check the verb after "I": "I {1}"'),
+    (r"\b(they|we|you) (is|has|was|doesn't)\b", 'Check subject-verb agreement: "{0} {1}"'),
+    (r"\b(there) is " + QUANTITIES + r"\b", 'Use "there are" before a plural: "there are {1}"'),
+    (r"\b(there) was " + QUANTITIES + r"\b", 'Use "there were" before a plural: "there were {1}"'),
+    (r"\b(more|most) (better|best|worse|worst)\b", 'Use "{1}" without "{0}"'),
+    (r"\b(a) ([aeio]\w*)\b", 'Use "an" before a vowel sound: "an {1}"'),
+    (r"\b(an) ([bcdfgjklmnpqrstvwxyz]\w*)\b", 'Use "a" before a consonant sound: "a {1}"'),
+    (r"\b(their) (is|are|was|were)\b", 'Did you mean "there {1}"?'),
+    (r"\b(didn't|did not|doesn't|does not|don't|do not) (\w+[^e]ed)\b", 'Use the base form after "{0}", not "{1}"'),
+    # First conditional: present simple in the if-clause
+    (r"\b(if) (\w+) will (\w+)\b", 'First conditional: use the present simple after "if", not "if {1} will {2}"'),
+    # "good at" for skills and abilities
+    (r"\b(good|bad|great|excellent|terrible) in "
+     r"(?!(?:the|a|an|my|your|his|her|our|their|this|that|every|some|many|all|real|bed)\b)(\w+)", 'Use "{0} at {1}" for skills'),
+]
+GRAMMAR_RULES = [(re.compile(pattern, re.I), message) for pattern, message in GRAMMAR_PATTERNS]
+REPEATED_WORD = GRAMMAR_RULES[0][0]
+# Case-sensitive checks
+LOWERCASE_I = re.compile(r"(?<![\w'])i(?![\w'])")
+LOWERCASE_START = re.compile(r"(?:^|[.!?]\s+)[a-z]")
+# Vowel-letter words said with a consonant sound, and words with a silent h
+A_EXCEPTIONS = ('one', 'once', 'eu', 'ewe')
+AN_EXCEPTIONS = ('hour', 'honest', 'honour', 'honor', 'heir', 'herb')
+# Doubled words that are usually right
+REPEAT_EXCEPTIONS = {'had', 'that', 'very', 'so', 'no', 'bye', 'ha'}
+# First words of a message that asks the tutor for something rather than
+# showing writing to check
+REQUEST_WORDS = {
+    'how', 'what', 'why', 'when', 'where', 'which', 'who', 'can', 'could', 'would', 'should', 'is', 'are',
+    'do', 'does', 'please', 'help', 'explain', 'write', 'give', 'tell', 'show', 'check', 'correct',
+    'improve', 'rewrite', 'translate', 'suggest',
+}
+
+
+def text_key(text):
+    """Cache key of a text: a hash of its words, ignoring spacing"""
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()[:16]
+
+
+def load_word_frequencies(path):
+    """{word: count} from lines of "word count" """
+    frequencies = {}
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            word, _, count = line.strip().partition(' ')
+            if word:
+                frequencies[word] = int(count or 1)
+    logger.info(f'Loaded {len(frequencies)} words from {path}')
+    return frequencies
+
+
+def is_request(text):
+    """True if text asks the tutor something rather than being writing to check"""
+    stripped = text.strip()
+    first = WORD.match(stripped)
+    return stripped.endswith('?') or (first is not None and first.group().lower() in REQUEST_WORDS)
+
+
+def _delete_levels(word, max_distance, prefix_length):
+    """Strings made by deleting 0, 1, ... max_distance characters from the
+    word's first prefix_length characters, one list per number deleted"""
+    word = word[:prefix_length]
+    found = {word}
+    levels = [[word]]
+    for _ in range(max_distance):
+        following = []
+        for item in levels[-1]:
+            for i in range(len(item)):
+                shorter = item[:i] + item[i + 1:]
+                if shorter not in found:
+                    found.add(shorter)
+                    following.append(shorter)
+        levels.append(following)
+    return levels
+
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein (optimal string alignment) distance of a and b,
+    or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Shared prefixes and suffixes cost nothing
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b)
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        lowest = i
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            lowest = min(lowest, value)
+        if lowest > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SymSpell:
+    """Spelling correction by symmetric deletes.
+
+    Every dictionary word is indexed under the strings left after deleting
+    up to ``max_distance`` characters from its prefix. A misspelling shares
+    a delete with every word within that distance, so candidates come from
+    a few dict lookups instead of generating every insert and replacement;
+    only the candidates are compared by edit distance. Most deletes belong
+    to a single word, which is stored as a plain string rather than a list.
+    """
+
+    def __init__(self, frequencies, max_distance=2, prefix_length=7):
+        self.frequencies = frequencies
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = deletes = {}
+        for word in frequencies:
+            for level in _delete_levels(word, max_distance, prefix_length):
+                for delete in level:
+                    words = deletes.get(delete)
+                    if words is None:
+                        deletes[delete] = word
+                    elif isinstance(words, str):
+                        deletes[delete] = [words, word]
+                    else:
+                        words.append(word)
+
+    def __contains__(self, word):
+        return word in self.frequencies
+
+    def lookup(self, word, max_distance=None):
+        """(suggestion, distance) of the closest known word, most frequent
+        first among equally close ones; None if there is none"""
+        if word in self.frequencies:
+            return word, 0
+        limit = self.max_distance if max_distance is None else max_distance
+        best, best_distance, best_count = None, limit + 1, 0
+        checked = set()
+        for deleted, level in enumerate(_delete_levels(word, limit, self.prefix_length)):
+            # A word k edits away shares a delete made with at most k
+            # deletions, so once a match is closer than this level, no
+            # deeper delete can find a better one
+            if deleted > best_distance:
+                break
+            for delete in level:
+                words = self.deletes.get(delete)
+                if words is None:
+                    continue
+                for candidate in (words,) if isinstance(words, str) else words:
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    distance = edit_distance(word, candidate, best_distance)
+                    if distance > limit:
+                        continue
+                    count = self.frequencies[candidate]
+                    if distance < best_distance or (distance == best_distance and count > best_count):
+                        best, best_distance, best_count = candidate, distance, count
+        return (best, best_distance) if best is not None else None
+
+
+class TextCache:
+    """Results for recently checked texts, keyed by text_key, in LRU order"""
+
+    def __init__(self, max_texts=2000):
+        self.max_texts = max_texts
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.max_texts:
+            self.entries.popitem(last=False)
+
+
+class WritingChecker:
+    """Spelling and grammar checks that run in process in a few
+    milliseconds.
+
+    A word is flagged as misspelled when neither it nor its dictionary form
+    (walked -> walk, stories -> story) is in the frequency list and SymSpell
+    finds a known word close to it; an unknown word with no close known
+    word is more likely a name than a typo. Grammar is checked with rules
+    for common learner mistakes, including the ones the grammar quiz
+    practises: past tense, present perfect, first conditional, "good at"
+    and "there were".
+
+    The SymSpell index takes a few hundred milliseconds to build, so it is
+    built on first use, or ahead of time by warm_up() (run in a thread).
+    """
+
+    def __init__(self, frequencies, max_distance=2):
+        self.frequencies = frequencies
+        self.max_distance = max_distance
+        self._speller = None
+        self.checks = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    @property
+    def speller(self):
+        if self._speller is None:
+            start = time.perf_counter()
+            self._speller = SymSpell(self.frequencies, self.max_distance)
+            logger.info(f'Spelling index built in {time.perf_counter() - start:.2f}s ({len(self._speller.deletes)} keys)')
+        return self._speller
+
+    def warm_up(self):
+        """Build the spelling index ahead of the first check (blocking; run in a thread)"""
+        return self.speller
+
+    def known(self, word):
+        """True if word or its dictionary form is listed"""
+        if word in self.frequencies or word in REGULARIZED:
+            return True
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                stem = word[:-len(suffix)]
+                if suffix in ('ies', 'ied'):
+                    stem += 'y'
+                # walked -> walk, liked -> like, stopped -> stop
+                if stem in self.frequencies or stem + 'e' in self.frequencies or (
+                        len(stem) > 2 and stem[-1] == stem[-2] and stem[:-1] in self.frequencies):
+                    return True
+        return False
+
+    def check_spelling(self, text):
+        """[(word as written, suggestion)] for likely typos"""
+        misspelled = []
+        seen = set()
+        sentence_start = True
+        for match in TOKEN.finditer(text):
+            token = match.group()
+            if token in '.!?':
+                sentence_start = True
+                continue
+            # Capitalized words inside a sentence are usually names
+            is_name = token[0].isupper() and not sentence_start
+            sentence_start = False
+            word = token.lower()
+            if is_name or len(word) < 3 or "'" in word or word in seen:
+                continue
+            seen.add(word)
+            if not self.known(word):
+                # Two edits turn a short unknown word into too many others
+                found = self.speller.lookup(word, 1 if len(word) < 7 else None)
+                if found is not None:
+                    misspelled.append((token, found[0]))
+        return misspelled
+
+    def _check_verbs(self, sentence, issues):
+        """Past tense and present perfect forms of irregular verbs"""
+        lowered = sentence.lower()
+        for word in WORD.findall(lowered):
+            if word in REGULARIZED:
+                issues.append(f'"{word}" is irregular: use "{IRREGULAR_VERBS[REGULARIZED[word]][0]}"')
+        for auxiliary, verb in re.findall(r"\b(have|has|'ve|'s)(?: (?:never|already|just|ever|not|always))? (\w+)\b", lowered):
+            if verb in PAST_NOT_PARTICIPLE:
+                issues.append(f'Present perfect uses the past participle: "{auxiliary} {PAST_NOT_PARTICIPLE[verb]}", not "{auxiliary} {verb}"')
+        # On the original text, so the hint quotes it as written
+        for clause in CLAUSE.split(sentence):
+            marker = PAST_MARKER.search(clause)
+            if marker is None:
+                continue
+            for subject, verb, following in SUBJECT_VERB.findall(clause):
+                base = PRESENT_FORMS.get(verb.lower())
+                if base is None or base in STATIVE_VERBS:
+                    continue
+                following = following.lower()
+                # "have" as an auxiliary: the present perfect rule covers it
+                if base == 'have' and (following in PARTICIPLES or following in PAST_NOT_PARTICIPLE or following.endswith('ed')):
+                    continue
+                issues.append(f'"{marker.group()}" needs the past tense: "{subject} {IRREGULAR_VERBS[base][0]}", not "{subject} {verb}"')
+
+    def check_grammar(self, text):
+        """Messages for common grammar mistakes found in text"""
+        issues = []
+        for rule, message in GRAMMAR_RULES:
+            for match in rule.finditer(text):
+                groups = [group.lower() for group in match.groups()]
+                if groups[0] == 'a' and groups[1].startswith(A_EXCEPTIONS):
+                    continue
+                if groups[0] == 'an' and (groups[1].startswith(AN_EXCEPTIONS) or match.group(2).isupper()):
+                    continue
+                if rule is REPEATED_WORD and groups[0] in REPEAT_EXCEPTIONS:
+                    continue
+                issues.append(message.format(*groups))
+        for sentence in SENTENCE.findall(text):
+            self._check_verbs(sentence, issues)
+        if LOWERCASE_I.search(text):
+            issues.append('Write "I" as a capital letter')
+        if LOWERCASE_START.search(text):
+            issues.append('Start every sentence with a capital letter')
+        return list(dict.fromkeys(issues))
+
+    def check(self, text):
+        """(misspelled, issues) of text, timed"""
+        start = time.perf_counter()
+        result = self.check_spelling(text), self.check_grammar(text)
+        elapsed = time.perf_counter() - start
+        self.checks += 1
+        self.total_s += elapsed
+        self.max_s = max(self.max_s, elapsed)
+        return result
+
+    def stats(self):
+        return {
+            'checks': self.checks,
+            'avg_ms': round(self.total_s / self.checks * 1000, 2) if self.checks else 0.0,
+            'max_ms': round(self.max_s * 1000, 2),
+            'index_ready': self._speller is not None,
+        }